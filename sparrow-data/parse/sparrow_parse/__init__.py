@@ -1 +1 @@
-__version__ = '1.5.6'
\ No newline at end of file
+__version__ = '1.5.7'
\ No newline at end of file
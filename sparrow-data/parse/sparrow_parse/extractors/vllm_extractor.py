@@ -11,19 +11,30 @@ import time
 
 
 class VLLMExtractor(object):
-    def __init__(self):
-        pass
+    def __init__(self, table_detection_runtime="fp32"):
+        # Per-page record of the processing path used by the text layer fast path
+        self.page_routes = []
+        # Table detection model runtime for tables_only extraction, fp32 or int8 (CPU only)
+        self.table_detection_runtime = table_detection_runtime
 
     def run_inference(self, model_inference_instance, input_data, tables_only=False,
                       generic_query=False, crop_size=None, apply_annotation=False, ocr_callback=None,
-                      debug_dir=None, debug=False, mode=None):
+                      debug_dir=None, debug=False, mode=None, text_layer=False, table_structure=False):
         """
         Main entry point for processing input data using a model inference instance.
         Handles generic queries, PDFs, and table extraction.
+        With text_layer enabled, PDF pages with an embedded text layer are processed as text-only prompts.
+        With table_structure enabled, tables_only extraction rebuilds table cells locally and uses the model
+        only for tables with low structure confidence. Locally rebuilt tables keep the table headers as field
+        names, so they are used for generic queries only, queries with a schema always go to the model.
         """
         if generic_query:
             input_data[0]["text_input"] = "retrieve document data. return response in JSON format"
             apply_annotation=False
+        elif table_structure:
+            if debug:
+                print("Local table structure recognition is used for generic queries only, skipping it")
+            table_structure = False
 
         if debug:
             print("Input data:", input_data)
@@ -40,34 +51,91 @@ class VLLMExtractor(object):
         # Document data extraction inference (file_path exists and is not None)
         file_path = input_data[0]["file_path"]
         if self.is_pdf(file_path):
-            return self._process_pdf(model_inference_instance, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir, mode)
+            return self._process_pdf(model_inference_instance, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir, mode, text_layer, table_structure)
         else:
-            return self._process_non_pdf(model_inference_instance, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir)
+            return self._process_non_pdf(model_inference_instance, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir, table_structure)
 
 
-    def _process_pdf(self, model_inference_instance, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir, mode):
+    def _process_pdf(self, model_inference_instance, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir, mode, text_layer=False, table_structure=False):
         """
         Handles processing and inference for PDF files, including page splitting and optional table extraction.
         """
         pdf_optimizer = PDFOptimizer()
+
+        # Table detection and annotations need page images, the text layer fast path is used for data extraction only
+        if text_layer and not tables_only and not apply_annotation:
+            return self._process_pdf_text_layer(model_inference_instance, input_data, crop_size, ocr_callback, debug, debug_dir)
         num_pages, output_files, temp_dir = pdf_optimizer.split_pdf_to_pages(input_data[0]["file_path"],
                                                                              debug_dir, convert_to_images=True)
 
-        results = self._process_pages(model_inference_instance, output_files, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir)
+        results = self._process_pages(model_inference_instance, output_files, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir, table_structure)
 
         # Clean up temporary directory
         shutil.rmtree(temp_dir, ignore_errors=True)
         return results, num_pages
 
 
-    def _process_non_pdf(self, model_inference_instance, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir):
+    def _process_pdf_text_layer(self, model_inference_instance, input_data, crop_size, ocr_callback, debug, debug_dir):
+        """
+        Processes born-digital PDF pages from their embedded text layer as text-only prompts.
+        Pages without a usable text layer (scanned pages) fall back to vision inference.
+        The path used for each page is recorded in self.page_routes.
+        """
+        pdf_optimizer = PDFOptimizer()
+        file_path = input_data[0]["file_path"]
+        text_input = input_data[0]["text_input"]
+
+        text_pages = pdf_optimizer.extract_text_layer(file_path)
+        num_pages = len(text_pages)
+        results = [None] * num_pages
+        self.page_routes = [
+            {"page": page["page"], "route": "text_layer" if page["usable"] else "vision"}
+            for page in text_pages
+        ]
+
+        # Text layer pages go to the backend in one text-only call, one prompt per page
+        text_layer_indexes = [i for i, page in enumerate(text_pages) if page["usable"]]
+        if text_layer_indexes:
+            page_input_data = [
+                {
+                    "file_path": None,
+                    "text_input": f"{text_input}\n\nDocument page text:\n{text_pages[i]['text']}"
+                }
+                for i in text_layer_indexes
+            ]
+            text_results = model_inference_instance.inference(page_input_data)
+            if len(text_results) != len(text_layer_indexes):
+                raise ValueError(f"Model returned {len(text_results)} result(s) for "
+                                 f"{len(text_layer_indexes)} text layer page(s)")
+            for i, result in zip(text_layer_indexes, text_results):
+                results[i] = result
+
+        vision_pages = [page["page"] for page in text_pages if not page["usable"]]
+        if vision_pages:
+            output_files, temp_dir = pdf_optimizer.render_pages_to_images(file_path, vision_pages, debug_dir)
+
+            vision_results = self._process_pages(model_inference_instance, output_files, input_data, False, crop_size,
+                                                 False, ocr_callback, debug, debug_dir)
+
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+            for page_number, result in zip(vision_pages, vision_results):
+                results[page_number - 1] = result
+
+        if debug:
+            print("Page routes:", self.page_routes)
+
+        return results, num_pages
+
+
+    def _process_non_pdf(self, model_inference_instance, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir, table_structure=False):
         """
         Handles processing and inference for non-PDF files, with optional table extraction.
         """
         file_path = input_data[0]["file_path"]
 
         if tables_only:
-            return self._extract_tables(model_inference_instance, file_path, input_data, apply_annotation, ocr_callback, debug, debug_dir), 1
+            return self._extract_tables(model_inference_instance, [file_path], input_data, apply_annotation, ocr_callback, debug, debug_dir, table_structure), 1
         else:
             temp_dir = tempfile.mkdtemp()
 
@@ -86,7 +154,7 @@ class VLLMExtractor(object):
 
             return results, 1
 
-    def _process_pages(self, model_inference_instance, output_files, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir):
+    def _process_pages(self, model_inference_instance, output_files, input_data, tables_only, crop_size, apply_annotation, ocr_callback, debug, debug_dir, table_structure=False):
         """
         Processes individual pages (PDF split) and handles table extraction or inference.
 
@@ -100,6 +168,7 @@ class VLLMExtractor(object):
             ocr_callback: Optional callback function to modify input data before inference.
             debug: Debug flag for logging.
             debug_dir: Directory for saving debug information.
+            table_structure: Whether to rebuild table cells locally before falling back to the model.
 
         Returns:
             List of results from the processing or inference.
@@ -109,11 +178,9 @@ class VLLMExtractor(object):
         if tables_only:
             if debug:
                 print(f"Processing {len(output_files)} pages for table extraction.")
-            # Process each page individually for table extraction
-            for i, file_path in enumerate(output_files):
-                tables_result = self._extract_tables( model_inference_instance, file_path, input_data, apply_annotation, ocr_callback, debug, debug_dir, page_index=i)
-                # Since _extract_tables returns a list with one JSON string, unpack it
-                results_array.extend(tables_result)  # Unpack the single JSON string
+            # Tables from all pages are processed together, one result per page
+            results_array.extend(self._extract_tables(model_inference_instance, output_files, input_data,
+                                                      apply_annotation, ocr_callback, debug, debug_dir, table_structure))
         else:
             if debug:
                 print(f"Processing {len(output_files)} pages for inference at once.")
@@ -153,52 +220,108 @@ class VLLMExtractor(object):
         return results_array
 
 
-    def _extract_tables(self, model_inference_instance, file_path, input_data, apply_annotation, ocr_callback, debug, debug_dir, page_index=None):
+    def _extract_tables(self, model_inference_instance, file_paths, input_data, apply_annotation, ocr_callback, debug, debug_dir, table_structure=False):
         """
-        Detects and processes tables from an input file.
+        Detects tables on all pages and runs a single inference call over the in-memory table crops.
+        With table_structure enabled, tables recognized locally with enough confidence skip the model call.
+        Returns one result dict per page, in page order.
         """
-        table_detector = TableDetector()
-        cropped_tables = table_detector.detect_tables(file_path, local=False, debug_dir=debug_dir, debug=debug)
-        results_array = []
+        table_detector = TableDetector(runtime=self.table_detection_runtime)
+        tables_by_page = []
 
-        # Check if no tables were found
-        if cropped_tables is None:
-            if debug:
+        for file_path in file_paths:
+            cropped_tables = table_detector.detect_tables(file_path, local=False, debug_dir=debug_dir, debug=debug)
+
+            if cropped_tables is None and debug:
                 print(f"No tables detected in {file_path}")
-            # Return a structured no-tables-found response instead of failing
-            return [json.dumps({"message": "No tables detected in the document", "status": "empty"})]
 
-        temp_dir = tempfile.mkdtemp()
+            tables_by_page.append(cropped_tables or [])
+
+        all_tables = [table for tables in tables_by_page for table in tables]
+        table_results = [None] * len(all_tables)
+
+        if table_structure and all_tables:
+            for i, table in enumerate(all_tables):
+                table_results[i] = self._recognize_table_structure(table, debug)
+
+        # Table crops of the whole document are handed to the backend at once. They stay in memory,
+        # unless an OCR callback is given: callbacks receive a file path, so crops are saved to disk for them
+        model_tables = [i for i, result in enumerate(table_results) if result is None]
+        if model_tables:
+            print(f"Processing {len(model_tables)} table(s) from {len(file_paths)} page(s)")
+            temp_dir = tempfile.mkdtemp() if ocr_callback is not None else None
+            try:
+                crops = [all_tables[i] for i in model_tables]
+                if temp_dir is not None:
+                    crops = [self._save_table_crop(crop, temp_dir, i) for i, crop in zip(model_tables, crops)]
+                input_data[0]["file_path"] = crops
+                model_results = model_inference_instance.inference(input_data, apply_annotation, ocr_callback)
+            finally:
+                if temp_dir is not None:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+
+            # Backends return one result per table, failed tables as error placeholders
+            if len(model_results) != len(model_tables):
+                raise ValueError(f"Model returned {len(model_results)} result(s) for {len(model_tables)} table(s)")
+            for i, result in zip(model_tables, model_results):
+                table_results[i] = result
 
-        for i, table in enumerate(cropped_tables):
-            table_index = f"page_{page_index + 1}_table_{i + 1}" if page_index is not None else f"table_{i + 1}"
-            print(f"Processing {table_index} for document {file_path}")
+        results_array = []
+        offset = 0
+        for tables in tables_by_page:
+            if not tables:
+                # Return a structured no-tables-found response instead of failing
+                results_array.append({"message": "No tables detected in the document", "status": "empty"})
+                continue
 
-            output_filename = os.path.join(temp_dir, f"{table_index}.jpg")
-            table.save(output_filename, "JPEG")
+            page_results = table_results[offset:offset + len(tables)]
+            offset += len(tables)
 
-            input_data[0]["file_path"] = [output_filename]
-            result = self._run_model_inference(model_inference_instance, input_data, apply_annotation, ocr_callback)
-            results_array.append(result)
+            # Merge page tables into a single structure, serialized once by the caller
+            merged_results = {"page_tables": [self._decode_result(result) for result in page_results]}
+            results_array.append(merged_results)
 
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        return results_array
 
-        # Merge results_array elements into a single JSON structure
-        merged_results = {"page_tables": results_array}
 
-        # Format the merged results as a JSON string with indentation
-        formatted_results = json.dumps(merged_results, indent=4)
+    @staticmethod
+    def _save_table_crop(table, temp_dir, index):
+        """
+        Saves a table crop as JPEG for backends and callbacks that work with file paths.
+        """
+        output_filename = os.path.join(temp_dir, f"table_{index + 1}.jpg")
+        table.save(output_filename, "JPEG")
+        return output_filename
+
+
+    @staticmethod
+    def _recognize_table_structure(table, debug):
+        """
+        Rebuilds a table locally from structure recognition and OCR.
+        Returns None when local recognition is not available or its confidence is too low.
+        """
+        try:
+            from sparrow_parse.processors.table_recognition_processor import (
+                TableStructureRecognizer, TABLE_STRUCTURE_MIN_CONFIDENCE
+            )
+            result, confidence = TableStructureRecognizer().recognize(table, debug)
+        except ImportError as e:
+            print(f"Local table structure recognition not available: {e}")
+            return None
+
+        if result is None or confidence < TABLE_STRUCTURE_MIN_CONFIDENCE:
+            if debug:
+                print(f"Low table structure confidence ({confidence}), falling back to model inference")
+            return None
 
-        # Return the formatted JSON string wrapped in a list
-        return [formatted_results]
+        return result
 
 
     @staticmethod
-    def _run_model_inference(model_inference_instance, input_data, apply_annotation, ocr_callback):
+    def _decode_result(result):
         """
-        Runs model inference and handles JSON decoding.
+        Decodes a single model inference result into a JSON structure.
         """
-        result = model_inference_instance.inference(input_data, apply_annotation, ocr_callback)[0]
         try:
             return json.loads(result) if isinstance(result, str) else result
         except json.JSONDecodeError:
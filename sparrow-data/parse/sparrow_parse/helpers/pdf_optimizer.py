@@ -59,6 +59,75 @@ class PDFOptimizer(object):
             # Return the number of pages, the list of file paths, and the temporary directory
             return len(images), output_files, temp_dir
 
+    def extract_text_layer(self, file_path, min_chars=50):
+        """
+        Reads the embedded text layer of every PDF page, keeping the positional layout.
+
+        A page is considered usable when its text layer has at least min_chars non-whitespace
+        characters and is not dominated by unmapped glyphs (typical for scanned or image-only pages).
+
+        Args:
+            file_path (str): Path to the PDF file
+            min_chars (int): Minimum number of non-whitespace characters for a usable text layer
+
+        Returns:
+            list: One dict per page with 'page' (1-based), 'text' and 'usable' keys
+        """
+        pages = []
+
+        with open(file_path, 'rb') as pdf_file:
+            reader = pypdf.PdfReader(pdf_file)
+
+            for page_num, page in enumerate(reader.pages):
+                try:
+                    # Layout mode keeps the relative position of text chunks (columns, table rows)
+                    text = page.extract_text(extraction_mode="layout")
+                except Exception:
+                    text = ""
+
+                visible_chars = [c for c in text if not c.isspace()]
+                unmapped_chars = sum(1 for c in visible_chars if c == '\ufffd')
+                usable = len(visible_chars) >= min_chars and unmapped_chars <= 0.05 * len(visible_chars)
+
+                pages.append({
+                    "page": page_num + 1,
+                    "text": text,
+                    "usable": usable
+                })
+
+        return pages
+
+    def render_pages_to_images(self, file_path, page_numbers, debug_dir=None):
+        """
+        Converts only the selected PDF pages to images.
+
+        Args:
+            file_path (str): Path to the PDF file
+            page_numbers (list): 1-based page numbers to render
+            debug_dir (str, optional): Directory to save debug copies of the images
+
+        Returns:
+            tuple: (list of image file paths in page_numbers order, temporary directory)
+        """
+        temp_dir = tempfile.mkdtemp()
+        output_files = []
+        base_name = os.path.splitext(os.path.basename(file_path))[0]
+
+        for page_number in page_numbers:
+            image = convert_from_path(file_path, dpi=300, first_page=page_number, last_page=page_number)[0]
+
+            output_filename = os.path.join(temp_dir, f'{base_name}_page_{page_number}.jpg')
+            image.save(output_filename, 'JPEG')
+            output_files.append(output_filename)
+
+            if debug_dir:
+                os.makedirs(debug_dir, exist_ok=True)
+                debug_output_filename = os.path.join(debug_dir, f'{base_name}_page_{page_number}_debug.jpg')
+                image.save(debug_output_filename, 'JPEG')
+                print(f"Debug image saved to: {debug_output_filename}")
+
+        return output_files, temp_dir
+
 
 if __name__ == "__main__":
     pdf_optimizer = PDFOptimizer()
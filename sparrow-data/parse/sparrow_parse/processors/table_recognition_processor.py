@@ -0,0 +1,192 @@
+from rich import print
+from transformers import AutoModelForObjectDetection
+from sparrow_parse.processors.table_structure_processor import TableDetector
+import numpy as np
+import torch
+from torchvision import transforms
+import os
+
+
+# Minimum structure confidence to accept the locally rebuilt table, below it the table is sent to the vision LLM
+TABLE_STRUCTURE_MIN_CONFIDENCE = float(os.getenv("SPARROW_TABLE_STRUCTURE_MIN_CONFIDENCE", "0.7"))
+
+
+class TableStructureRecognizer(object):
+    """
+    Rebuilds table cells locally from a cropped table image, without a vision LLM call.
+    Rows and columns are detected with the table-transformer structure model and cells
+    are filled with PaddleOCR text. Output follows the generic table template format.
+    """
+    _model = None  # Static variable to hold the table structure model
+    _device = None  # Static variable to hold the device information
+    _ocr = None  # Static variable to hold the OCR model
+
+    def __init__(self):
+        self.table_detector = TableDetector()
+
+    @classmethod
+    def _initialize_models(cls):
+        """
+        Static method to initialize the structure and OCR models if not already initialized.
+        """
+        if cls._model is None:
+            print("Loading table structure model...")
+            cls._model, cls._device = cls.load_table_structure_model()
+            print("Table structure model initialized.")
+
+        if cls._ocr is None:
+            print("Loading OCR model...")
+            cls._ocr = cls.load_ocr_model()
+            print("OCR model initialized.")
+
+    @staticmethod
+    def load_table_structure_model():
+        model = AutoModelForObjectDetection.from_pretrained("microsoft/table-transformer-structure-recognition-v1.1-all")
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model.to(device)
+        model.eval()
+
+        return model, device
+
+    @staticmethod
+    def load_ocr_model():
+        # PaddleOCR is an optional dependency, same OCR models as used by Sparrow OCR service
+        from paddleocr import PaddleOCR
+
+        return PaddleOCR(
+            text_detection_model_name="PP-OCRv5_mobile_det",
+            text_recognition_model_name="PP-OCRv5_mobile_rec",
+            use_doc_orientation_classify=False,
+            use_doc_unwarping=False,
+            use_textline_orientation=False)
+
+    def recognize(self, table_image, debug=False):
+        """
+        Recognizes table structure and cell text from a cropped table image.
+
+        Args:
+            table_image: PIL image of the cropped table
+            debug: Debug flag for logging
+
+        Returns:
+            tuple: (table data as {'items': [...]} or None, structure confidence between 0 and 1)
+        """
+        self._initialize_models()
+
+        rows, columns, header_boxes, structure_score = self.detect_structure(table_image)
+        if not rows or not columns:
+            return None, 0.0
+
+        words = self.ocr_words(table_image)
+        if not words:
+            return None, 0.0
+
+        grid = [["" for _ in columns] for _ in rows]
+        assigned_words = 0
+        for word in sorted(words, key=lambda w: (w['bbox'][1], w['bbox'][0])):
+            row_idx = self._find_band(word['bbox'], rows, axis=1)
+            col_idx = self._find_band(word['bbox'], columns, axis=0)
+            if row_idx is None or col_idx is None:
+                continue
+
+            cell_text = grid[row_idx][col_idx]
+            grid[row_idx][col_idx] = f"{cell_text} {word['text']}" if cell_text else word['text']
+            assigned_words += 1
+
+        # Confidence combines structure detection scores with the share of OCR text placed into cells
+        confidence = structure_score * (assigned_words / len(words))
+
+        header_rows = [idx for idx, row in enumerate(rows)
+                       if any(TableDetector.iob(row['bbox'], header) >= 0.5 for header in header_boxes)]
+        if not header_rows:
+            header_rows = [0]
+
+        headers = []
+        for col_idx in range(len(columns)):
+            parts = [grid[row_idx][col_idx] for row_idx in header_rows if grid[row_idx][col_idx]]
+            headers.append(' '.join(parts))
+        headers = self._deduplicate_headers([h if h else f'col{i + 1}' for i, h in enumerate(headers)])
+
+        items = []
+        for row_idx, row_cells in enumerate(grid):
+            if row_idx in header_rows or not any(row_cells):
+                continue
+            items.append({header: value for header, value in zip(headers, row_cells)})
+
+        if debug:
+            print(f"Table structure: {len(rows)} rows, {len(columns)} columns, confidence {confidence:.2f}")
+
+        return {'items': items}, round(confidence, 4)
+
+    def detect_structure(self, table_image):
+        """
+        Detects rows, columns and column headers with the table-transformer structure model.
+
+        Returns:
+            tuple: (rows sorted top to bottom, columns sorted left to right, header boxes, mean detection score)
+        """
+        structure_transform = transforms.Compose([
+            TableDetector.MaxResize(1000),
+            transforms.ToTensor(),
+            transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
+        ])
+
+        pixel_values = structure_transform(table_image).unsqueeze(0).to(self._device)
+
+        with torch.no_grad():
+            outputs = self._model(pixel_values)
+
+        id2label = dict(self._model.config.id2label)
+        id2label[len(id2label)] = "no object"
+
+        objects = [obj for obj in self.table_detector.outputs_to_objects(outputs, table_image.size, id2label)
+                   if obj['score'] >= 0.5]
+
+        rows = sorted([obj for obj in objects if obj['label'] == 'table row'], key=lambda obj: obj['bbox'][1])
+        columns = sorted([obj for obj in objects if obj['label'] == 'table column'], key=lambda obj: obj['bbox'][0])
+        header_boxes = [obj['bbox'] for obj in objects if obj['label'] == 'table column header']
+
+        scores = [obj['score'] for obj in rows + columns]
+        structure_score = sum(scores) / len(scores) if scores else 0.0
+
+        return rows, columns, header_boxes, structure_score
+
+    def ocr_words(self, table_image):
+        """
+        Runs OCR on the table image and returns recognized text boxes.
+        """
+        words = []
+        for res in self._ocr.predict(np.array(table_image)):
+            ocr_data = res.json.get('res', {})
+            for text, score, box in zip(ocr_data.get('rec_texts', []), ocr_data.get('rec_scores', []),
+                                        ocr_data.get('rec_boxes', [])):
+                if text and text.strip() and score > 0.3:
+                    words.append({'text': text.strip(), 'bbox': [float(v) for v in box[:4]]})
+
+        return words
+
+    @staticmethod
+    def _find_band(bbox, bands, axis):
+        """
+        Finds the row (axis=1) or column (axis=0) containing the center of a word bounding box.
+        """
+        center = (bbox[axis] + bbox[axis + 2]) / 2
+        for idx, band in enumerate(bands):
+            if band['bbox'][axis] <= center <= band['bbox'][axis + 2]:
+                return idx
+        return None
+
+    @staticmethod
+    def _deduplicate_headers(headers):
+        """Rename duplicate header strings by appending _2, _3, … to later occurrences."""
+        seen = {}
+        result = []
+        for header in headers:
+            if header in seen:
+                seen[header] += 1
+                result.append(f"{header}_{seen[header]}")
+            else:
+                seen[header] = 1
+                result.append(header)
+        return result
@@ -5,14 +5,34 @@ import torch
 from PIL import Image
 from torchvision import transforms
 import os
+import time
+
+
+# Table detection runtimes:
+# - "fp32": full precision transformers model (default)
+# - "int8": dynamically int8-quantized model for CPU inference (used only when CUDA is not available)
+TABLE_DETECTION_RUNTIMES = ("fp32", "int8")
+
+TABLE_DETECTION_MODEL = "microsoft/table-transformer-detection"
+TABLE_DETECTION_MODEL_REVISION = "no_timm"
+
+# Recorded sample pages used by benchmark_table_detection by default, pages with tables and a receipt without one
+BENCHMARK_PAGES = [
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images", file_name)
+    for file_name in ["bonds_table.png", "bonds_swiss_market.png", "bank_statement.png", "bank_statement_long.png",
+                      "lab_results.png", "oracle_10k_2024_q1_small.jpg", "invoice_1.jpg", "receipt_00001.png"]
+]
 
 
 class TableDetector(object):
-    _model = None  # Static variable to hold the table detection model
-    _device = None  # Static variable to hold the device information
+    _models = {}  # Static variable to hold the table detection model and device for each runtime
 
-    def __init__(self):
-        pass
+    def __init__(self, runtime="fp32"):
+        runtime = (runtime or "fp32").lower()
+        if runtime not in TABLE_DETECTION_RUNTIMES:
+            raise ValueError(f"Unsupported table detection runtime: {runtime}, "
+                             f"expected one of {', '.join(TABLE_DETECTION_RUNTIMES)}")
+        self.runtime = runtime
 
     class MaxResize(object):
         def __init__(self, max_size=800):
@@ -27,26 +47,25 @@ class TableDetector(object):
             return resized_image
 
     @classmethod
-    def _initialize_model(cls, invoke_pipeline_step, local):
+    def _initialize_model(cls, runtime, invoke_pipeline_step, local):
         """
-        Static method to initialize the table detection model if not already initialized.
+        Static method to initialize the table detection model for the runtime if not already initialized.
         """
-        if cls._model is None:
+        if runtime not in cls._models:
             # Use invoke_pipeline_step to load the model
-            cls._model, cls._device = invoke_pipeline_step(
-                lambda: cls.load_table_detection_model(),
+            cls._models[runtime] = invoke_pipeline_step(
+                lambda: cls.load_table_detection_model(quantized=runtime == "int8"),
                 "Loading table detection model...",
                 local
             )
-            print("Table detection model initialized.")
+            print(f"Table detection model initialized ({runtime}).")
 
+        return cls._models[runtime]
 
-    def detect_tables(self, file_path, local=True, debug_dir=None, debug=False):
-        # Ensure the model is initialized using invoke_pipeline_step
-        self._initialize_model(self.invoke_pipeline_step, local)
 
-        # Use the static model and device
-        model, device = self._model, self._device
+    def detect_tables(self, file_path, local=True, debug_dir=None, debug=False):
+        # Ensure the model is initialized using invoke_pipeline_step, use the static model and device
+        model, device = self._initialize_model(self.runtime, self.invoke_pipeline_step, local)
 
         outputs, image = self.invoke_pipeline_step(
             lambda: self.prepare_image(file_path, model, device),
@@ -70,11 +89,19 @@ class TableDetector(object):
 
 
     @staticmethod
-    def load_table_detection_model():
-        model = AutoModelForObjectDetection.from_pretrained("microsoft/table-transformer-detection", revision="no_timm")
+    def load_table_detection_model(quantized=False):
+        model = AutoModelForObjectDetection.from_pretrained(TABLE_DETECTION_MODEL,
+                                                            revision=TABLE_DETECTION_MODEL_REVISION)
 
         device = "cuda" if torch.cuda.is_available() else "cpu"
         model.to(device)
+        model.eval()
+
+        if quantized and device == "cpu":
+            # Linear layers (transformer encoder/decoder and prediction heads) dominate CPU time,
+            # dynamic quantization stores their weights in int8 and quantizes activations on the fly
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            print("Table detection model quantized to int8 for CPU inference.")
 
         return model, device
 
@@ -127,7 +154,8 @@ class TableDetector(object):
                 if debug:
                     print("Table detected in:", file_path, "-", i + 1)
 
-                cropped_table = table_crop['image'].convert("RGB")
+                # Crops of the RGB page image are already RGB, no conversion copy needed
+                cropped_table = table_crop['image']
                 cropped_tables.append(cropped_table)
 
                 if debug_dir:
@@ -137,7 +165,7 @@ class TableDetector(object):
             if debug:
                 print("Table detected in: ", file_path)
 
-            cropped_table = tables_crops[0]['image'].convert("RGB")
+            cropped_table = tables_crops[0]['image']
             cropped_tables.append(cropped_table)
 
             if debug_dir:
@@ -264,6 +292,86 @@ class TableDetector(object):
         return ret
 
 
+def benchmark_table_detection(file_paths=None, runs=3, iou_threshold=0.9):
+    """
+    Compares the int8 CPU table detection model with the fp32 model on sample pages.
+
+    Both runtimes load the pretrained table detection model. Checks accuracy parity
+    (same tables detected, bounding boxes matched by IoU) and measures latency and
+    throughput of both models.
+
+    Args:
+        file_paths: List of sample page image paths, the recorded BENCHMARK_PAGES by default
+        runs: Number of timed runs over all pages per model
+        iou_threshold: Minimum IoU for a table to be considered the same detection
+
+    Returns:
+        dict: Parity and timing results, without int8 results, parity and speedup when CUDA is available
+    """
+    file_paths = file_paths or BENCHMARK_PAGES
+    table_detector = TableDetector()
+    detection_class_thresholds = {"table": 0.5, "table rotated": 0.5, "no object": 10}
+
+    def detect(model, device, file_path):
+        outputs, image = table_detector.prepare_image(file_path, model, device)
+        objects = table_detector.identify_tables(model, outputs, image)
+        return [obj for obj in objects if obj['score'] >= detection_class_thresholds[obj['label']]]
+
+    def iou(box_a, box_b):
+        x_a, y_a = max(box_a[0], box_b[0]), max(box_a[1], box_b[1])
+        x_b, y_b = min(box_a[2], box_b[2]), min(box_a[3], box_b[3])
+        inter_area = max(0, x_b - x_a) * max(0, y_b - y_a)
+        area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+        area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+        union_area = area_a + area_b - inter_area
+        return inter_area / union_area if union_area > 0 else 0
+
+    results = {"model": f"{TABLE_DETECTION_MODEL}@{TABLE_DETECTION_MODEL_REVISION}"}
+    detections = {}
+    for runtime, quantized in [("fp32", False), ("int8", True)]:
+        model, device = TableDetector.load_table_detection_model(quantized=quantized)
+
+        if quantized and device != "cpu":
+            # The model is quantized for CPU only, on other devices this run would time fp32 again
+            print(f"Skipping int8 benchmark, int8 quantization is used on CPU only (device: {device})")
+            results["int8"] = {"skipped": f"int8 runs on CPU only, device is {device}"}
+            return results
+
+        # Warm-up run, not included in timings
+        detections[runtime] = [detect(model, device, file_path) for file_path in file_paths]
+
+        start_time = time.perf_counter()
+        for _ in range(runs):
+            for file_path in file_paths:
+                detect(model, device, file_path)
+        elapsed = time.perf_counter() - start_time
+
+        results[runtime] = {
+            "avg_latency_ms": round(elapsed / (runs * len(file_paths)) * 1000, 2),
+            "pages_per_second": round(runs * len(file_paths) / elapsed, 2)
+        }
+
+    pages_matched = 0
+    for file_path, fp32_objects, int8_objects in zip(file_paths, detections["fp32"], detections["int8"]):
+        matched = len(fp32_objects) == len(int8_objects) and all(
+            any(obj['label'] == other['label'] and iou(obj['bbox'], other['bbox']) >= iou_threshold
+                for other in int8_objects)
+            for obj in fp32_objects
+        )
+        pages_matched += int(matched)
+        if not matched:
+            print(f"Detection mismatch for {file_path}: fp32={fp32_objects}, int8={int8_objects}")
+
+    results["parity"] = {
+        "pages": len(file_paths),
+        "pages_matched": pages_matched,
+        "parity": pages_matched == len(file_paths)
+    }
+    results["speedup"] = round(results["fp32"]["avg_latency_ms"] / results["int8"]["avg_latency_ms"], 2)
+
+    return results
+
+
 if __name__ == "__main__":
     table_detector = TableDetector()
 
@@ -272,4 +380,9 @@ if __name__ == "__main__":
 
     # for i, cropped_table in enumerate(cropped_tables):
     #     file_name_table = table_detector.append_filename(file_path, "cropped_" + str(i))
-    #     cropped_table.save(file_name_table)
\ No newline at end of file
+    #     cropped_table.save(file_name_table)
+
+    # Compare int8 CPU model with fp32 model on the recorded sample pages
+    # run from sparrow-data/parse: python -m sparrow_parse.processors.table_structure_processor
+    results = benchmark_table_detection()
+    print(results)
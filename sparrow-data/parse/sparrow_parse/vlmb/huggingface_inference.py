@@ -3,6 +3,8 @@ from sparrow_parse.vlmb.inference_base import ModelInference
 import json
 import os
 import ast
+import tempfile
+import shutil
 
 
 class HuggingFaceInference(ModelInference):
@@ -33,28 +35,38 @@ class HuggingFaceInference(ModelInference):
 
         client = Client(self.hf_space, hf_token=self.hf_token)
 
+        # Gradio client uploads files, in-memory images (e.g. table crops) are written to a temporary folder
+        temp_dir = tempfile.mkdtemp()
+
         # Extract and prepare the absolute paths for all file paths in input_data
-        file_paths = [
-            os.path.abspath(file_path)
-            for data in input_data
-            for file_path in data["file_path"]
-        ]
+        file_paths = []
+        for data in input_data:
+            for i, file_path in enumerate(data["file_path"]):
+                if not isinstance(file_path, str):
+                    image_path = os.path.join(temp_dir, f"image_{i + 1}.png")
+                    file_path.save(image_path)
+                    file_path = image_path
+                file_paths.append(os.path.abspath(file_path))
 
         # Validate file existence and prepare files for the Gradio client
-        image_files = [handle_file(path) for path in file_paths if os.path.exists(path)]
+        existing = [index for index, path in enumerate(file_paths) if os.path.exists(path)]
+        image_files = [handle_file(file_paths[index]) for index in existing]
 
-        results = client.predict(
-            input_imgs=image_files,
-            text_input=input_data[0]["text_input"],  # Single shared text input for all images
-            api_name="/run_inference"  # Specify the Gradio API endpoint
-        )
+        try:
+            results = client.predict(
+                input_imgs=image_files,
+                text_input=input_data[0]["text_input"],  # Single shared text input for all images
+                api_name="/run_inference"  # Specify the Gradio API endpoint
+            )
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
         # Convert the string into a Python list
         parsed_results = ast.literal_eval(results)
 
-        results_array = []
-        for page_output in parsed_results:
-            page_result = self.process_response(page_output)
-            results_array.append(page_result)
+        # One result per input file, missing files get an error placeholder
+        results_array = [self.error_response(f"File does not exist: {path}") for path in file_paths]
+        for index, page_output in zip(existing, parsed_results):
+            results_array[index] = self.process_response(page_output)
 
         return results_array
\ No newline at end of file
@@ -1,5 +1,12 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 import json
+import os
+
+
+# Parallel requests for text-only batches sent to remote API backends (Ollama, Mistral)
+TEXT_INFERENCE_WORKERS = int(os.getenv("SPARROW_TEXT_INFERENCE_WORKERS", "4"))
 
 
 class ModelInference(ABC):
@@ -28,3 +35,33 @@ class ModelInference(ABC):
         # Convert the dictionary to a JSON string
         json_data = json.dumps(data, indent=4)
         return json_data
+
+    @staticmethod
+    def error_response(message):
+        """
+        Placeholder result for an input that failed, backends return one result per input
+        so callers can map results back to their inputs.
+        """
+        return json.dumps({"message": message, "valid": "false"})
+
+    @staticmethod
+    def generate_text_responses(input_data, generate_func, concurrent=False):
+        """
+        Runs text-only inference for every input_data item, results keep the input order.
+        With concurrent enabled, requests run in parallel on up to TEXT_INFERENCE_WORKERS threads.
+        """
+        text_inputs = [item["text_input"] for item in input_data]
+        if not concurrent or len(text_inputs) == 1:
+            return [generate_func(text_input) for text_input in text_inputs]
+
+        with ThreadPoolExecutor(max_workers=max(1, min(TEXT_INFERENCE_WORKERS, len(text_inputs)))) as executor:
+            return list(executor.map(generate_func, text_inputs))
+
+    @staticmethod
+    def image_to_bytes(image, image_format="PNG"):
+        """
+        Encodes an in-memory PIL image (e.g. a table crop) for backends that expect image bytes.
+        """
+        buffer = BytesIO()
+        image.save(buffer, format=image_format)
+        return buffer.getvalue()
@@ -87,10 +87,8 @@ class MistralInference(ModelInference):
         is_text_only = input_data[0].get("file_path") is None
 
         if is_text_only:
-            # Text-only inference
-            messages = input_data[0]["text_input"]
-            response = self._generate_text_response(messages)
-            results = [response]
+            # Text-only inference, one response per input, requests to the Mistral API run in parallel
+            results = self.generate_text_responses(input_data, self._generate_text_response, concurrent=True)
         else:
             # Image-based inference
             file_paths = self._extract_file_paths(input_data)
@@ -129,7 +127,7 @@ class MistralInference(ModelInference):
         """
         Run Mistral on each image and collect the output.
 
-        :param file_paths: List of absolute image file paths to process.
+        :param file_paths: List of absolute image file paths or in-memory PIL images to process.
         :param messages: Prompt/text input associated with the request.
         :param apply_annotation: Flag reserved for annotation output (currently unused).
         :param ocr_callback: Optional callback for post-processing OCR output (currently unused).
@@ -138,9 +136,12 @@ class MistralInference(ModelInference):
 
         results = []
         for file_path in file_paths:
-            # Load and encode image
-            with open(file_path, "rb") as f:
-                image_data = base64.b64encode(f.read()).decode("utf-8")
+            # Load and encode image, in-memory images (e.g. table crops) are encoded directly
+            if isinstance(file_path, str):
+                with open(file_path, "rb") as f:
+                    image_data = base64.b64encode(f.read()).decode("utf-8")
+            else:
+                image_data = base64.b64encode(self.image_to_bytes(file_path)).decode("utf-8")
 
             # Step 1: OCR
             ocr_response = self.client.ocr.process(
@@ -185,7 +186,7 @@ class MistralInference(ModelInference):
             # Process the raw response
             processed_response = self.process_response(chat_response.choices[0].message.content)
             results.append(processed_response)
-            print(f"Inference completed successfully for: {file_path}")
+            print(f"Inference completed successfully for: {file_path if isinstance(file_path, str) else 'in-memory image'}")
 
         return results
 
@@ -196,10 +197,10 @@ class MistralInference(ModelInference):
         Extract and resolve absolute file paths from input data.
 
         :param input_data: List of dictionaries containing image file paths.
-        :return: List of absolute file paths.
+        :return: List of absolute file paths, in-memory images are passed through as is.
         """
         return [
-            os.path.abspath(file_path)
+            os.path.abspath(file_path) if isinstance(file_path, str) else file_path
             for data in input_data
             for file_path in data.get("file_path", [])
         ]
\ No newline at end of file
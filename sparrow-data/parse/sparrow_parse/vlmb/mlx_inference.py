@@ -4,6 +4,7 @@ from mlx_vlm.utils import load_image, load_config
 from sparrow_parse.vlmb.inference_base import ModelInference
 import os
 import json, re
+import threading
 from rich import print
 
 
@@ -20,9 +21,22 @@ class MLXInference(ModelInference):
         :param model_name: Name of the model to load.
         """
         self.model_name = model_name
+        # Model, processor and config, loaded on first inference and reused by later calls
+        self._loaded_model = None
+        self._load_lock = threading.Lock()
         print(f"MLXInference initialized for model: {model_name}")
 
 
+    def _get_model(self):
+        """
+        Return the model, processor and config of this instance, loading them on first use.
+        """
+        with self._load_lock:
+            if self._loaded_model is None:
+                self._loaded_model = self._load_model(self.model_name)
+            return self._loaded_model
+
+
     @staticmethod
     def _load_model(model_name):
         """
@@ -87,8 +101,9 @@ class MLXInference(ModelInference):
         """
         Load and resize image while maintaining its aspect ratio.
         Returns both original and resized dimensions for coordinate mapping.
+        Accepts a file path or an in-memory PIL image.
         """
-        image = load_image(image_filepath)
+        image = load_image(image_filepath) if isinstance(image_filepath, str) else image_filepath
         orig_width, orig_height = image.size
 
         # Calculate new dimensions while maintaining the aspect ratio
@@ -152,17 +167,16 @@ class MLXInference(ModelInference):
         if mode == "static":
             return [self.get_simple_json()]
 
-        # Load the model and processor
-        model, processor, config = self._load_model(self.model_name)
+        # Load the model and processor once, later calls reuse them
+        model, processor, config = self._get_model()
         
         # Determine if we're doing text-only or image-based inference
         is_text_only = input_data[0].get("file_path") is None
         
         if is_text_only:
-            # Text-only inference
-            messages = input_data[0]["text_input"]
-            response = self._generate_text_response(model, processor, config, messages)
-            results = [response]
+            # Text-only inference, one response per input
+            results = self.generate_text_responses(
+                input_data, lambda messages: self._generate_text_response(model, processor, config, messages))
         else:
             # Image-based inference
             file_paths = self._extract_file_paths(input_data)
@@ -246,7 +260,7 @@ class MLXInference(ModelInference):
                     # Keep the original response if JSON parsing fails
 
             results.append(processed_response)
-            print(f"Inference completed successfully for: {file_path}")
+            print(f"Inference completed successfully for: {file_path if isinstance(file_path, str) else 'in-memory image'}")
 
         return results
 
@@ -383,10 +397,10 @@ class MLXInference(ModelInference):
         Extract and resolve absolute file paths from input data.
 
         :param input_data: List of dictionaries containing image file paths.
-        :return: List of absolute file paths.
+        :return: List of absolute file paths, in-memory images are passed through as is.
         """
         return [
-            os.path.abspath(file_path)
+            os.path.abspath(file_path) if isinstance(file_path, str) else file_path
             for data in input_data
             for file_path in data.get("file_path", [])
         ]
\ No newline at end of file
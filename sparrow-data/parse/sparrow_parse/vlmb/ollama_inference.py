@@ -92,10 +92,8 @@ class OllamaInference(ModelInference):
         is_text_only = input_data[0].get("file_path") is None
 
         if is_text_only:
-            # Text-only inference
-            messages = input_data[0]["text_input"]
-            response = self._generate_text_response(messages)
-            results = [response]
+            # Text-only inference, one response per input, requests to the Ollama server run in parallel
+            results = self.generate_text_responses(input_data, self._generate_text_response, concurrent=True)
         else:
             # Image-based inference
             file_paths = self._extract_file_paths(input_data)
@@ -131,14 +129,22 @@ class OllamaInference(ModelInference):
     def _process_images(self, file_paths, input_data, apply_annotation, ocr_callback):
         """
         Process images and generate responses for each.
+        Accepts file paths and in-memory PIL images (e.g. table crops).
+        Returns one result per image, failed images get an error placeholder.
         """
         results = []
         for file_path in file_paths:
             try:
-                # Check if file exists
-                if not os.path.exists(file_path):
-                    print(f"Warning: File does not exist: {file_path}")
-                    continue
+                if isinstance(file_path, str):
+                    # Check if file exists
+                    if not os.path.exists(file_path):
+                        print(f"Warning: File does not exist: {file_path}")
+                        results.append(self.error_response(f"File does not exist: {file_path}"))
+                        continue
+                    image = file_path
+                else:
+                    # Ollama accepts raw image bytes
+                    image = self.image_to_bytes(file_path)
 
                 # Prepare messages based on model type
                 messages = self._prepare_messages(file_path, input_data, apply_annotation, ocr_callback)
@@ -150,7 +156,7 @@ class OllamaInference(ModelInference):
                     # Find the last user message and add images
                     for msg in reversed(ollama_messages):
                         if msg['role'] == 'user':
-                            msg['images'] = [file_path]
+                            msg['images'] = [image]
                             break
                 else:
                     # For other models: messages is a string, wrap in standard message format
@@ -158,7 +164,7 @@ class OllamaInference(ModelInference):
                         {
                             'role': 'user',
                             'content': messages,
-                            'images': [file_path]
+                            'images': [image]
                         }
                     ]
 
@@ -172,12 +178,13 @@ class OllamaInference(ModelInference):
                 processed_response = self.process_response(response['message']['content'])
 
                 results.append(processed_response)
-                print(f"Inference completed successfully for: {file_path}")
+                print(f"Inference completed successfully for: {file_path if isinstance(file_path, str) else 'in-memory image'}")
 
             except Exception as e:
-                print(f"Error processing image {file_path}: {e}")
-                # Continue processing other images instead of failing completely
-                continue
+                print(f"Error processing image: {e}")
+                # Continue processing other images instead of failing completely, the placeholder keeps
+                # results aligned with the inputs
+                results.append(self.error_response(f"Error processing image: {e}"))
 
         return results
 
@@ -204,10 +211,10 @@ class OllamaInference(ModelInference):
         Extract and resolve absolute file paths from input data.
 
         :param input_data: List of dictionaries containing image file paths.
-        :return: List of absolute file paths.
+        :return: List of absolute file paths, in-memory images are passed through as is.
         """
         return [
-            os.path.abspath(file_path)
+            os.path.abspath(file_path) if isinstance(file_path, str) else file_path
             for data in input_data
             for file_path in data.get("file_path", [])
         ]
\ No newline at end of file
@@ -132,10 +132,8 @@ class VLLMInference(ModelInference):
         is_text_only = input_data[0].get("file_path") is None
 
         if is_text_only:
-            # Text-only inference
-            messages = input_data[0]["text_input"]
-            response = self._generate_text_response(messages)
-            results = [response]
+            # Text-only inference, all inputs are submitted in one batched chat call
+            results = self._generate_text_responses([item["text_input"] for item in input_data])
         else:
             # Image-based inference
             file_paths = self._extract_file_paths(input_data)
@@ -143,20 +141,23 @@ class VLLMInference(ModelInference):
 
         return results
 
-    def _generate_text_response(self, messages):
+    def _generate_text_responses(self, messages_list):
         """
-        Generate a text response for text-only inputs.
+        Generate text responses for text-only inputs in one batched vLLM call.
 
-        :param messages: Input messages
-        :return: Generated response
+        :param messages_list: Input messages, one per response
+        :return: Generated responses, in input order
         """
         try:
-            # vLLM chat format for text-only
-            chat_messages = [
-                {
-                    'role': 'user',
-                    'content': messages
-                }
+            # vLLM chat format for text-only, one conversation per input
+            conversations = [
+                [
+                    {
+                        'role': 'user',
+                        'content': messages
+                    }
+                ]
+                for messages in messages_list
             ]
 
             sampling_params = SamplingParams(
@@ -164,11 +165,10 @@ class VLLMInference(ModelInference):
                 max_tokens=4000
             )
 
-            outputs = self.llm.chat(chat_messages, sampling_params=sampling_params)
-            response = outputs[0].outputs[0].text
+            outputs = self.llm.chat(conversations, sampling_params=sampling_params)
 
             print("Inference completed successfully")
-            return self.process_response(response)
+            return [self.process_response(output.outputs[0].text) for output in outputs]
         except Exception as e:
             print(f"Error during text inference: {e}")
             raise
@@ -176,49 +176,66 @@ class VLLMInference(ModelInference):
     def _process_images(self, file_paths, input_data, apply_annotation, ocr_callback):
         """
         Process images and generate responses for each.
+        All images are submitted to vLLM in one batched chat call.
+        Accepts file paths and in-memory PIL images (e.g. table crops).
+        Returns one result per image, failed images get an error placeholder.
         """
-        results = []
-        for file_path in file_paths:
-            try:
+        # One result per image, failed images keep an error placeholder
+        results = [None] * len(file_paths)
+        conversations = []
+        indices = []
+        image_labels = []
+        for index, file_path in enumerate(file_paths):
+            if isinstance(file_path, str):
                 # Check if file exists
                 if not os.path.exists(file_path):
                     print(f"Warning: File does not exist: {file_path}")
+                    results[index] = self.error_response(f"File does not exist: {file_path}")
                     continue
 
                 # Ensure absolute path
                 file_path = os.path.abspath(file_path)
+                image_content = {"type": "image_url", "image_url": {"url": f"file://{file_path}"}}
+                image_label = file_path
+            else:
+                image_content = {"type": "image_pil", "image_pil": file_path}
+                image_label = "in-memory image"
+
+            # Prepare messages
+            prompt = self._prepare_messages(file_path, input_data, apply_annotation, ocr_callback)
+
+            # Build vLLM chat messages with image
+            conversations.append([{
+                "role": "user",
+                "content": [
+                    image_content,
+                    {"type": "text", "text": prompt}
+                ]
+            }])
+            indices.append(index)
+            image_labels.append(image_label)
+
+        if not conversations:
+            return results
+
+        # Generate responses
+        sampling_params = SamplingParams(
+            temperature=0.0,
+            max_tokens=4000
+        )
 
-                # Prepare messages
-                prompt = self._prepare_messages(file_path, input_data, apply_annotation, ocr_callback)
-
-                # Build vLLM chat messages with image
-                messages = [{
-                    "role": "user",
-                    "content": [
-                        {"type": "image_url", "image_url": {"url": f"file://{file_path}"}},
-                        {"type": "text", "text": prompt}
-                    ]
-                }]
-
-                # Generate response
-                sampling_params = SamplingParams(
-                    temperature=0.0,
-                    max_tokens=4000
-                )
-
-                outputs = self.llm.chat(messages, sampling_params=sampling_params)
-                response = outputs[0].outputs[0].text
-
-                # Process the raw response
-                processed_response = self.process_response(response)
-
-                results.append(processed_response)
-                print(f"Inference completed successfully for: {file_path}")
+        try:
+            outputs = self.llm.chat(conversations, sampling_params=sampling_params)
+        except Exception as e:
+            print(f"Error processing images {image_labels}: {e}")
+            for index in indices:
+                results[index] = self.error_response(f"Error processing image: {e}")
+            return results
 
-            except Exception as e:
-                print(f"Error processing image {file_path}: {e}")
-                # Continue processing other images instead of failing completely
-                continue
+        for index, image_label, output in zip(indices, image_labels, outputs):
+            # Process the raw response
+            results[index] = self.process_response(output.outputs[0].text)
+            print(f"Inference completed successfully for: {image_label}")
 
         return results
 
@@ -245,10 +262,10 @@ class VLLMInference(ModelInference):
         Extract and resolve absolute file paths from input data.
 
         :param input_data: List of dictionaries containing image file paths.
-        :return: List of absolute file paths.
+        :return: List of absolute file paths, in-memory images are passed through as is.
         """
         return [
-            os.path.abspath(file_path)
+            os.path.abspath(file_path) if isinstance(file_path, str) else file_path
             for data in input_data
             for file_path in data.get("file_path", [])
         ]
\ No newline at end of file
@@ -5,6 +5,7 @@ from urllib.parse import urljoin
 import logging
 import configparser
 import json
+import asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,11 @@ backend_url = config.get("settings-medical-prescriptions", "backend_url")
 page_type = config.get("settings-medical-prescriptions", "page_type")
 options_page_type = config.get("settings-medical-prescriptions", "options_page_type")
 
+# Seconds between job status checks
+JOB_POLL_INTERVAL = 2
+# Seconds to wait for a job to finish before giving up, same as the extraction task timeout
+JOB_TIMEOUT = 3600
+
 
 class SparrowClient:
     """
@@ -29,6 +35,39 @@ class SparrowClient:
         self.base_url = base_url
         self.mock_mode = False  # Set to True to return mock data
 
+    async def _run_job(self, form_data: aiohttp.FormData, error_message: str) -> Dict:
+        """
+        Submits an inference job to Sparrow API, polls until it finishes and returns the result.
+        Keeps every HTTP request short, instead of holding one connection open for the whole extraction.
+        Gives up when the job does not finish within JOB_TIMEOUT seconds.
+        """
+        endpoint = urljoin(self.base_url, "/api/v1/sparrow-llm/jobs")
+
+        async with aiohttp.ClientSession() as session:
+            async with session.post(endpoint, data=form_data, timeout=300) as response:
+                if response.status != 202:
+                    error_text = await response.text()
+                    logger.error(f"API call failed: {error_text}")
+                    raise Exception(f"{error_message} with status: {response.status}")
+                job = await response.json()
+
+            result_endpoint = urljoin(self.base_url, job["result_url"])
+            deadline = asyncio.get_running_loop().time() + JOB_TIMEOUT
+            while True:
+                async with session.get(result_endpoint, timeout=60) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    if response.status != 202:
+                        error_text = await response.text()
+                        logger.error(f"API call failed: {error_text}")
+                        raise Exception(f"{error_message} with status: {response.status}")
+
+                if asyncio.get_running_loop().time() >= deadline:
+                    logger.error(f"Job {job.get('job_id')} did not finish in {JOB_TIMEOUT} seconds")
+                    raise Exception(f"{error_message}: job timed out")
+
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+
     @task(name="extract_type_per_page_sparrow", retries=2, timeout_seconds=3600)
     async def extract_type_per_page_sparrow(self, input_data: dict) -> Dict:
         """
@@ -49,9 +88,6 @@ class SparrowClient:
             logger.info("Running in mock mode - returning mock data")
             return {}
 
-        # Prepare the endpoint URL
-        endpoint = urljoin(self.base_url, "/api/v1/sparrow-llm/inference")
-
         try:
             # Prepare form data
             form_data = aiohttp.FormData()
@@ -68,16 +104,8 @@ class SparrowClient:
                                 filename=input_data['filename'],
                                 content_type=input_data['content_type'])
 
-            # Make the API call
-            async with aiohttp.ClientSession() as session:
-                async with session.post(endpoint, data=form_data, timeout=3600) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"API call failed: {error_text}")
-                        raise Exception(
-                            f"Document extraction failed with status: {response.status}")
+            # Run the extraction as a background job
+            return await self._run_job(form_data, "Document extraction failed")
         except Exception as e:
             logger.error(f"Error during API call: {str(e)}")
             raise
@@ -104,9 +132,6 @@ class SparrowClient:
             logger.info("Running in mock mode - returning mock data")
             return {}
 
-        # Prepare the endpoint URL
-        endpoint = urljoin(self.base_url, "/api/v1/sparrow-llm/inference")
-
         try:
             query = params['query']
             options = params['options']
@@ -127,16 +152,8 @@ class SparrowClient:
                                 filename=f'temp_page.png',
                                 content_type='image/png')
 
-            # Make the API call
-            async with aiohttp.ClientSession() as session:
-                async with session.post(endpoint, data=form_data, timeout=3600) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"API call failed: {error_text}")
-                        raise Exception(
-                            f"Data extraction failed with status: {response.status}")
+            # Run the extraction as a background job
+            return await self._run_job(form_data, "Data extraction failed")
         except Exception as e:
             logger.error(f"Error during API call: {str(e)}")
             raise
\ No newline at end of file
@@ -0,0 +1,192 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from config_utils import get_config
+
+
+class QueueFullError(Exception):
+    """Raised when a model queue is full and the request should be retried later."""
+
+    def __init__(self, queue_key: str, retry_after: int):
+        self.queue_key = queue_key
+        self.retry_after = retry_after
+        super().__init__(f"Too many requests queued for '{queue_key}'. Retry after {retry_after} seconds.")
+
+
+class ModelQueue:
+    """
+    Admission control for a single backend/model. Runs up to `concurrency` requests at once,
+    keeps at most `max_queue_size` waiting and rejects the rest. Waiting requests are grouped
+    per tenant and served round-robin, so one tenant's burst can't starve the others.
+    """
+
+    def __init__(self, queue_key: str, concurrency: int, max_queue_size: int, tenant_queue_size: int,
+                 default_service_time: float):
+        self.queue_key = queue_key
+        self.concurrency = concurrency
+        self.max_queue_size = max_queue_size
+        self.tenant_queue_size = tenant_queue_size
+        self.running = 0
+        self.queued = 0
+        self.waiters = OrderedDict()  # tenant -> deque of futures, in round-robin order
+
+        # Metrics
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.service_time_avg = default_service_time
+
+    @asynccontextmanager
+    async def slot(self, tenant: str):
+        """
+        Waits for a processing slot for the tenant and releases it when the block exits.
+
+        Raises:
+            QueueFullError: If the model queue or the tenant share of it is full
+        """
+        await self.acquire(tenant)
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start_time)
+
+    async def acquire(self, tenant: str):
+        if self.running < self.concurrency and self.queued == 0:
+            self.running += 1
+            self._record_admission(0.0)
+            return
+
+        tenant_waiters = self.waiters.get(tenant)
+        if self.queued >= self.max_queue_size or \
+                (tenant_waiters is not None and len(tenant_waiters) >= self.tenant_queue_size):
+            self.rejected += 1
+            raise QueueFullError(self.queue_key, self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(tenant, deque()).append(future)
+        self.queued += 1
+        wait_start = time.monotonic()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before the client went away, hand it to the next request
+                self.release(None)
+            else:
+                self._remove_waiter(tenant, future)
+            raise
+
+        self._record_admission(time.monotonic() - wait_start)
+
+    def release(self, service_time):
+        self.running -= 1
+        if service_time is not None:
+            # Exponential moving average, used to estimate Retry-After
+            self.service_time_avg = 0.8 * self.service_time_avg + 0.2 * service_time
+        self._dispatch()
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a queue position frees up."""
+        return max(1, math.ceil(self.service_time_avg * (self.queued + 1) / self.concurrency))
+
+    def metrics(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue_size": self.max_queue_size,
+            "running": self.running,
+            "queue_depth": self.queued,
+            "queued_tenants": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_time_avg": round(self.wait_time_total / self.admitted, 3) if self.admitted else 0.0,
+            "wait_time_max": round(self.wait_time_max, 3),
+            "service_time_avg": round(self.service_time_avg, 3)
+        }
+
+    def _dispatch(self):
+        while self.running < self.concurrency and self.waiters:
+            tenant, tenant_waiters = next(iter(self.waiters.items()))
+            future = tenant_waiters.popleft()
+            self.queued -= 1
+
+            # Move the tenant to the back of the line, or drop it when it has nothing left queued
+            if tenant_waiters:
+                self.waiters.move_to_end(tenant)
+            else:
+                del self.waiters[tenant]
+
+            if future.done():
+                continue
+
+            self.running += 1
+            future.set_result(None)
+
+    def _remove_waiter(self, tenant, future):
+        tenant_waiters = self.waiters.get(tenant)
+        if tenant_waiters is None or future not in tenant_waiters:
+            return
+
+        tenant_waiters.remove(future)
+        self.queued -= 1
+        if not tenant_waiters:
+            del self.waiters[tenant]
+
+    def _record_admission(self, wait_time):
+        self.admitted += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+
+
+class AdmissionScheduler:
+    """
+    Per backend/model request queues in front of the inference engine. Limits are read from the
+    [scheduler] config section, `<backend>_concurrency` and `<backend>_queue_size` override the defaults.
+    """
+
+    def __init__(self):
+        self.queues = {}
+
+    def get_queue(self, backend: str, model_name: str = None) -> ModelQueue:
+        backend = (backend or "default").lower()
+        queue_key = f"{backend}:{model_name}" if model_name else backend
+
+        queue = self.queues.get(queue_key)
+        if queue is None:
+            config = get_config()
+            concurrency = config.get_int('scheduler', f'{backend}_concurrency',
+                                         config.get_int('scheduler', 'default_concurrency', 1))
+            max_queue_size = config.get_int('scheduler', f'{backend}_queue_size',
+                                            config.get_int('scheduler', 'default_queue_size', 10))
+            tenant_queue_size = config.get_int('scheduler', 'tenant_queue_size', max_queue_size)
+            default_service_time = config.get_float('scheduler', 'default_service_time', 30.0)
+
+            queue = ModelQueue(queue_key, max(1, concurrency), max(0, max_queue_size), max(1, tenant_queue_size),
+                               default_service_time)
+            self.queues[queue_key] = queue
+
+        return queue
+
+    def slot(self, backend: str, model_name: str, tenant: str):
+        """Async context manager holding a processing slot for the backend/model."""
+        return self.get_queue(backend, model_name).slot(tenant or "anonymous")
+
+    def metrics(self) -> dict:
+        return {queue_key: queue.metrics() for queue_key, queue in self.queues.items()}
+
+
+_scheduler = None
+
+
+def get_scheduler() -> AdmissionScheduler:
+    """Get the process-wide admission scheduler. Used from the event loop thread only."""
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = AdmissionScheduler()
+
+    return _scheduler
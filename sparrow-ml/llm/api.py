@@ -1,5 +1,6 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from engine import run_from_api_engine, run_from_api_engine_instruction
 import uvicorn
 import warnings
@@ -11,9 +12,23 @@ from rich import print
 from config_utils import get_config
 import time
 import tempfile
-import os
 import db_pool
+import asyncio
+import shutil
 from contextlib import asynccontextmanager
+from pipeline_executors import shutdown_pipeline_executors
+from admission_control import get_scheduler, QueueFullError
+from job_store import get_job_store
+from uploads import save_upload, get_pdf_page_count
+from pipelines.model_cache import ModelCache
+from pipelines.inference_pool import get_inference_worker_pool
+from preload import preload_models, readiness
+from key_usage import get_key_usage_tracker, flush_key_usage_periodically, UnknownKeyError, UsageLimitExceededError
+from inference_log import get_inference_log_writer
+from key_lease import get_key_lease_cache, reconcile_key_leases_periodically
+from json_response import SparrowJSONResponse
+import metrics
+from metrics import MetricFamily, record_inference, record_request_error
 
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -27,8 +42,8 @@ load_dotenv()
 # Get config instance
 config = get_config()
 
-# Global model cache
-model_cache = {}
+# Global model cache for backends running in the API process, bounded by the [model_cache] config section
+model_cache = ModelCache.from_config()
 
 
 @asynccontextmanager
@@ -38,13 +53,58 @@ async def lifespan(app: FastAPI):
     This replaces the deprecated on_event handlers.
     """
     # Initialize resources on startup
-    db_pool.initialize_connection_pool()
+    await db_pool.initialize_connection_pool_async()
     print("Database connection pool initialized")
 
+    # Inference logs are queued by requests and written in batches by a background thread
+    get_inference_log_writer().start()
+
+    # Preload and warm up configured models in the background, readiness is reported until it completes
+    preload_task = asyncio.create_task(preload_models(model_cache))
+
+    # Config key usage is counted per request and flushed to config.properties periodically
+    key_usage_task = None
+    if uses_config_keys():
+        key_usage_task = asyncio.create_task(flush_key_usage_periodically(
+            get_key_usage_tracker(), config.get_float('key_usage', 'flush_interval', 30)))
+
+    # Database keys are validated against calls leased in blocks, unused calls of expired leases are given back
+    key_lease_task = None
+    if uses_database_keys():
+        key_lease_task = asyncio.create_task(reconcile_key_leases_periodically(
+            get_key_lease_cache(), config.get_float('key_cache', 'reconcile_interval', 5)))
+
     yield  # Application runs here
 
-    # Clean up resources on shutdown
-    db_pool.close_connection_pool()
+    if not preload_task.done():
+        preload_task.cancel()
+
+    # Unfinished background jobs are cancelled, their uploads are removed as the tasks unwind
+    job_tasks = get_job_store().pending_tasks()
+    for task in job_tasks:
+        task.cancel()
+    if job_tasks:
+        await asyncio.gather(*job_tasks, return_exceptions=True)
+        print(f"Cancelled {len(job_tasks)} unfinished jobs")
+
+    if key_usage_task is not None:
+        key_usage_task.cancel()
+        await asyncio.to_thread(get_key_usage_tracker().flush)
+        print("Key usage flushed")
+
+    if key_lease_task is not None:
+        key_lease_task.cancel()
+        await asyncio.to_thread(get_key_lease_cache().close)
+        print("Key leases released")
+
+    # Clean up resources on shutdown, waiting for running pipeline work off the event loop
+    await asyncio.to_thread(shutdown_pipeline_executors)
+    print("Pipeline executors shut down")
+
+    await asyncio.to_thread(get_inference_log_writer().close)
+    print("Inference logs flushed")
+
+    await db_pool.close_connection_pool_async()
     print("Database connection pool closed")
 
 
@@ -69,9 +129,126 @@ def root():
     return {"message": "Sparrow LLM API"}
 
 
+@app.get("/api/v1/sparrow-llm/health/live", tags=["Monitoring"])
+async def liveness():
+    """Liveness probe, the API process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/api/v1/sparrow-llm/health/ready", tags=["Monitoring"])
+async def readiness_probe():
+    """Readiness probe, returns 503 until configured models are preloaded and warmed up."""
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.to_dict())
+
+
+@app.get("/api/v1/sparrow-llm/scheduler", tags=["Monitoring"])
+async def scheduler_metrics():
+    """Queue depth, wait time and rejection metrics per backend/model."""
+    return get_scheduler().metrics()
+
+
+@app.get("/api/v1/sparrow-llm/models", tags=["Monitoring"])
+async def resident_models():
+    """Models resident in the API process and in inference workers, with load times, hits and estimated sizes."""
+    return {
+        "api_process": {
+            "max_memory_gb": round(model_cache.max_memory_bytes / 1024 ** 3, 2),
+            "max_models": model_cache.max_models,
+            "models": model_cache.stats()
+        },
+        "inference_workers": await asyncio.to_thread(get_inference_worker_pool().stats)
+    }
+
+
+def collect_runtime_metrics(worker_stats) -> list:
+    """
+    Metrics owned by the scheduler, model caches, database pool and inference log writer, read at scrape time.
+
+    Args:
+        worker_stats (list): Inference worker stats, read off the event loop
+
+    Returns:
+        list: MetricFamily objects
+    """
+    queue_depth = MetricFamily("sparrow_queue_depth", "gauge", "Requests waiting for a slot per backend/model")
+    queue_running = MetricFamily("sparrow_queue_running", "gauge", "Requests running per backend/model")
+    queue_admitted = MetricFamily("sparrow_queue_admitted_total", "counter", "Requests admitted per backend/model")
+    queue_rejected = MetricFamily("sparrow_queue_rejected_total", "counter",
+                                  "Requests rejected with 429 per backend/model")
+    for queue_key, queue_metrics in get_scheduler().metrics().items():
+        queue_depth.add(queue_metrics["queue_depth"], queue=queue_key)
+        queue_running.add(queue_metrics["running"], queue=queue_key)
+        queue_admitted.add(queue_metrics["admitted"], queue=queue_key)
+        queue_rejected.add(queue_metrics["rejected"], queue=queue_key)
+
+    # Model caches of the API process and of every inference worker
+    caches = [("api", model_cache.counters(), len(model_cache))]
+    caches += [(worker["worker"], worker.get("cache_counters") or {}, len(worker["models"])) for worker in worker_stats]
+    cache_hits = MetricFamily("sparrow_model_cache_hits_total", "counter", "Model cache hits")
+    cache_misses = MetricFamily("sparrow_model_cache_misses_total", "counter", "Model cache misses, models loaded")
+    cache_evictions = MetricFamily("sparrow_model_cache_evictions_total", "counter", "Models evicted from cache")
+    cache_models = MetricFamily("sparrow_model_cache_models", "gauge", "Models resident in cache")
+    for cache, counters, resident in caches:
+        cache_hits.add(counters.get("hits", 0), cache=cache)
+        cache_misses.add(counters.get("misses", 0), cache=cache)
+        cache_evictions.add(counters.get("evictions", 0), cache=cache)
+        cache_models.add(resident, cache=cache)
+
+    families = [queue_depth, queue_running, queue_admitted, queue_rejected,
+                cache_hits, cache_misses, cache_evictions, cache_models]
+
+    log_stats = get_inference_log_writer().stats()
+    if log_stats["enabled"]:
+        families += [
+            MetricFamily("sparrow_inference_log_queued", "gauge", "Inference log records waiting to be written")
+            .add(log_stats["queued"]),
+            MetricFamily("sparrow_inference_log_dropped_total", "counter",
+                         "Inference log records dropped on a full queue").add(log_stats["dropped"]),
+            MetricFamily("sparrow_inference_log_failed_total", "counter",
+                         "Inference log records that failed to write").add(log_stats["failed"])
+        ]
+
+    if db_pool.database_enabled:
+        pool_stats = db_pool.get_pool_stats()
+        families += [
+            MetricFamily("sparrow_db_pool_busy", "gauge", "Database connections in use").add(pool_stats.get("busy", 0)),
+            MetricFamily("sparrow_db_pool_waiting", "gauge", "Requests waiting for a database connection")
+            .add(pool_stats["waiting"]),
+            MetricFamily("sparrow_db_pool_acquisitions_total", "counter", "Database connections acquired")
+            .add(pool_stats["acquisitions"]),
+            MetricFamily("sparrow_db_pool_timeouts_total", "counter", "Database connection acquisition timeouts")
+            .add(pool_stats["timeouts"]),
+            MetricFamily("sparrow_db_pool_wait_seconds_total", "counter", "Time spent waiting for database connections")
+            .add(pool_stats["wait_seconds_total"])
+        ]
+
+    return families
+
+
+@app.get("/metrics", tags=["Monitoring"])
+async def prometheus_metrics():
+    """Request latency, throughput, queue, model cache, validation and upload metrics in Prometheus format."""
+    worker_stats = await asyncio.to_thread(get_inference_worker_pool().stats)
+    return Response(content=metrics.REGISTRY.render(collect_runtime_metrics(worker_stats)),
+                    media_type=metrics.CONTENT_TYPE)
+
+
+def uses_config_keys() -> bool:
+    """Protected access is validated against keys in config.properties rather than the database."""
+    return (config.get_bool('settings', 'protected_access', False) and
+            not config.get_bool('settings', 'use_database', False))
+
+
+def uses_database_keys() -> bool:
+    """Protected access is validated against keys in the database."""
+    return (config.get_bool('settings', 'protected_access', False) and
+            config.get_bool('settings', 'use_database', False))
+
+
 def validate_key_from_config(config, sparrow_key):
     """
     Validates and increments usage count for a sparrow key using config.
+    Usage is counted in memory by the key usage tracker and flushed to the config file periodically.
 
     Args:
         config: Configuration object containing sparrow keys
@@ -83,33 +260,17 @@ def validate_key_from_config(config, sparrow_key):
     Raises:
         HTTPException: If key is invalid, disabled, or exceeded usage limit
     """
-    # Get all Sparrow keys
-    sparrow_keys = config.get_sparrow_keys()
-
-    # Validate and log usage
-    key_found = False
-    for key_name, data in sparrow_keys.items():
-        if data['value'] == sparrow_key:
-            key_found = True
-
-            # Check if usage is within the allowed limit
-            usage_count = data.get('usage_count', 0)
-            usage_limit = data.get('usage_limit', float('inf'))  # Default to no limit if not set
-
-            if usage_count >= usage_limit:
-                raise HTTPException(
-                    status_code=403,
-                    detail=f"Usage limit exceeded for key '{sparrow_key}'. Allowed limit: {usage_limit}."
-                )
-
-            # Increment the usage count
-            config.update_key_usage(key_name, usage_count + 1)
-            return True
-
-    if not key_found:
+    try:
+        get_key_usage_tracker().acquire(sparrow_key)
+    except UnknownKeyError:
         raise HTTPException(status_code=403, detail="Protected access. Pipeline not allowed.")
+    except UsageLimitExceededError as e:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Usage limit exceeded for key '{sparrow_key}'. Allowed limit: {e.usage_limit}."
+        )
 
-    return False
+    return True
 
 
 def parse_optional_int(value: Optional[str]) -> Optional[int]:
@@ -122,6 +283,124 @@ def parse_optional_int(value: Optional[str]) -> Optional[int]:
         raise ValueError("Invalid integer value provided")
 
 
+async def check_protected_access(sparrow_key: Optional[str]):
+    """
+    Validates the Sparrow key when protected access is enabled, using the database or config keys.
+
+    Raises:
+        HTTPException: If key is missing, invalid, disabled, or exceeded usage limit
+    """
+    protected_access = config.get_bool('settings', 'protected_access', False)
+    if not protected_access:
+        return
+
+    # Check if key is provided - common for both database and config validation
+    if not sparrow_key:
+        raise HTTPException(
+            status_code=403,
+            detail="Sparrow key is required for protected access."
+        )
+
+    # Check if database is enabled
+    use_database = config.get_bool('settings', 'use_database', False)
+
+    if use_database:
+        # Validate against calls leased from the database, the database is only asked when a lease runs out
+        key_lease_cache = get_key_lease_cache()
+        is_valid = key_lease_cache.acquire_cached(sparrow_key)
+        if is_valid is None:
+            is_valid = await asyncio.to_thread(key_lease_cache.acquire, sparrow_key)
+
+        if not is_valid:
+            raise HTTPException(
+                status_code=403,
+                detail="Invalid, disabled, or usage limit exceeded for key."
+            )
+    else:
+        # Use the config-based validation
+        await asyncio.to_thread(validate_key_from_config, config, sparrow_key)
+
+
+async def refund_protected_access(sparrow_key: Optional[str]):
+    """
+    Gives back the key use counted by check_protected_access, for requests rejected by admission control
+    or by the job limit before they ran.
+    """
+    if not config.get_bool('settings', 'protected_access', False) or not sparrow_key:
+        return
+
+    if config.get_bool('settings', 'use_database', False):
+        await asyncio.to_thread(get_key_lease_cache().refund, sparrow_key)
+    else:
+        await asyncio.to_thread(get_key_usage_tracker().release, sparrow_key)
+
+
+async def get_file_page_count(file_path: Optional[str]) -> int:
+    """Page count of a saved PDF upload, 1 if not a PDF or unable to determine."""
+    if file_path and file_path.lower().endswith('.pdf'):
+        # Page count scan reads the file, run it off the event loop
+        return await asyncio.to_thread(get_pdf_page_count, file_path)
+
+    return 1
+
+
+async def process_inference(pipeline, query, options_arr, crop_size, instruction, validation, ocr, markdown, table,
+                            table_template, page_type_arr, file_path, hints_file_path, debug_dir, debug, sparrow_key,
+                            client_ip, country, page_count, on_start=None):
+    """
+    Runs a document inference request through admission control, inference logging and the engine.
+
+    Raises:
+        QueueFullError: If the backend/model queue is full
+        ValueError: If the engine rejects the request
+    """
+    # Extract the model name from options_arr (4th element if size is >= 4, 2nd if size is 2)
+    model_name = None
+    if options_arr:
+        if len(options_arr) >= 4:
+            model_name = options_arr[3]
+        elif len(options_arr) == 2:
+            model_name = options_arr[1]
+
+    # Wait for a slot on the backend/model, fails fast with 429 when its queue is full
+    backend = options_arr[0] if options_arr else pipeline
+    async with get_scheduler().slot(backend, model_name, sparrow_key or client_ip):
+        if on_start is not None:
+            on_start()
+
+        # Queue the start of inference processing, written to the database in the background
+        log_id = get_inference_log_writer().log_start(
+            client_ip=client_ip,
+            country_name=country,
+            sparrow_key=sparrow_key,
+            page_count=page_count,
+            model_name=model_name,
+            inference_type='DATA_EXTRACTION',
+            source='UI'
+        )
+
+        # Start timing
+        start_time = time.time()
+
+        # Call the engine to process the request
+        try:
+            answer = await run_from_api_engine(pipeline, query, options_arr, crop_size, instruction, validation, ocr,
+                                               markdown, table, table_template, page_type_arr, file_path,
+                                               hints_file_path, debug_dir, debug, model_cache)
+        except Exception:
+            record_request_error(pipeline, backend, model_name)
+            raise
+
+        # Calculate duration
+        duration = time.time() - start_time
+
+        # Update the record with actual duration
+        get_inference_log_writer().update_duration(log_id, duration)
+        record_inference(pipeline, backend, model_name, page_count, duration)
+
+    return answer
+
+
 @app.post("/api/v1/sparrow-llm/inference", tags=["LLM Inference"])
 async def inference(
         query: Annotated[str, Form()],
@@ -137,6 +416,7 @@ async def inference(
         page_type: Annotated[Optional[str], Form()] = None,
         debug_dir: Annotated[Optional[str], Form()] = None,
         debug: Annotated[Optional[bool], Form()] = False,
+        pretty: Annotated[Optional[bool], Form()] = False,
         sparrow_key: Annotated[Optional[str], Form()] = None,
         client_ip: Annotated[Optional[str], Form()] = "127.0.0.1",  # Default to localhost
         country: Annotated[Optional[str], Form()] = "Unknown",      # Default to Unknown
@@ -148,101 +428,29 @@ async def inference(
     except ValueError:
         raise HTTPException(status_code=422, detail="crop_size must be a valid integer or empty")
 
-    protected_access = config.get_bool('settings', 'protected_access', False)
-    if protected_access:
-        # Check if key is provided - common for both database and config validation
-        if not sparrow_key:
-            raise HTTPException(
-                status_code=403,
-                detail="Sparrow key is required for protected access."
-            )
-
-        # Check if database is enabled
-        use_database = config.get_bool('settings', 'use_database', False)
-
-        if use_database:
-            # Use the database function to validate and increment the key
-            is_valid = db_pool.validate_and_increment_key(sparrow_key)
-
-            if not is_valid:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Invalid, disabled, or usage limit exceeded for key."
-                )
-        else:
-            # Use the config-based validation
-            validate_key_from_config(config, sparrow_key)
+    await check_protected_access(sparrow_key)
 
     options_arr = [param.strip() for param in options.split(',')] if options is not None else None
     page_type_arr = [param.strip() for param in page_type.split(',')] if options is not None and page_type else None
 
     try:
-        # Calculate page count if file is a PDF
-        page_count = 1  # Default to 1 if not a PDF or unable to determine
-
-        if file and file.filename and file.filename.lower().endswith('.pdf'):
-            # Create a temporary file to analyze
-            temp_file = tempfile.NamedTemporaryFile(delete=False)
-            try:
-                # Read the file content into memory
-                file_content = await file.read()
-                temp_file.write(file_content)
-                temp_file.flush()
-
-                # Rewind the file for the API
-                await file.seek(0)
-
-                # Use PyPDF2 to get the page count
-                import pypdf
-                with open(temp_file.name, 'rb') as pdf_file:
-                    pdf_reader = pypdf.PdfReader(pdf_file)
-                    page_count = len(pdf_reader.pages)
-            except Exception as e:
-                print(f"Error determining PDF page count: {str(e)}")
-                # Continue with default page_count=1
-            finally:
-                # Close and remove the temporary file
-                temp_file.close()
-                try:
-                    os.unlink(temp_file.name)
-                except:
-                    pass
-
-        # Extract the model name from options_arr (4th element if size is >= 4, 2nd if size is 2)
-        model_name = None
-        if options_arr:
-            if len(options_arr) >= 4:
-                model_name = options_arr[3]
-            elif len(options_arr) == 2:
-                model_name = options_arr[1]
-
-        # Log the start of inference processing and get the ID
-        log_id = db_pool.log_inference_start(
-            client_ip=client_ip,
-            country_name=country,
-            sparrow_key=sparrow_key,
-            page_count=page_count,
-            model_name=model_name,
-            inference_type='DATA_EXTRACTION',
-            source='UI'
-        )
-
-        # Start timing
-        start_time = time.time()
-
-        # Call the engine to process the request
-        answer = await run_from_api_engine(pipeline, query, options_arr, processed_crop_size, instruction, validation,
-                                           ocr, markdown, table, table_template, page_type_arr, file, hints_file,
-                                           debug_dir, debug, model_cache)
-
-        # Calculate duration
-        duration = time.time() - start_time
-
-        # Update the record with actual duration
-        db_pool.update_inference_duration(log_id, duration)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Uploads are streamed to disk once, the saved files are shared by page counting and the pipeline
+            file_path = await save_upload(file, temp_dir)
+            hints_file_path = await save_upload(hints_file, temp_dir)
+            page_count = await get_file_page_count(file_path)
+
+            answer = await process_inference(pipeline, query, options_arr, processed_crop_size, instruction,
+                                             validation, ocr, markdown, table, table_template, page_type_arr,
+                                             file_path, hints_file_path, debug_dir, debug, sparrow_key, client_ip,
+                                             country, page_count)
+    except QueueFullError as e:
+        await refund_protected_access(sparrow_key)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except ValueError as e:
         raise HTTPException(status_code=418, detail=str(e))
 
+    # Pipelines return parsed JSON, text output is only accepted if it is valid JSON
     try:
         if isinstance(answer, (str, bytes, bytearray)):
             answer = json.loads(answer)
@@ -253,7 +461,143 @@ async def inference(
         print(f"\nJSON response:\n")
         print(answer)
 
-    return answer
+    # Serialized once here, compact unless pretty printing is requested
+    return SparrowJSONResponse(answer, pretty=pretty)
+
+
+async def run_inference_job(job, temp_dir, debug, **inference_args):
+    """
+    Runs an inference request in the background and stores the result on the job.
+    The temporary directory with the saved uploads is removed when the job finishes.
+    """
+    try:
+        while True:
+            try:
+                answer = await process_inference(debug=debug, on_start=job.start, **inference_args)
+                break
+            except QueueFullError as e:
+                # Background jobs wait for a slot instead of failing, the job stays queued meanwhile
+                await asyncio.sleep(e.retry_after)
+
+        if isinstance(answer, (str, bytes, bytearray)):
+            try:
+                answer = json.loads(answer)
+            except json.JSONDecodeError:
+                job.fail(418, answer)
+                return
+
+        if debug:
+            print(f"\nJSON response for job {job.job_id}:\n")
+            print(answer)
+
+        job.complete(answer)
+    except asyncio.CancelledError:
+        job.fail(503, "Job cancelled, the server is shutting down")
+        raise
+    except ValueError as e:
+        job.fail(418, str(e))
+    except Exception as e:
+        print(f"Error processing job {job.job_id}: {str(e)}")
+        job.fail(500, str(e))
+    finally:
+        await asyncio.to_thread(shutil.rmtree, temp_dir, True)
+
+
+@app.post("/api/v1/sparrow-llm/jobs", tags=["LLM Inference Jobs"], status_code=202)
+async def submit_inference_job(
+        query: Annotated[str, Form()],
+        pipeline: Annotated[str, Form()],
+        options: Annotated[Optional[str], Form()] = None,
+        crop_size: Annotated[Optional[str], Form()] = None,
+        instruction: Annotated[Optional[bool], Form()] = False,
+        validation: Annotated[Optional[bool], Form()] = False,
+        ocr: Annotated[Optional[bool], Form()] = False,
+        markdown: Annotated[Optional[bool], Form()] = False,
+        table: Annotated[Optional[bool], Form()] = False,
+        table_template: Annotated[Optional[str], Form()] = None,
+        page_type: Annotated[Optional[str], Form()] = None,
+        debug_dir: Annotated[Optional[str], Form()] = None,
+        debug: Annotated[Optional[bool], Form()] = False,
+        sparrow_key: Annotated[Optional[str], Form()] = None,
+        client_ip: Annotated[Optional[str], Form()] = "127.0.0.1",  # Default to localhost
+        country: Annotated[Optional[str], Form()] = "Unknown",      # Default to Unknown
+        file: UploadFile = File(None),
+        hints_file: Optional[UploadFile] = File(None)
+        ):
+    """
+    Submits a document inference job and returns its id right away. Poll the job status,
+    then fetch the result once the job is completed.
+    """
+    try:
+        processed_crop_size = parse_optional_int(crop_size)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="crop_size must be a valid integer or empty")
+
+    await check_protected_access(sparrow_key)
+
+    options_arr = [param.strip() for param in options.split(',')] if options is not None else None
+    page_type_arr = [param.strip() for param in page_type.split(',')] if options is not None and page_type else None
+
+    try:
+        job = get_job_store().create(sparrow_key or client_ip)
+    except ValueError as e:
+        await refund_protected_access(sparrow_key)
+        raise HTTPException(status_code=429, detail=str(e))
+
+    # Uploads are saved once to a temporary directory owned by the job, removed when the job finishes
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = await save_upload(file, temp_dir)
+        hints_file_path = await save_upload(hints_file, temp_dir)
+        page_count = await get_file_page_count(file_path)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        job.fail(500, "Failed to save uploaded files")
+        raise
+
+    job.task = asyncio.create_task(run_inference_job(
+        job, temp_dir, debug, pipeline=pipeline, query=query, options_arr=options_arr,
+        crop_size=processed_crop_size, instruction=instruction, validation=validation, ocr=ocr, markdown=markdown,
+        table=table, table_template=table_template, page_type_arr=page_type_arr, file_path=file_path,
+        hints_file_path=hints_file_path, debug_dir=debug_dir, sparrow_key=sparrow_key, client_ip=client_ip,
+        country=country, page_count=page_count))
+
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/v1/sparrow-llm/jobs/{job.job_id}",
+        "result_url": f"/api/v1/sparrow-llm/jobs/{job.job_id}/result"
+    }
+
+
+def get_job_or_404(job_id: str):
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found or expired.")
+    return job
+
+
+@app.get("/api/v1/sparrow-llm/jobs/{job_id}", tags=["LLM Inference Jobs"])
+async def get_inference_job(job_id: str):
+    """Job status: queued, running, completed or failed."""
+    return get_job_or_404(job_id).to_dict()
+
+
+@app.get("/api/v1/sparrow-llm/jobs/{job_id}/result", tags=["LLM Inference Jobs"])
+async def get_inference_job_result(job_id: str, pretty: bool = False):
+    """
+    Job result. Returns 202 with the job status while the job is still processing.
+    Output is compact unless pretty=true.
+    """
+    job = get_job_or_404(job_id)
+
+    if not job.done:
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    if job.status == "failed":
+        raise HTTPException(status_code=job.error_status_code, detail=job.error)
+
+    return SparrowJSONResponse(job.result, pretty=pretty)
 
 
 @app.post("/api/v1/sparrow-llm/instruction-inference", tags=["LLM Inference"])
@@ -263,6 +607,7 @@ async def instruction_inference(
         options: Annotated[Optional[str], Form()] = None,
         debug_dir: Annotated[Optional[str], Form()] = None,
         debug: Annotated[Optional[bool], Form()] = False,
+        pretty: Annotated[Optional[bool], Form()] = False,
         sparrow_key: Annotated[Optional[str], Form()] = None,
         client_ip: Annotated[Optional[str], Form()] = "127.0.0.1",  # Default to localhost
         country: Annotated[Optional[str], Form()] = "Unknown"      # Default to Unknown
@@ -272,30 +617,7 @@ async def instruction_inference(
     """
     try:
         # Handle protected access checking
-        protected_access = config.get_bool('settings', 'protected_access', False)
-        if protected_access:
-            # Check if key is provided - common for both database and config validation
-            if not sparrow_key:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Sparrow key is required for protected access."
-                )
-
-            # Check if database is enabled
-            use_database = config.get_bool('settings', 'use_database', False)
-
-            if use_database:
-                # Use the database function to validate and increment the key
-                is_valid = db_pool.validate_and_increment_key(sparrow_key)
-
-                if not is_valid:
-                    raise HTTPException(
-                        status_code=403,
-                        detail="Invalid, disabled, or usage limit exceeded for key."
-                    )
-            else:
-                # Use the config-based validation
-                validate_key_from_config(config, sparrow_key)
+        await check_protected_access(sparrow_key)
 
         options_arr = [param.strip() for param in options.split(',')] if options is not None else None
 
@@ -304,30 +626,41 @@ async def instruction_inference(
         if options_arr and len(options_arr) == 2:
             model_name = options_arr[1]
 
-        # Log the start of inference processing and get the ID
-        log_id = db_pool.log_inference_start(
-            client_ip=client_ip,
-            country_name=country,
-            sparrow_key=sparrow_key,
-            page_count=1,  # Text inference is counted as one page
-            model_name=model_name,
-            inference_type='INSTRUCTION_PROCESSING',
-            source='UI'
-        )
-
-        # Start timing
-        start_time = time.time()
+        # Wait for a slot on the backend/model, fails fast with 429 when its queue is full
+        backend = options_arr[0] if options_arr else pipeline
+        async with get_scheduler().slot(backend, model_name, sparrow_key or client_ip):
+            # Queue the start of inference processing, written to the database in the background
+            log_id = get_inference_log_writer().log_start(
+                client_ip=client_ip,
+                country_name=country,
+                sparrow_key=sparrow_key,
+                page_count=1,  # Text inference is counted as one page
+                model_name=model_name,
+                inference_type='INSTRUCTION_PROCESSING',
+                source='UI'
+            )
 
-        # Call the engine to process the instruction-only request
-        answer = await run_from_api_engine_instruction(
-            pipeline, query, options_arr, debug_dir, debug, model_cache
-        )
+            # Start timing
+            start_time = time.time()
 
-        # Calculate duration
-        duration = time.time() - start_time
-
-        # Update the record with actual duration
-        db_pool.update_inference_duration(log_id, duration)
+            # Call the engine to process the instruction-only request
+            try:
+                answer = await run_from_api_engine_instruction(
+                    pipeline, query, options_arr, debug_dir, debug, model_cache
+                )
+            except Exception:
+                record_request_error(pipeline, backend, model_name)
+                raise
+
+            # Calculate duration
+            duration = time.time() - start_time
+
+            # Update the record with actual duration
+            get_inference_log_writer().update_duration(log_id, duration)
+            record_inference(pipeline, backend, model_name, 1, duration)
+    except QueueFullError as e:
+        await refund_protected_access(sparrow_key)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except ValueError as e:
         raise HTTPException(status_code=418, detail=str(e))
 
@@ -342,7 +675,8 @@ async def instruction_inference(
         print(f"\nSparrow Response:\n")
         print(answer)
 
-    return answer
+    # Serialized once here, compact unless pretty printing is requested
+    return SparrowJSONResponse(answer, pretty=pretty)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,19 @@
 import configparser
+import io
 import os
-from typing import Dict, Any, Optional, List
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Callable
 import json
 
+try:
+    # File lock shared by API workers updating key usage counts, not available on Windows
+    import fcntl
+except ImportError:
+    fcntl = None
+
 
 class SparrowConfig:
     """
@@ -134,11 +145,110 @@ class SparrowConfig:
             self._config['keys'][usage_count_key] = str(new_count)
             self._save_config()
 
+    def add_key_usage(self, usage_deltas: Dict[str, int]) -> Dict[str, int]:
+        """
+        Adds usage to the counts stored in the config file, under a file lock shared by all API workers.
+        Counts written by other workers since this process loaded the config are preserved.
+
+        Args:
+            usage_deltas: Usage to add per key name
+
+        Returns:
+            Dict[str, int]: Updated usage counts per key name
+        """
+        return self._update_key_usage_counts(lambda counts: {
+            key_name: counts.get(key_name, 0) + delta for key_name, delta in usage_deltas.items()
+        })
+
+    def set_key_usage(self, usage_counts: Dict[str, int]) -> Dict[str, int]:
+        """Writes usage counts to the config file, under the same file lock as add_key_usage."""
+        return self._update_key_usage_counts(lambda counts: dict(usage_counts))
+
+    def _update_key_usage_counts(self, update: Callable[[Dict[str, int]], Dict[str, int]]) -> Dict[str, int]:
+        config_path = self._config_path()
+
+        with self._file_lock(config_path):
+            with open(config_path, 'r') as configfile:
+                content = configfile.read()
+
+            file_config = configparser.ConfigParser()
+            file_config.read_string(content)
+            current_counts = {}
+            if 'keys' in file_config:
+                for option, value in file_config['keys'].items():
+                    if option.endswith('_usage_count'):
+                        try:
+                            current_counts[option[:-len('_usage_count')]] = int(value)
+                        except ValueError:
+                            current_counts[option[:-len('_usage_count')]] = 0
+
+            new_counts = update(current_counts)
+            for key_name, count in new_counts.items():
+                content = self._replace_usage_count(content, key_name, count)
+                if 'keys' in self._config:
+                    self._config['keys'][f"{key_name}_usage_count"] = str(count)
+
+            self._write_atomic(config_path, content)
+
+        return new_counts
+
+    @staticmethod
+    def _replace_usage_count(content: str, key_name: str, count: int) -> str:
+        """Replaces a usage count line in the config text, keeping comments and layout of the file."""
+        count_pattern = re.compile(rf'^(\s*{re.escape(key_name)}_usage_count\s*[=:]\s*).*$', re.MULTILINE | re.IGNORECASE)
+        if count_pattern.search(content):
+            return count_pattern.sub(lambda match: f"{match.group(1)}{count}", content, count=1)
+
+        # No usage count line yet, add it after the key value
+        value_pattern = re.compile(rf'^\s*{re.escape(key_name)}_value\s*[=:].*$', re.MULTILINE | re.IGNORECASE)
+        return value_pattern.sub(lambda match: f"{match.group(0)}\n{key_name}_usage_count = {count}", content, count=1)
+
+    @staticmethod
+    @contextmanager
+    def _file_lock(config_path: str):
+        if fcntl is None:
+            yield
+            return
+
+        with open(f"{config_path}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_atomic(config_path: str, content: str) -> None:
+        """Writes the file through a temporary file and atomic replace, readers never see a partial file."""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(config_path), prefix='.config.properties.')
+        try:
+            with os.fdopen(fd, 'w') as temp_file:
+                temp_file.write(content)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            # mkstemp creates the file readable by the owner only, keep the permissions of the original file
+            if os.path.exists(config_path):
+                shutil.copymode(config_path, temp_path)
+            os.replace(temp_path, config_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _config_path() -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.properties')
+
     def _save_config(self) -> None:
         """Save the configuration back to the file"""
-        config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.properties')
-        with open(config_path, 'w') as configfile:
-            self._config.write(configfile)
+        with self._file_lock(self._config_path()):
+            content = self._to_string()
+            self._write_atomic(self._config_path(), content)
+
+    def _to_string(self) -> str:
+        output = io.StringIO()
+        self._config.write(output)
+        return output.getvalue()
 
     def get_sparrow_key_value(self, key_name: str) -> Optional[str]:
         """Get the value of a specific key"""
@@ -1,5 +1,9 @@
+import asyncio
 import atexit
 import configparser
+import threading
+import time
+from contextlib import asynccontextmanager
 
 
 # Function to get database configuration
@@ -20,7 +24,8 @@ def get_db_config():
             "password": None,
             "host": None,
             "port": None,
-            "service": None
+            "service": None,
+            "acquire_timeout": 10.0
         }
 
         # Only populate connection details if database is enabled
@@ -30,6 +35,7 @@ def get_db_config():
             db_config["host"] = config.get("database", "host", fallback="")
             db_config["port"] = config.get("database", "port", fallback="1521")
             db_config["service"] = config.get("database", "service", fallback="")
+            db_config["acquire_timeout"] = config.getfloat("database", "acquire_timeout", fallback=10.0)
 
         return db_config
     except Exception as e:
@@ -45,17 +51,49 @@ database_enabled = db_config["enabled"]
 if database_enabled:
     import oracledb
 
-# Connection pool variables
+# Connection pool variables. The pool is created with the driver's asyncio API and lives on its own event loop
+# thread, so waiting for a connection never blocks the API event loop, and async handlers and worker threads
+# share the same pool
 connection_pool = None
 pool_closed = False
+pool_loop = None
+pool_loop_lock = threading.Lock()
 
+# Connection acquisition metrics, updated on the pool loop
+pool_wait_stats = {
+    "acquisitions": 0,
+    "timeouts": 0,
+    "errors": 0,
+    "waiting": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0
+}
 
-def initialize_connection_pool(min_connections=2, max_connections=10, increment=1):
-    """Initialize the connection pool at application startup"""
-    global connection_pool, pool_closed, database_enabled, db_config
 
-    if not database_enabled:
-        return False
+def _get_pool_loop():
+    """Event loop of the connection pool, started on a daemon thread on first use."""
+    global pool_loop
+
+    with pool_loop_lock:
+        if pool_loop is None:
+            pool_loop = asyncio.new_event_loop()
+            threading.Thread(target=pool_loop.run_forever, name="db-pool-loop", daemon=True).start()
+
+    return pool_loop
+
+
+def _run_sync(coroutine):
+    """Runs a coroutine on the pool loop and waits for its result. For threads, not for the pool loop itself."""
+    return asyncio.run_coroutine_threadsafe(coroutine, _get_pool_loop()).result()
+
+
+async def _run_async(coroutine):
+    """Runs a coroutine on the pool loop and awaits its result from another event loop."""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, _get_pool_loop()))
+
+
+async def _initialize_connection_pool(min_connections, max_connections, increment):
+    global connection_pool, pool_closed
 
     if connection_pool and not pool_closed:
         return True  # Pool already initialized
@@ -68,14 +106,15 @@ def initialize_connection_pool(min_connections=2, max_connections=10, increment=
             service_name=db_config["service"]
         )
 
-        connection_pool = oracledb.create_pool(
+        connection_pool = oracledb.create_pool_async(
             user=db_config["user"],
             password=db_config["password"],
             dsn=dsn,
             min=min_connections,
             max=max_connections,
             increment=increment,
-            getmode=oracledb.POOL_GETMODE_WAIT
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=int(db_config["acquire_timeout"] * 1000)
         )
 
         pool_closed = False
@@ -86,57 +125,220 @@ def initialize_connection_pool(min_connections=2, max_connections=10, increment=
         return False
 
 
-def close_connection_pool():
-    """Close the connection pool on application shutdown"""
-    global connection_pool, pool_closed, database_enabled
+async def initialize_connection_pool_async(min_connections=2, max_connections=10, increment=1):
+    """Initialize the connection pool at application startup"""
+    if not database_enabled:
+        return False
+
+    return await _run_async(_initialize_connection_pool(min_connections, max_connections, increment))
 
+
+def initialize_connection_pool(min_connections=2, max_connections=10, increment=1):
+    """Initialize the connection pool at application startup"""
     if not database_enabled:
-        return
+        return False
+
+    return _run_sync(_initialize_connection_pool(min_connections, max_connections, increment))
+
+
+async def _close_connection_pool():
+    global pool_closed
 
     if connection_pool and not pool_closed:
         try:
-            connection_pool.close()
+            await connection_pool.close()
             pool_closed = True
             print("Connection pool closed")
         except Exception as e:
             print(f"Error closing connection pool: {e}")
 
 
+async def close_connection_pool_async():
+    """Close the connection pool on application shutdown"""
+    if not database_enabled:
+        return
+
+    await _run_async(_close_connection_pool())
+
+
+def close_connection_pool():
+    """Close the connection pool on application shutdown"""
+    if not database_enabled or connection_pool is None or pool_closed:
+        return
+
+    _run_sync(_close_connection_pool())
+
+
 # Register the shutdown function
 atexit.register(close_connection_pool)
 
 
+async def _acquire():
+    """
+    Acquires a pooled connection on the pool loop, waiting at most acquire_timeout seconds for one
+    when all connections are busy.
+    """
+    if pool_closed or not connection_pool:
+        await _initialize_connection_pool(2, 10, 1)
+
+    pool_wait_stats["waiting"] += 1
+    start_time = time.perf_counter()
+    try:
+        connection = await connection_pool.acquire()
+    except Exception as e:
+        code = getattr(e.args[0], "full_code", None) if e.args else None
+        pool_wait_stats["timeouts" if code == "DPY-4005" else "errors"] += 1
+        raise
+    finally:
+        wait_time = time.perf_counter() - start_time
+        pool_wait_stats["waiting"] -= 1
+        pool_wait_stats["wait_seconds_total"] += wait_time
+        pool_wait_stats["wait_seconds_max"] = max(pool_wait_stats["wait_seconds_max"], wait_time)
+
+    pool_wait_stats["acquisitions"] += 1
+    return connection
+
+
+async def _release(connection):
+    try:
+        await connection_pool.release(connection)
+    except Exception as e:
+        print(f"Error releasing connection: {e}")
+
+
+@asynccontextmanager
+async def _acquire_connection():
+    """Acquires a pooled connection on the pool loop, the connection is released when the block exits."""
+    connection = await _acquire()
+    try:
+        yield connection
+    finally:
+        await _release(connection)
+
+
+class BlockingCursor:
+    """Blocking view of a cursor of the asyncio pool, database calls run on the pool loop."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, statement, parameters=None, **keyword_parameters):
+        _run_sync(self._cursor.execute(statement, parameters, **keyword_parameters))
+        return self
+
+    def executemany(self, statement, parameters):
+        _run_sync(self._cursor.executemany(statement, parameters))
+
+    def fetchone(self):
+        return _run_sync(self._cursor.fetchone())
+
+    def fetchmany(self, size=None):
+        return _run_sync(self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany())
+
+    def fetchall(self):
+        return _run_sync(self._cursor.fetchall())
+
+    def __getattr__(self, name):
+        # var(), close(), rowcount and other attributes that don't touch the database
+        return getattr(self._cursor, name)
+
+
+class BlockingConnection:
+    """
+    Blocking view of a connection of the asyncio pool, returned by get_connection_from_pool.
+    Database calls run on the pool loop, release it with release_connection.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self):
+        return BlockingCursor(self._connection.cursor())
+
+    def commit(self):
+        _run_sync(self._connection.commit())
+
+    def rollback(self):
+        _run_sync(self._connection.rollback())
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
 def get_connection_from_pool():
-    """Get a connection from the pool"""
-    global connection_pool, pool_closed, database_enabled
+    """
+    Get a connection from the pool. Blocking, for worker threads: in async code use the *_async functions,
+    which don't block the event loop while waiting for a connection.
 
+    Returns:
+        BlockingConnection: Pooled connection, release it with release_connection. None if the database is disabled
+    """
     if not database_enabled:
         return None
 
-    if pool_closed:
-        initialize_connection_pool()
-    elif not connection_pool:
-        initialize_connection_pool()
-
-    return connection_pool.acquire()
+    return BlockingConnection(_run_sync(_acquire()))
 
 
 def release_connection(connection):
-    """Release a connection back to the pool"""
-    global connection_pool, pool_closed, database_enabled
-
+    """Release a connection from get_connection_from_pool back to the pool"""
     if not database_enabled:
         return
 
     if connection and connection_pool and not pool_closed:
-        try:
-            connection_pool.release(connection)
-        except Exception as e:
-            print(f"Error releasing connection: {e}")
+        if isinstance(connection, BlockingConnection):
+            connection = connection._connection
+        _run_sync(_release(connection))
 
 
-def log_inference_start(client_ip, country_name, sparrow_key, page_count, model_name,
-                        inference_type='DATA_EXTRACTION', source='UI'):
+def get_pool_stats():
+    """
+    Connection pool size and acquisition metrics.
+
+    Returns:
+        dict: Open and busy connections, acquisitions, acquisition timeouts and errors, requests waiting
+              for a connection, total and maximum seconds spent waiting
+    """
+    stats = dict(pool_wait_stats)
+    pool = connection_pool
+    if pool is not None and not pool_closed:
+        stats["opened"] = pool.opened
+        stats["busy"] = pool.busy
+        stats["max"] = pool.max
+    return stats
+
+
+async def _log_inference_start(client_ip, country_name, sparrow_key, page_count, model_name, inference_type,
+                               source):
+    try:
+        async with _acquire_connection() as connection:
+            cursor = connection.cursor()
+
+            # Call the PL/SQL function to log the request
+            out_var = cursor.var(int)
+            await cursor.execute(
+                "BEGIN :result := log_inference_request(:ip, :country, :key, :pages, :model, :type, :source); END;",
+                result=out_var,
+                ip=client_ip,
+                country=country_name,
+                key=sparrow_key,
+                pages=page_count,
+                model=model_name,
+                type=inference_type,
+                source=source
+            )
+
+            await connection.commit()
+
+            log_id = out_var.getvalue()
+            cursor.close()
+            return log_id
+    except Exception as e:
+        print(f"Error logging inference start: {str(e)}")
+        return None
+
+
+async def log_inference_start_async(client_ip, country_name, sparrow_key, page_count, model_name,
+                                    inference_type='DATA_EXTRACTION', source='UI'):
     """
     Logs the start of an inference request to the database.
 
@@ -153,81 +355,140 @@ def log_inference_start(client_ip, country_name, sparrow_key, page_count, model_
         int: Log ID if successful, None otherwise
     """
     # If database is not enabled, return None
-    global database_enabled
+    if not database_enabled:
+        return None
+
+    return await _run_async(_log_inference_start(client_ip, country_name, sparrow_key, page_count, model_name,
+                                                 inference_type, source))
+
 
+def log_inference_start(client_ip, country_name, sparrow_key, page_count, model_name,
+                        inference_type='DATA_EXTRACTION', source='UI'):
+    """Blocking log_inference_start_async, for worker threads."""
     if not database_enabled:
         return None
 
-    connection = None
+    return _run_sync(_log_inference_start(client_ip, country_name, sparrow_key, page_count, model_name,
+                                          inference_type, source))
+
+
+async def _update_inference_duration(log_id, duration):
     try:
-        connection = get_connection_from_pool()
-        cursor = connection.cursor()
+        async with _acquire_connection() as connection:
+            cursor = connection.cursor()
 
-        # Call the PL/SQL function to log the request
-        out_var = cursor.var(int)
-        cursor.execute(
-            "BEGIN :result := log_inference_request(:ip, :country, :key, :pages, :model, :type, :source); END;",
-            result=out_var,
-            ip=client_ip,
-            country=country_name,
-            key=sparrow_key,
-            pages=page_count,
-            model=model_name,
-            type=inference_type,
-            source=source
-        )
+            update_sql = """
+                UPDATE inference_logs
+                SET inference_duration = :duration
+                WHERE id = :id
+            """
 
-        connection.commit()
+            await cursor.execute(
+                update_sql,
+                duration=duration,
+                id=log_id
+            )
 
-        log_id = out_var.getvalue()
-        cursor.close()
-        return log_id
+            await connection.commit()
+            cursor.close()
 
+            return True
     except Exception as e:
-        print(f"Error logging inference start: {str(e)}")
-        return None
-    finally:
-        if connection:
-            release_connection(connection)
+        print(f"Error updating inference duration: {str(e)}")
+        return False
 
 
-def update_inference_duration(log_id, duration):
+async def update_inference_duration_async(log_id, duration):
     """Update the record with the actual duration"""
-    global database_enabled
+    if not database_enabled or log_id is None:
+        return True
+
+    return await _run_async(_update_inference_duration(log_id, duration))
+
 
+def update_inference_duration(log_id, duration):
+    """Update the record with the actual duration"""
     if not database_enabled or log_id is None:
         return True
 
-    connection = None
-    try:
-        connection = get_connection_from_pool()
-        cursor = connection.cursor()
+    return _run_sync(_update_inference_duration(log_id, duration))
 
-        update_sql = """
-            UPDATE inference_logs
-            SET inference_duration = :duration
-            WHERE id = :id
-        """
 
-        cursor.execute(
-            update_sql,
-            duration=duration,
-            id=log_id
-        )
+async def _write_inference_logs(rows, durations, updates):
+    async with _acquire_connection() as connection:
+        cursor = connection.cursor()
 
-        connection.commit()
+        log_ids = []
+        if rows:
+            # One PL/SQL round trip for the whole batch, the function result of every row is bound to an array
+            out_var = cursor.var(int, arraysize=len(rows))
+            cursor.setinputsizes(result=out_var)
+            await cursor.executemany(
+                "BEGIN :result := log_inference_request(:ip, :country, :key, :pages, :model, :type, :source); END;",
+                rows
+            )
+            log_ids = [out_var.getvalue(i) for i in range(len(rows))]
+
+        updates = list(updates) + [{"duration": duration, "id": log_id}
+                                   for log_id, duration in zip(log_ids, durations) if duration is not None]
+        if updates:
+            await cursor.executemany("UPDATE inference_logs SET inference_duration = :duration WHERE id = :id",
+                                     updates)
+
+        await connection.commit()
         cursor.close()
+        return log_ids
 
-        return True
+
+def write_inference_logs(rows, durations, updates):
+    """
+    Writes a batch of inference logs in one transaction.
+
+    Args:
+        rows (list): log_inference_request binds of new logs, dicts with ip, country, key, pages, model, type
+                     and source
+        durations (list): Duration of every new log, None if not known yet
+        updates (list): Duration updates of earlier logs, dicts with duration and id
+
+    Returns:
+        list: Log IDs of the new logs
+
+    Raises:
+        Exception: If the batch couldn't be written
+    """
+    if not database_enabled:
+        return [None] * len(rows)
+
+    return _run_sync(_write_inference_logs(rows, durations, updates))
+
+
+async def _validate_and_increment_key(sparrow_key):
+    try:
+        async with _acquire_connection() as connection:
+            cursor = connection.cursor()
+
+            # Declare a variable to hold the returned value from the function
+            out_var = cursor.var(int)
+
+            # Call the PL/SQL function
+            await cursor.execute(
+                "BEGIN :result := validate_and_increment_key(:key); END;",
+                result=out_var,
+                key=sparrow_key
+            )
+
+            # Get the result (0 or 1)
+            result = out_var.getvalue()
+
+            await connection.commit()
+            cursor.close()
+            return result == 1  # Convert 1/0 to True/False
     except Exception as e:
-        print(f"Error updating inference duration: {str(e)}")
+        print(f"Error calling validate_and_increment_key: {str(e)}")
         return False
-    finally:
-        if connection:
-            release_connection(connection)
 
 
-def validate_and_increment_key(sparrow_key):
+async def validate_and_increment_key_async(sparrow_key):
     """
     Validates a sparrow key and increments its usage counter if valid.
 
@@ -244,35 +505,109 @@ def validate_and_increment_key(sparrow_key):
         bool: True if key is valid and was incremented successfully, False otherwise
     """
     # If database is not enabled, return False
-    global database_enabled
+    if not database_enabled:
+        return False
+
+    return await _run_async(_validate_and_increment_key(sparrow_key))
+
 
+def validate_and_increment_key(sparrow_key):
+    """Blocking validate_and_increment_key_async, for worker threads."""
     if not database_enabled:
         return False
 
-    connection = None
+    return _run_sync(_validate_and_increment_key(sparrow_key))
+
+
+async def _lease_key_quota(sparrow_key, requested, returned):
     try:
-        connection = get_connection_from_pool()
-        cursor = connection.cursor()
+        async with _acquire_connection() as connection:
+            cursor = connection.cursor()
+
+            # Call the PL/SQL function
+            out_var = cursor.var(int)
+            await cursor.execute(
+                "BEGIN :result := lease_key_quota(:key, :requested, :returned); END;",
+                result=out_var,
+                key=sparrow_key,
+                requested=requested,
+                returned=returned
+            )
+
+            granted = out_var.getvalue() or 0
+
+            await connection.commit()
+            cursor.close()
+            return granted
+    except Exception as e:
+        print(f"Error leasing key quota: {str(e)}")
+        return 0
 
-        # Declare a variable to hold the returned value from the function
-        out_var = cursor.var(int)
 
-        # Call the PL/SQL function
-        cursor.execute(
-            "BEGIN :result := validate_and_increment_key(:key); END;",
-            result=out_var,
-            key=sparrow_key
-        )
+async def lease_key_quota_async(sparrow_key, requested, returned=0):
+    """
+    Leases a block of calls from the usage limit of a sparrow key, returning unused calls of the previous lease.
 
-        # Get the result (0 or 1)
-        result = out_var.getvalue()
+    This function calls the PL/SQL lease_key_quota function (sql/sparrow_keys.sql), which applies the key rules
+    of validate_and_increment_key to a block of calls. The key row is locked while the lease is taken, so
+    concurrent leases from several API workers never grant more calls than the usage limit allows.
+    Fewer calls than requested are granted near the limit.
 
-        connection.commit()
-        cursor.close()
-        return result == 1  # Convert 1/0 to True/False
+    Args:
+        sparrow_key (str): The sparrow key to lease calls for
+        requested (int): Number of calls to lease
+        returned (int): Unused calls of the previous lease to give back
+
+    Returns:
+        int: Number of calls granted, 0 if the key is invalid, disabled, or its usage limit is reached
+    """
+    if not database_enabled:
+        return 0
+
+    return await _run_async(_lease_key_quota(sparrow_key, requested, returned))
+
+
+def lease_key_quota(sparrow_key, requested, returned=0):
+    """Blocking lease_key_quota_async, for worker threads."""
+    if not database_enabled:
+        return 0
+
+    return _run_sync(_lease_key_quota(sparrow_key, requested, returned))
+
+
+async def _release_key_quota(sparrow_key, count):
+    try:
+        async with _acquire_connection() as connection:
+            cursor = connection.cursor()
+            await cursor.execute("BEGIN release_key_quota(:key, :count); END;", key=sparrow_key, count=count)
+            await connection.commit()
+            cursor.close()
+            return True
     except Exception as e:
-        print(f"Error calling validate_and_increment_key: {str(e)}")
+        print(f"Error releasing key quota: {str(e)}")
         return False
-    finally:
-        if connection:
-            release_connection(connection)
\ No newline at end of file
+
+
+async def release_key_quota_async(sparrow_key, count):
+    """
+    Gives back unused calls of a key lease, with the PL/SQL release_key_quota procedure.
+
+    Args:
+        sparrow_key (str): The sparrow key the calls were leased for
+        count (int): Number of unused calls
+
+    Returns:
+        bool: True if the calls were given back
+    """
+    if not database_enabled or count <= 0:
+        return True
+
+    return await _run_async(_release_key_quota(sparrow_key, count))
+
+
+def release_key_quota(sparrow_key, count):
+    """Blocking release_key_quota_async, for worker threads."""
+    if not database_enabled or count <= 0:
+        return True
+
+    return _run_sync(_release_key_quota(sparrow_key, count))
@@ -1,8 +1,8 @@
+import json
 import warnings
 import typer
 from typing_extensions import Annotated, List
 from pipelines.interface import get_pipeline
-import tempfile
 import os
 from rich import print
 from pipelines.sparrow_parse.sparrow_markdown import (
@@ -11,6 +11,7 @@ from pipelines.sparrow_parse.sparrow_markdown import (
 from pipelines.sparrow_parse.sparrow_table import (
     process_table_extraction
 )
+from pipeline_executors import run_in_pipeline_executor
 
 
 # Disable parallelism in the Huggingface tokenizers library to prevent potential deadlocks and ensure consistent behavior.
@@ -44,61 +45,63 @@ def run(query: Annotated[str, typer.Argument(help="The list of fields to fetch")
     try:
         rag = get_pipeline(user_selected_pipeline)
 
-        if markdown:
-            answer = process_markdown_extraction(rag, user_selected_pipeline, query, file_path, hints_file_path, options,
-                                                 crop_size, instruction, validation, ocr, markdown, page_type, debug_dir,
-                                                 debug, True)
-        elif table:
-            answer = process_table_extraction(rag, user_selected_pipeline, query, file_path, hints_file_path, options,
-                                             crop_size, instruction, validation, ocr, markdown, table_template, page_type,
-                                             debug_dir, debug, True)
-        else:
-            answer = rag.run_pipeline(user_selected_pipeline, query, file_path, hints_file_path, options, crop_size,
-                                      instruction, validation, ocr, markdown, table, table_template, page_type, debug_dir,
-                                      debug, True)
+        answer = run_engine_pipeline(rag, user_selected_pipeline, query, file_path, hints_file_path, options, crop_size,
+                                     instruction, validation, ocr, markdown, table, table_template, page_type, debug_dir,
+                                     debug, True)
 
         print(f"\nSparrow response:\n")
-        print(answer)
+        print(format_answer(answer))
     except ValueError as e:
         print(f"Caught an exception: {e}")
 
 
+def format_answer(answer):
+    """Formats a pipeline answer for console output, structured results are pretty printed as JSON."""
+    if isinstance(answer, (dict, list)):
+        return json.dumps(answer, indent=4, ensure_ascii=False)
+    return answer
+
+
+def run_engine_pipeline(rag, user_selected_pipeline, query, file_path, hints_file_path, options, crop_size, instruction,
+                        validation, ocr, markdown, table, table_template, page_type, debug_dir, debug, local):
+    """
+    Runs the selected processing mode (markdown, table or standard pipeline). This is blocking work.
+    """
+    if markdown:
+        return process_markdown_extraction(rag, user_selected_pipeline, query, file_path, hints_file_path, options,
+                                           crop_size, instruction, validation, ocr, markdown, page_type, debug_dir,
+                                           debug, local)
+    elif table:
+        return process_table_extraction(rag, user_selected_pipeline, query, file_path, hints_file_path, options,
+                                        crop_size, instruction, validation, ocr, markdown, table_template, page_type,
+                                        debug_dir, debug, local)
+    else:
+        return rag.run_pipeline(user_selected_pipeline, query, file_path, hints_file_path, options, crop_size,
+                                instruction, validation, ocr, markdown, table, table_template, page_type, debug_dir,
+                                debug, local)
+
+
 async def run_from_api_engine(user_selected_pipeline, query, options_arr, crop_size, instruction, validation, ocr,
-                              markdown, table, table_template, page_type, file, hints_file, debug_dir, debug, model_cache=None):
+                              markdown, table, table_template, page_type, file_path, hints_file_path, debug_dir, debug,
+                              model_cache=None):
+    """
+    Runs the pipeline for an API request. Uploaded files are already saved to disk by the API,
+    file_path and hints_file_path point to them (None when not provided).
+    """
     try:
         rag = get_pipeline(user_selected_pipeline, model_cache)
 
-        if file is not None:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_file_path = os.path.join(temp_dir, file.filename)
-                # Save the uploaded file to the temporary directory
-                with open(temp_file_path, 'wb') as temp_file:
-                    content = await file.read()
-                    temp_file.write(content)
-
-                hints_temp_path = None
-                if hints_file is not None:
-                    hints_temp_path = os.path.join(temp_dir, hints_file.filename)
-                    with open(hints_temp_path, 'wb') as hints_temp:
-                        hints_content = await hints_file.read()
-                        hints_temp.write(hints_content)
-
-                if markdown:
-                    answer = process_markdown_extraction(rag, user_selected_pipeline, query, temp_file_path, hints_temp_path,
-                                                         options_arr, crop_size, instruction, validation, ocr,
-                                                         markdown, page_type, debug_dir, debug, False)
-                elif table:
-                    answer = process_table_extraction(rag, user_selected_pipeline, query, temp_file_path, hints_temp_path,
-                                                      options_arr, crop_size, instruction, validation, ocr, markdown,
-                                                      table_template, page_type, debug_dir, debug, False)
-                else:
-                    answer = rag.run_pipeline(user_selected_pipeline, query, temp_file_path, hints_temp_path, options_arr,
-                                              crop_size, instruction, validation, ocr, markdown, table, table_template,
-                                              page_type, debug_dir, debug, False)
+        # Blocking pipeline work runs in the bounded pipeline executor, keeping the event loop free
+        if file_path is not None:
+            answer = await run_in_pipeline_executor(user_selected_pipeline, run_engine_pipeline, rag,
+                                                    user_selected_pipeline, query, file_path, hints_file_path,
+                                                    options_arr, crop_size, instruction, validation, ocr, markdown,
+                                                    table, table_template, page_type, debug_dir, debug, False)
         else:
-            answer = rag.run_pipeline(user_selected_pipeline, query, None, None, options_arr, crop_size, instruction,
-                                      validation, ocr, markdown, table, table_template, page_type, debug_dir,
-                                      debug, False)
+            answer = await run_in_pipeline_executor(user_selected_pipeline, rag.run_pipeline, user_selected_pipeline,
+                                                    query, None, None, options_arr, crop_size, instruction, validation,
+                                                    ocr, markdown, table, table_template, page_type, debug_dir, debug,
+                                                    False)
     except ValueError as e:
         raise e
 
@@ -113,8 +116,10 @@ async def run_from_api_engine_instruction(user_selected_pipeline, query, options
     try:
         rag = get_pipeline(user_selected_pipeline, model_cache)
 
-        # Call run_pipeline with file_path=None for instruction-only processing
-        answer = rag.run_pipeline(
+        # Call run_pipeline with file_path=None for instruction-only processing, in the pipeline executor
+        answer = await run_in_pipeline_executor(
+            user_selected_pipeline,
+            rag.run_pipeline,
             user_selected_pipeline,
             query,
             None,  # No file path for instruction-only queries
@@ -0,0 +1,282 @@
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from rich import print
+from config_utils import get_config
+import db_pool
+
+
+# Log ids of written records kept for duration updates that arrive in a later batch
+MAX_PENDING_DURATIONS = 10000
+
+_STOP = object()
+
+
+class OracleLogStore:
+    """Writes inference logs with the log_inference_request PL/SQL function and the inference_logs table."""
+
+    def write_batch(self, rows, durations, updates):
+        """
+        Writes new logs and duration updates in one transaction.
+
+        Args:
+            rows (list): New logs, dicts with ip, country, key, pages, model, type and source
+            durations (list): Duration of every new log, None if not known yet
+            updates (list): Duration updates of earlier logs, dicts with duration and id
+
+        Returns:
+            list: Log IDs of the new logs
+        """
+        return db_pool.write_inference_logs(rows, durations, updates)
+
+
+class SQLiteLogStore:
+    """
+    Writes inference logs to an SQLite inference_logs table, same interface as OracleLogStore.
+    Used for local development and for testing the log writer without Oracle.
+    """
+
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS inference_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    client_ip TEXT,
+                    country_name TEXT,
+                    sparrow_key TEXT,
+                    page_count INTEGER,
+                    model_name TEXT,
+                    inference_type TEXT,
+                    source TEXT,
+                    inference_duration REAL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.database_path, timeout=30)
+
+    def write_batch(self, rows, durations, updates):
+        connection = self._connect()
+        try:
+            log_ids = []
+            for row, duration in zip(rows, durations):
+                cursor = connection.execute(
+                    "INSERT INTO inference_logs (client_ip, country_name, sparrow_key, page_count, model_name, "
+                    "inference_type, source, inference_duration) "
+                    "VALUES (:ip, :country, :key, :pages, :model, :type, :source, :duration)",
+                    {**row, "duration": duration}
+                )
+                log_ids.append(cursor.lastrowid)
+
+            connection.executemany("UPDATE inference_logs SET inference_duration = :duration WHERE id = :id",
+                                   updates)
+            connection.commit()
+            return log_ids
+        finally:
+            connection.close()
+
+
+class InferenceLogWriter:
+    """
+    Write-behind inference logging. Requests only enqueue log records, a background thread writes them
+    in batches with one commit per batch. Records are dropped and counted when the queue is full.
+    """
+
+    def __init__(self, store, queue_size: int = 1000, batch_size: int = 100, flush_interval: float = 1.0):
+        """
+        Args:
+            store: OracleLogStore, SQLiteLogStore or None to disable logging
+            queue_size (int): Maximum queued log records
+            batch_size (int): Maximum records written per batch
+            flush_interval (float): Seconds to wait for more records before writing a batch
+        """
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handles = itertools.count(1)
+        self.log_ids = OrderedDict()  # handle -> log id, for records still waiting for their duration
+        self.thread = None
+        self.lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    def start(self):
+        with self.lock:
+            if self.enabled and self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="inference-log-writer", daemon=True)
+                self.thread.start()
+
+    def close(self, timeout: float = 30):
+        """Writes queued records and stops the writer thread. Blocking."""
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is None:
+            return
+
+        self.queue.put(_STOP)
+        thread.join(timeout)
+
+    def log_start(self, client_ip, country_name, sparrow_key, page_count, model_name,
+                  inference_type='DATA_EXTRACTION', source='UI'):
+        """
+        Queues the start of an inference request.
+
+        Returns:
+            int: Handle for update_duration, None if logging is disabled or the record was dropped
+        """
+        if not self.enabled:
+            return None
+
+        handle = next(self.handles)
+        record = {
+            "ip": client_ip,
+            "country": country_name,
+            "key": sparrow_key,
+            "pages": page_count,
+            "model": model_name,
+            "type": inference_type,
+            "source": source
+        }
+        if not self._enqueue(("start", handle, record)):
+            return None
+        return handle
+
+    def update_duration(self, handle, duration):
+        """Queues the duration of a logged inference request."""
+        if not self.enabled or handle is None:
+            return
+        self._enqueue(("duration", handle, duration))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches
+        }
+
+    def _enqueue(self, item) -> bool:
+        if self.thread is None:
+            self.start()
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._write_batch(batch)
+
+        # Records queued after the stop marker are written too
+        remaining = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining.append(item)
+        for i in range(0, len(remaining), self.batch_size):
+            self._write_batch(remaining[i:i + self.batch_size])
+
+    def _write_batch(self, batch):
+        starts = [(handle, record) for kind, handle, record in batch if kind == "start"]
+        new_handles = {handle for handle, _ in starts}
+
+        # Durations of logs started in this batch are written with them, others update logs written earlier
+        durations = {}
+        updates = []
+        for kind, handle, duration in batch:
+            if kind != "duration":
+                continue
+            if handle in new_handles:
+                durations[handle] = duration
+            else:
+                log_id = self.log_ids.pop(handle, None)
+                if log_id is not None:
+                    updates.append({"duration": duration, "id": log_id})
+
+        try:
+            log_ids = self.store.write_batch([record for _, record in starts],
+                                             [durations.get(handle) for handle, _ in starts], updates)
+            for (handle, _), log_id in zip(starts, log_ids):
+                if handle not in durations and log_id is not None:
+                    self.log_ids[handle] = log_id
+
+            self.written += len(starts)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Error writing inference logs: {str(e)}")
+
+        # Requests that failed before reporting a duration leave their log id behind
+        while len(self.log_ids) > MAX_PENDING_DURATIONS:
+            self.log_ids.popitem(last=False)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_inference_log_writer() -> InferenceLogWriter:
+    """
+    Get the process-wide inference log writer, configured from the [inference_log] config section.
+    Logs go to Oracle when the database is enabled, to sqlite_path if set, otherwise logging is disabled.
+    """
+    global _writer
+
+    with _writer_lock:
+        if _writer is None:
+            config = get_config()
+            sqlite_path = config.get_str('inference_log', 'sqlite_path', '')
+
+            if db_pool.database_enabled:
+                store = OracleLogStore()
+            elif sqlite_path:
+                store = SQLiteLogStore(sqlite_path)
+            else:
+                store = None
+
+            _writer = InferenceLogWriter(store,
+                                         queue_size=config.get_int('inference_log', 'queue_size', 1000),
+                                         batch_size=config.get_int('inference_log', 'batch_size', 100),
+                                         flush_interval=config.get_float('inference_log', 'flush_interval', 1.0))
+
+    return _writer
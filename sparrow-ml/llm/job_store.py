@@ -0,0 +1,118 @@
+import threading
+import time
+import uuid
+from config_utils import get_config
+
+
+class Job:
+    """Background inference job state."""
+
+    def __init__(self, job_id: str, tenant: str):
+        self.job_id = job_id
+        self.tenant = tenant
+        self.status = "queued"  # queued, running, completed, failed
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.error_status_code = None
+        self.task = None  # asyncio task running the job, referenced so it isn't garbage collected
+
+    def start(self):
+        self.status = "running"
+        self.started_at = time.time()
+
+    def complete(self, result):
+        self.result = result
+        self.status = "completed"
+        self.finished_at = time.time()
+        self.task = None
+
+    def fail(self, status_code: int, error: str):
+        self.error_status_code = status_code
+        self.error = error
+        self.status = "failed"
+        self.finished_at = time.time()
+        self.task = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> dict:
+        job_info = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.status == "failed":
+            job_info["error"] = self.error
+            job_info["error_status_code"] = self.error_status_code
+        return job_info
+
+
+class JobStore:
+    """
+    In-process store for background inference jobs. Finished jobs are evicted after
+    `ttl_seconds`, unfinished jobs are kept until they finish.
+    """
+
+    def __init__(self, ttl_seconds: int, max_jobs: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def create(self, tenant: str) -> Job:
+        """
+        Creates a new job.
+
+        Raises:
+            ValueError: If the store is full of unfinished jobs
+        """
+        with self.lock:
+            self._evict_expired()
+            if len(self.jobs) >= self.max_jobs:
+                raise ValueError(f"Too many jobs in progress. Maximum: {self.max_jobs}.")
+
+            job = Job(uuid.uuid4().hex, tenant)
+            self.jobs[job.job_id] = job
+
+        return job
+
+    def get(self, job_id: str):
+        with self.lock:
+            self._evict_expired()
+            return self.jobs.get(job_id)
+
+    def pending_tasks(self) -> list:
+        """Tasks of jobs that haven't finished, cancelled on shutdown."""
+        with self.lock:
+            return [job.task for job in self.jobs.values() if not job.done and job.task is not None]
+
+    def _evict_expired(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.done and now - job.finished_at > self.ttl_seconds]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+_job_store = None
+_job_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Get the process-wide job store, configured from the [jobs] config section."""
+    global _job_store
+
+    with _job_store_lock:
+        if _job_store is None:
+            config = get_config()
+            _job_store = JobStore(ttl_seconds=config.get_int('jobs', 'ttl_seconds', 3600),
+                                  max_jobs=config.get_int('jobs', 'max_jobs', 1000))
+
+    return _job_store
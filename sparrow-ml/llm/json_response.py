@@ -0,0 +1,44 @@
+import json
+from fastapi.responses import JSONResponse
+
+try:
+    # Optional fast serializer, falls back to the standard library when not installed
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_json(content, pretty: bool = False) -> bytes:
+    """
+    Serializes API output to JSON bytes, compact by default.
+
+    Args:
+        content: Data to serialize
+        pretty (bool): Indent the output for readability
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        try:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(content, option=option)
+        except TypeError:
+            pass  # Type not supported by orjson, use the standard library
+
+    if pretty:
+        return json.dumps(content, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class SparrowJSONResponse(JSONResponse):
+    """JSON response serialized once with the fast serializer, compact unless pretty printing is requested."""
+
+    def __init__(self, content, pretty: bool = False, **kwargs):
+        self.pretty = pretty
+        super().__init__(content, **kwargs)
+
+    def render(self, content) -> bytes:
+        return dumps_json(content, self.pretty)
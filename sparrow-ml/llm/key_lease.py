@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+from rich import print
+from config_utils import get_config
+import db_pool
+
+
+class DatabaseKeyStore:
+    """Leases key quota from the SPARROW_KEYS table through the database pool."""
+
+    def lease(self, sparrow_key: str, requested: int, returned: int = 0) -> int:
+        return db_pool.lease_key_quota(sparrow_key, requested, returned)
+
+    def release(self, sparrow_key: str, count: int) -> bool:
+        return db_pool.release_key_quota(sparrow_key, count)
+
+
+class KeyLease:
+    """Calls leased for a key by this worker. denied is set when the store granted nothing."""
+
+    __slots__ = ('lock', 'remaining', 'expires_at', 'denied')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.remaining = 0
+        self.expires_at = 0.0
+        self.denied = False
+
+
+class KeyLeaseCache:
+    """
+    Validates sparrow keys in memory against calls leased in blocks from the key store.
+
+    A lease reserves up to lease_size calls in one store transaction, so most requests are validated without
+    touching the database, and usage limits still hold across API workers: leased calls are counted as used
+    until they are given back. Leases expire after ttl seconds, the next request then takes a new lease,
+    which also picks up disabled keys. Unused calls of expired leases are given back by reconcile.
+    Keys the store rejects are cached as denied for ttl seconds too.
+    """
+
+    def __init__(self, store, lease_size: int = 20, ttl: float = 10):
+        """
+        Args:
+            store: DatabaseKeyStore, or any object with the same lease and release methods
+            lease_size (int): Calls leased per store transaction
+            ttl (float): Seconds a lease or a denial is used before the key is checked again
+        """
+        self.store = store
+        self.lease_size = lease_size
+        self.ttl = ttl
+        self.leases = {}
+        self.lock = threading.Lock()
+        self.cache_hits = 0
+        self.store_leases = 0
+
+    def _lease_for(self, sparrow_key):
+        lease = self.leases.get(sparrow_key)
+        if lease is None:
+            with self.lock:
+                lease = self.leases.setdefault(sparrow_key, KeyLease())
+        return lease
+
+    @staticmethod
+    def _take_cached(lease, now):
+        """Takes one call from a live lease. True if taken, False if denied, None if a new lease is needed."""
+        if lease.expires_at > now:
+            if lease.remaining > 0:
+                lease.remaining -= 1
+                return True
+            if lease.denied:
+                return False
+        return None
+
+    def acquire_cached(self, sparrow_key: str):
+        """
+        Validates a key from the lease cache only, without blocking.
+
+        Returns:
+            bool: True if a leased call was taken, False if the key is cached as denied,
+                  None if the store has to be asked, call acquire for that
+        """
+        lease = self._lease_for(sparrow_key)
+        if not lease.lock.acquire(blocking=False):
+            return None
+        try:
+            result = self._take_cached(lease, time.monotonic())
+        finally:
+            lease.lock.release()
+
+        if result is not None:
+            self.cache_hits += 1
+        return result
+
+    def acquire(self, sparrow_key: str) -> bool:
+        """
+        Validates a key and counts one call, taking a new lease from the store when needed. Blocking.
+
+        Returns:
+            bool: True if the key is valid and the call is within its usage limit
+        """
+        lease = self._lease_for(sparrow_key)
+        with lease.lock:
+            now = time.monotonic()
+            result = self._take_cached(lease, now)
+            if result is not None:
+                self.cache_hits += 1
+                return result
+
+            # Unused calls of the expired lease go back in the same transaction
+            returned, lease.remaining = lease.remaining, 0
+            try:
+                granted = self.store.lease(sparrow_key, self.lease_size, returned)
+            except Exception as e:
+                print(f"Error leasing key quota: {str(e)}")
+                granted = 0
+            self.store_leases += 1
+
+            lease.expires_at = time.monotonic() + self.ttl
+            lease.denied = granted == 0
+            if lease.denied:
+                return False
+
+            lease.remaining = granted - 1
+            return True
+
+    def refund(self, sparrow_key: str):
+        """
+        Gives back a call taken by acquire, for requests rejected before they ran. Blocking.
+        The call goes back to the lease, an expired lease returns it to the store with its other unused calls.
+        """
+        lease = self.leases.get(sparrow_key)
+        if lease is None:
+            return
+        with lease.lock:
+            lease.remaining += 1
+
+    def reconcile(self, release_all: bool = False) -> int:
+        """
+        Gives back unused calls of expired leases, or of all leases on shutdown. Blocking.
+
+        Returns:
+            int: Number of calls given back
+        """
+        released = 0
+        now = time.monotonic()
+        for sparrow_key, lease in list(self.leases.items()):
+            with lease.lock:
+                if lease.remaining == 0 or (lease.expires_at > now and not release_all):
+                    continue
+                count, lease.remaining = lease.remaining, 0
+                lease.expires_at = 0.0
+
+            try:
+                self.store.release(sparrow_key, count)
+                released += count
+            except Exception as e:
+                print(f"Error releasing key quota: {str(e)}")
+
+        return released
+
+    def close(self):
+        """Gives back all unused leased calls."""
+        self.reconcile(release_all=True)
+
+    def stats(self) -> dict:
+        return {"keys": len(self.leases), "cache_hits": self.cache_hits, "store_leases": self.store_leases}
+
+
+async def reconcile_key_leases_periodically(cache: KeyLeaseCache, interval: float):
+    """Gives back unused calls of expired leases every interval seconds, until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(cache.reconcile)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_key_lease_cache() -> KeyLeaseCache:
+    """Get the process-wide key lease cache, configured from the [key_cache] config section."""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            config = get_config()
+            _cache = KeyLeaseCache(DatabaseKeyStore(),
+                                   lease_size=config.get_int('key_cache', 'lease_size', 20),
+                                   ttl=config.get_float('key_cache', 'ttl', 10))
+
+    return _cache
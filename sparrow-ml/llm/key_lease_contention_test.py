@@ -0,0 +1,175 @@
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import typer
+from typing_extensions import Annotated
+from rich import print
+from key_lease import KeyLeaseCache
+
+
+# Contention test for database key validation with leased quota. Runs API worker processes that validate
+# the same key concurrently through KeyLeaseCache against a shared SQLite key store, and checks that no more
+# calls are accepted than the usage limit allows and that no leased calls are lost.
+
+
+class SQLiteKeyStore:
+    """
+    Leases key quota from an SQLite sparrow_keys table, same interface as DatabaseKeyStore.
+    Applies the rules of the lease_key_quota PL/SQL function (sql/sparrow_keys.sql), so several API workers
+    can run against one store without Oracle.
+    """
+
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        self.local = threading.local()
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS sparrow_keys (
+                sparrow_key TEXT PRIMARY KEY,
+                enabled INTEGER NOT NULL DEFAULT 1,
+                usage_count INTEGER NOT NULL DEFAULT 0,
+                usage_limit INTEGER
+            )
+        """)
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.local.connection = connection
+        return connection
+
+    def add_key(self, sparrow_key: str, usage_limit: int = None, enabled: bool = True):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO sparrow_keys (sparrow_key, enabled, usage_count, usage_limit) VALUES (?, ?, 0, ?)",
+            (sparrow_key, int(enabled), usage_limit))
+
+    def usage_count(self, sparrow_key: str) -> int:
+        row = self._connection().execute("SELECT usage_count FROM sparrow_keys WHERE sparrow_key = ?",
+                                         (sparrow_key,)).fetchone()
+        return row[0] if row else 0
+
+    def lease(self, sparrow_key: str, requested: int, returned: int = 0) -> int:
+        connection = self._connection()
+        # Takes the write lock up front, as SELECT ... FOR UPDATE does in Oracle
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if returned:
+                self._release(connection, sparrow_key, returned)
+
+            row = connection.execute("SELECT usage_count, usage_limit FROM sparrow_keys "
+                                     "WHERE sparrow_key = ? AND enabled = 1", (sparrow_key,)).fetchone()
+            granted = 0
+            if row is not None:
+                usage_count, usage_limit = row
+                granted = requested if usage_limit is None else max(min(requested, usage_limit - usage_count), 0)
+                connection.execute("UPDATE sparrow_keys SET usage_count = usage_count + ? WHERE sparrow_key = ?",
+                                   (granted, sparrow_key))
+            connection.execute("COMMIT")
+            return granted
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def release(self, sparrow_key: str, count: int) -> bool:
+        self._release(self._connection(), sparrow_key, count)
+        return True
+
+    @staticmethod
+    def _release(connection, sparrow_key, count):
+        connection.execute("UPDATE sparrow_keys SET usage_count = MAX(usage_count - ?, 0) WHERE sparrow_key = ?",
+                           (count, sparrow_key))
+
+
+def _contention_worker(database_path, sparrow_key, threads, attempts, lease_size, ttl, results):
+    store = SQLiteKeyStore(database_path)
+    cache = KeyLeaseCache(store, lease_size=lease_size, ttl=ttl)
+    accepted = [0] * threads
+
+    def run(index):
+        for _ in range(attempts):
+            if cache.acquire_cached(sparrow_key) or cache.acquire(sparrow_key):
+                accepted[index] += 1
+            # Expired leases are reconciled while other threads keep acquiring
+            if index == 0:
+                cache.reconcile()
+
+    workers = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    cache.close()
+    results.put((sum(accepted), cache.stats()))
+
+
+def contention_test(workers: int = 4, threads: int = 8, attempts: int = 500, usage_limit: int = 20000,
+                    lease_size: int = 20, ttl: float = 0.05, database_path: str = None):
+    """
+    Runs API worker processes validating the same key concurrently against a shared SQLite key store,
+    and checks no more calls are accepted than the usage limit allows and no leased calls are lost.
+    """
+    temp_dir = None
+    if database_path is None:
+        temp_dir = tempfile.mkdtemp(prefix="sparrow_key_lease_")
+        database_path = os.path.join(temp_dir, "keys.db")
+
+    sparrow_key = "contention-test-key"
+    store = SQLiteKeyStore(database_path)
+    store.add_key(sparrow_key, usage_limit)
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_contention_worker,
+                                         args=(database_path, sparrow_key, threads, attempts, lease_size, ttl,
+                                               results))
+                 for _ in range(workers)]
+
+    start_time = time.time()
+    for process in processes:
+        process.start()
+    worker_results = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    duration = time.time() - start_time
+
+    accepted = sum(count for count, _ in worker_results)
+    store_leases = sum(stats["store_leases"] for _, stats in worker_results)
+    requested = workers * threads * attempts
+    usage_count = store.usage_count(sparrow_key)
+
+    print(f"Requests: {requested}, accepted: {accepted}, usage limit: {usage_limit}, "
+          f"usage count in store: {usage_count}")
+    print(f"Store leases: {store_leases} ({store_leases / requested:.3f} per request), {duration:.2f} seconds")
+
+    passed = accepted == usage_count and accepted <= usage_limit
+    print(f"Contention test {'passed' if passed else 'FAILED'}")
+
+    if temp_dir is not None:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return passed
+
+
+def run(workers: Annotated[int, typer.Option(help="API worker processes")] = 4,
+        threads: Annotated[int, typer.Option(help="Request threads per worker")] = 8,
+        attempts: Annotated[int, typer.Option(help="Key validations per thread")] = 500,
+        usage_limit: Annotated[int, typer.Option(help="Usage limit of the key")] = 20000,
+        lease_size: Annotated[int, typer.Option(help="Calls leased per store transaction")] = 20,
+        ttl: Annotated[float, typer.Option(help="Seconds a lease is used")] = 0.05):
+    passed = contention_test(workers, threads, attempts, usage_limit, lease_size, ttl)
+    # Limit below the demand, the store stops granting calls when it is reached
+    passed = contention_test(workers, threads, attempts, min(usage_limit, 3000), lease_size, ttl) and passed
+    if not passed:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(run)
+
+# Example:
+# python key_lease_contention_test.py --workers 4 --threads 8
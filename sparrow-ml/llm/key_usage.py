@@ -0,0 +1,214 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from rich import print
+from config_utils import get_config
+
+
+class UnknownKeyError(Exception):
+    """Sparrow key isn't configured."""
+
+
+class UsageLimitExceededError(Exception):
+    """Sparrow key reached its usage limit."""
+
+    def __init__(self, usage_limit):
+        super().__init__(f"Usage limit exceeded. Allowed limit: {usage_limit}.")
+        self.usage_limit = usage_limit
+
+
+class SparrowKey:
+    """Usage state of a config key. Pending usage is counted in memory until the next flush."""
+
+    __slots__ = ('name', 'value', 'usage_limit', 'usage_count', 'pending')
+
+    def __init__(self, name, value, usage_count, usage_limit):
+        self.name = name
+        self.value = value
+        self.usage_count = usage_count
+        self.usage_limit = usage_limit
+        self.pending = 0
+
+
+class KeyUsageTracker:
+    """
+    Validates config keys and counts their usage without writing config.properties per request.
+
+    Modes:
+        shared: counters live in a SQLite file shared by all API workers on the host, every request increments
+                them atomically, so limits are enforced exactly across workers. Counts are copied to
+                config.properties on flush. The default.
+        memory: counters live in process memory and are flushed periodically, adding this process's usage to the
+                counts in the file, so totals stay correct with several API workers. Limits are enforced per
+                worker against the counts read at the last flush, so only a single worker enforces them exactly.
+    """
+
+    def __init__(self, config, mode: str = "shared", shared_store_path: str = None):
+        self.config = config
+        self.mode = mode
+        self.shared_store_path = shared_store_path
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.local = threading.local()
+        self.shared_counts_flushed = None
+
+        # Keys are looked up by value, no scan of the key list per request
+        self.keys_by_value = {}
+        for key_name, data in config.get_sparrow_keys().items():
+            self.keys_by_value[data['value']] = SparrowKey(key_name, data['value'], data.get('usage_count', 0),
+                                                           data.get('usage_limit', float('inf')))
+
+        if self.mode == "shared":
+            self._init_shared_store()
+
+    @classmethod
+    def from_config(cls):
+        """Creates a tracker configured from the [key_usage] config section."""
+        config = get_config()
+        mode = config.get_str('key_usage', 'mode', 'shared').strip().lower()
+        if mode not in ("memory", "shared"):
+            print(f"Unknown key usage mode '{mode}', using shared")
+            mode = "shared"
+
+        if mode == "memory":
+            # Workers only see each other's usage at flushes, with N workers a key can be used up to N x its limit
+            print("Warning: key usage mode 'memory' enforces usage limits per API worker, "
+                  "use mode = shared when running several workers")
+
+        shared_store_path = config.get_str('key_usage', 'shared_store', 'key_usage.db')
+        if not os.path.isabs(shared_store_path):
+            shared_store_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), shared_store_path)
+
+        return cls(config, mode, shared_store_path)
+
+    def acquire(self, sparrow_key: str) -> SparrowKey:
+        """
+        Validates a key and counts one use.
+
+        Raises:
+            UnknownKeyError: If the key isn't configured
+            UsageLimitExceededError: If the key reached its usage limit
+        """
+        key = self.keys_by_value.get(sparrow_key)
+        if key is None:
+            raise UnknownKeyError()
+
+        if self.mode == "shared":
+            self._acquire_shared(key)
+            return key
+
+        with self.lock:
+            if key.usage_count + key.pending >= key.usage_limit:
+                raise UsageLimitExceededError(key.usage_limit)
+            key.pending += 1
+
+        return key
+
+    def release(self, sparrow_key: str) -> None:
+        """Gives back one use counted by acquire, for requests rejected before they ran."""
+        key = self.keys_by_value.get(sparrow_key)
+        if key is None:
+            return
+
+        if self.mode == "shared":
+            self._connection().execute(
+                "UPDATE key_usage SET usage_count = MAX(usage_count - 1, 0) WHERE name = ?", (key.name,))
+            return
+
+        # Pending usage may go negative when the use was already flushed, the next flush subtracts it
+        with self.lock:
+            key.pending -= 1
+
+    def flush(self) -> None:
+        """Writes counted usage to config.properties. Called periodically and on shutdown."""
+        with self.flush_lock:
+            try:
+                if self.mode == "shared":
+                    self._flush_shared()
+                else:
+                    self._flush_memory()
+            except Exception as e:
+                print(f"Error flushing key usage: {str(e)}")
+
+    def _flush_memory(self):
+        with self.lock:
+            usage_deltas = {key.name: key.pending for key in self.keys_by_value.values() if key.pending}
+            for key in self.keys_by_value.values():
+                key.usage_count += key.pending
+                key.pending = 0
+
+        if not usage_deltas:
+            return
+
+        try:
+            usage_counts = self.config.add_key_usage(usage_deltas)
+        except Exception:
+            # Keep the usage pending for the next flush
+            with self.lock:
+                for key in self.keys_by_value.values():
+                    if key.name in usage_deltas:
+                        key.usage_count -= usage_deltas[key.name]
+                        key.pending += usage_deltas[key.name]
+            raise
+
+        # Counts in the file include usage from other workers
+        with self.lock:
+            for key in self.keys_by_value.values():
+                if key.name in usage_counts:
+                    key.usage_count = usage_counts[key.name]
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.shared_store_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.local.connection = connection
+        return connection
+
+    def _init_shared_store(self):
+        connection = self._connection()
+        connection.execute("CREATE TABLE IF NOT EXISTS key_usage (name TEXT PRIMARY KEY, usage_count INTEGER NOT NULL)")
+        # Workers started later keep the counts already in the store
+        connection.executemany("INSERT OR IGNORE INTO key_usage (name, usage_count) VALUES (?, ?)",
+                               [(key.name, key.usage_count) for key in self.keys_by_value.values()])
+
+    def _acquire_shared(self, key):
+        unlimited = key.usage_limit == float('inf')
+        cursor = self._connection().execute(
+            "UPDATE key_usage SET usage_count = usage_count + 1 WHERE name = ? AND (? OR usage_count < ?)",
+            (key.name, unlimited, 0 if unlimited else key.usage_limit)
+        )
+        if cursor.rowcount != 1:
+            raise UsageLimitExceededError(key.usage_limit)
+
+    def _flush_shared(self):
+        usage_counts = dict(self._connection().execute("SELECT name, usage_count FROM key_usage").fetchall())
+        usage_counts = {key.name: usage_counts[key.name] for key in self.keys_by_value.values()
+                        if key.name in usage_counts}
+
+        if usage_counts != self.shared_counts_flushed:
+            self.config.set_key_usage(usage_counts)
+            self.shared_counts_flushed = usage_counts
+
+
+async def flush_key_usage_periodically(tracker: KeyUsageTracker, interval: float):
+    """Flushes key usage every interval seconds, until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(tracker.flush)
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_key_usage_tracker() -> KeyUsageTracker:
+    """Get the process-wide key usage tracker."""
+    global _tracker
+
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = KeyUsageTracker.from_config()
+
+    return _tracker
@@ -0,0 +1,91 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import typer
+from typing_extensions import Annotated
+from rich import print
+
+
+# Load test for Sparrow LLM API responsiveness. Sends one large document extraction and,
+# while it is processing, fires concurrent small requests and reports their latency.
+# Small requests are small document extractions by default, or GET requests to the async
+# scheduler metrics route with --small-mode status. Requests rejected by admission control (429)
+# are reported separately from errors.
+# Start the API first: python api.py --port 8002
+
+
+def run_large_request(base_url, file_path, query, pipeline, options, result):
+    start_time = time.time()
+    with open(file_path, 'rb') as f:
+        response = requests.post(f"{base_url}/api/v1/sparrow-llm/inference",
+                                 data={'query': query, 'pipeline': pipeline, 'options': options},
+                                 files={'file': (file_path.split('/')[-1], f)},
+                                 timeout=3600)
+    result['status'] = response.status_code
+    result['duration'] = time.time() - start_time
+
+
+def run_small_request(base_url, small_mode, file_path, query, pipeline, options):
+    start_time = time.time()
+    if small_mode == "status":
+        response = requests.get(f"{base_url}/api/v1/sparrow-llm/scheduler", timeout=60)
+    else:
+        with open(file_path, 'rb') as f:
+            response = requests.post(f"{base_url}/api/v1/sparrow-llm/inference",
+                                     data={'query': query, 'pipeline': pipeline, 'options': options},
+                                     files={'file': (file_path.split('/')[-1], f)},
+                                     timeout=600)
+    return response.status_code, time.time() - start_time
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[max(0, int(len(sorted_values) * fraction) - 1)]
+
+
+def run(base_url: Annotated[str, typer.Option(help="Sparrow LLM API URL")] = "http://127.0.0.1:8002",
+        file_path: Annotated[str, typer.Option(help="Large document to process")] = "data/oracle_10k_2024_q1_small.pdf",
+        query: Annotated[str, typer.Option(help="Query for the large document")] = "*",
+        pipeline: Annotated[str, typer.Option(help="Pipeline for the large document")] = "sparrow-parse",
+        options: Annotated[str, typer.Option(help="Options for the large document")] = "mlx,mlx-community/Qwen2.5-VL-72B-Instruct-4bit",
+        small_mode: Annotated[str, typer.Option(help="Small request type: inference or status")] = "inference",
+        small_file_path: Annotated[str, typer.Option(help="Small document to process")] = "data/invoice_1.jpg",
+        small_query: Annotated[str, typer.Option(help="Query for the small document")] = "*",
+        small_options: Annotated[str, typer.Option(help="Options for the small document")] = "mlx,mlx-community/Qwen2.5-VL-7B-Instruct-8bit",
+        small_requests: Annotated[int, typer.Option(help="Number of small requests")] = 40,
+        concurrency: Annotated[int, typer.Option(help="Concurrent small requests")] = 4):
+    large_result = {}
+    large_thread = threading.Thread(target=run_large_request,
+                                    args=(base_url, file_path, query, pipeline, options, large_result))
+    large_thread.start()
+
+    # Give the large request time to reach the pipeline
+    time.sleep(2)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: run_small_request(base_url, small_mode, small_file_path, small_query,
+                                                                pipeline, small_options),
+                                    range(small_requests)))
+
+    large_still_running = large_thread.is_alive()
+    large_thread.join()
+
+    latencies = sorted(duration * 1000 for status, duration in results if status == 200)
+    rejected = sum(1 for status, _ in results if status == 429)
+    errors = sum(1 for status, _ in results if status not in (200, 429))
+
+    print(f"Large request: status {large_result.get('status')}, {large_result.get('duration', 0):.2f} seconds")
+    print(f"Small requests sent while large request was running: {large_still_running}")
+    print(f"Small {small_mode} requests: {len(results)}, rejected (429): {rejected}, errors: {errors}")
+    if latencies:
+        print(f"Latency ms - p50: {statistics.median(latencies):.1f}, "
+              f"p95: {percentile(latencies, 0.95):.1f}, max: {latencies[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    typer.run(run)
+
+# Example:
+# python load_test.py --file-path data/oracle_10k_2024_q1_small.pdf --small-requests 40 --concurrency 4
+# python load_test.py --small-mode status --small-requests 200 --concurrency 20
@@ -0,0 +1,237 @@
+import bisect
+import math
+import threading
+
+
+# Prometheus text exposition format served by the /metrics endpoint
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricFamily:
+    """
+    Samples of one metric collected at scrape time, for values owned by other components.
+
+    Attributes:
+        samples: List of (labels dict, value) tuples
+    """
+
+    def __init__(self, name: str, metric_type: str, documentation: str, samples=None):
+        self.name = name
+        self.metric_type = metric_type
+        self.documentation = documentation
+        self.samples = samples if samples is not None else []
+
+    def add(self, value, **labels):
+        self.samples.append((labels, value))
+        return self
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.documentation}")
+        lines.append(f"# TYPE {self.name} {self.metric_type}")
+        for labels, value in self.samples:
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+
+
+class _Metric:
+    metric_type = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}  # label values tuple -> value
+        self.lock = threading.Lock()
+
+    def _labels(self, label_values) -> dict:
+        return dict(zip(self.labelnames, label_values))
+
+    def render(self, lines: list):
+        with self.lock:
+            values = list(self.values.items())
+
+        family = MetricFamily(self.name, self.metric_type, self.documentation)
+        for label_values, value in values:
+            family.samples.append((self._labels(label_values), value))
+        family.render(lines)
+
+
+class Counter(_Metric):
+    """Monotonic counter, label values are passed positionally in labelnames order."""
+
+    metric_type = "counter"
+
+    def inc(self, *label_values, amount=1):
+        label_values = tuple("" if value is None else value for value in label_values)
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, label values are passed positionally in labelnames order."""
+
+    metric_type = "gauge"
+
+    def set(self, value, *label_values):
+        label_values = tuple("" if label_value is None else label_value for label_value in label_values)
+        with self.lock:
+            self.values[label_values] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed upper-bound buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        label_values = tuple("" if label_value is None else label_value for label_value in label_values)
+        # Count per bucket, made cumulative when rendered
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(label_values)
+            if state is None:
+                state = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self, lines: list):
+        with self.lock:
+            values = [(label_values, (list(state[0]), state[1], state[2]))
+                      for label_values, state in self.values.items()]
+
+        lines.append(f"# HELP {self.name} {self.documentation}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for label_values, (bucket_counts, total, count) in values:
+            labels = self._labels(label_values)
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets + (math.inf,), bucket_counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels({**labels, "le": _format_value(float(upper_bound))})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+
+
+class MetricsRegistry:
+    """In-process metrics, updated on the request path and rendered on scrape."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=()) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, families=()) -> str:
+        """
+        Renders registered metrics and metric families collected at scrape time.
+
+        Args:
+            families: MetricFamily objects to render after the registered metrics
+
+        Returns:
+            str: Metrics in Prometheus text exposition format
+        """
+        lines = []
+        for metric in self.metrics:
+            metric.render(lines)
+        for family in families:
+            family.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_LABELS = ("pipeline", "backend", "model")
+
+# Request label values come from client form fields, values outside these sets are recorded as "other"
+# so the number of label sets stays bounded
+KNOWN_PIPELINES = frozenset(("sparrow-parse", "sparrow-instructor", "stocks"))
+KNOWN_BACKENDS = frozenset(("huggingface", "mlx", "ollama", "vllm", "mistral"))
+# Distinct model labels per backend, models seen after the limit is reached are recorded as "other"
+MAX_MODELS_PER_BACKEND = 20
+OTHER_LABEL = "other"
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "sparrow_request_duration_seconds", "Inference request processing time, without queue wait",
+    REQUEST_LABELS, buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1800))
+REQUEST_ERRORS = REGISTRY.counter(
+    "sparrow_request_errors_total", "Inference requests that failed in the engine", REQUEST_LABELS)
+PAGES_PROCESSED = REGISTRY.counter(
+    "sparrow_pages_processed_total", "Document pages processed by successful inference requests", REQUEST_LABELS)
+PAGES_PER_SECOND = REGISTRY.gauge(
+    "sparrow_pages_per_second", "Pages per second of the last successful inference request", REQUEST_LABELS)
+VALIDATION_FAILURES = REGISTRY.counter(
+    "sparrow_validation_failures_total", "Pages whose LLM output failed JSON schema validation", ("reason",))
+UPLOAD_SIZE = REGISTRY.histogram(
+    "sparrow_upload_size_bytes", "Size of uploaded files",
+    buckets=tuple(1024 * 4 ** exponent for exponent in range(2, 12)))
+
+
+_models_by_backend = {}  # backend -> model labels in use
+_models_lock = threading.Lock()
+
+
+def request_labels(pipeline, backend, model) -> tuple:
+    """Bounded (pipeline, backend, model) label values for a request."""
+    pipeline = pipeline if pipeline in KNOWN_PIPELINES else OTHER_LABEL
+    backend = backend.lower() if isinstance(backend, str) else backend
+    if backend not in KNOWN_BACKENDS:
+        return pipeline, OTHER_LABEL, OTHER_LABEL
+
+    if model is None:
+        return pipeline, backend, ""
+
+    with _models_lock:
+        models = _models_by_backend.setdefault(backend, set())
+        if model not in models:
+            if len(models) >= MAX_MODELS_PER_BACKEND:
+                return pipeline, backend, OTHER_LABEL
+            models.add(model)
+
+    return pipeline, backend, model
+
+
+def record_request_error(pipeline, backend, model):
+    """Records an inference request that failed in the engine."""
+    REQUEST_ERRORS.inc(*request_labels(pipeline, backend, model))
+
+
+def record_inference(pipeline, backend, model, page_count, duration):
+    """Records a successful inference request."""
+    pipeline, backend, model = request_labels(pipeline, backend, model)
+    REQUEST_DURATION.observe(duration, pipeline, backend, model)
+    PAGES_PROCESSED.inc(pipeline, backend, model, amount=page_count)
+    if duration > 0:
+        PAGES_PER_SECOND.set(page_count / duration, pipeline, backend, model)
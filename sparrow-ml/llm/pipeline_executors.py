@@ -0,0 +1,46 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from config_utils import get_config
+
+
+# Bounded thread pools per pipeline, blocking pipeline work runs here instead of on the event loop
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_pipeline_workers(pipeline_name: str) -> int:
+    """
+    Get the configured worker count for a pipeline from the [executors] config section.
+    Falls back to the 'default' entry, then to 2 workers.
+    """
+    config = get_config()
+    default_workers = config.get_int('executors', 'default', 2)
+    return max(1, config.get_int('executors', pipeline_name, default_workers))
+
+
+def get_pipeline_executor(pipeline_name: str) -> ThreadPoolExecutor:
+    """Get the bounded executor for a pipeline, created on first use."""
+    with _executors_lock:
+        executor = _executors.get(pipeline_name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=get_pipeline_workers(pipeline_name),
+                                          thread_name_prefix=f"pipeline-{pipeline_name}")
+            _executors[pipeline_name] = executor
+
+    return executor
+
+
+async def run_in_pipeline_executor(pipeline_name: str, func, *args, **kwargs):
+    """Run blocking pipeline work in the pipeline executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pipeline_executor(pipeline_name), partial(func, *args, **kwargs))
+
+
+def shutdown_pipeline_executors():
+    """Shut down all pipeline executors, waiting for running work to finish."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=True)
+        _executors.clear()
@@ -0,0 +1,248 @@
+import atexit
+import multiprocessing
+import threading
+import time
+import traceback
+from rich import print
+from pipelines.model_cache import ModelCache
+
+
+def _cache_state(model_cache):
+    return model_cache.stats(), model_cache.counters()
+
+
+def _worker_loop(connection, worker_key, cache_settings):
+    """
+    Worker process main loop. Keeps its own model cache, so the model pinned to this worker
+    stays resident between jobs. Jobs are (function, args, kwargs) tuples received over the pipe,
+    each reply carries the worker cache stats and counters.
+    """
+    model_cache = ModelCache(**cache_settings)
+    print(f"Inference worker started for {worker_key}")
+
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if job is None:
+            break
+
+        func, args, kwargs = job
+        try:
+            result = func(*args, model_cache=model_cache, **kwargs)
+            connection.send((True, result, _cache_state(model_cache)))
+        except Exception as e:
+            try:
+                connection.send((False, (e, traceback.format_exc()), _cache_state(model_cache)))
+            except Exception:
+                # Exception could not be pickled, send its message instead
+                connection.send((False, (RuntimeError(str(e)), traceback.format_exc()), _cache_state(model_cache)))
+
+
+class _WorkerRetired(Exception):
+    """Raised when a job reaches a worker that was stopped by pool eviction."""
+
+
+class InferenceWorker:
+    """
+    A single long-lived inference process pinned to one backend/model.
+    Jobs are executed one at a time, the process is restarted if it crashes.
+    """
+
+    def __init__(self, worker_key, context, cache_settings):
+        self.worker_key = worker_key
+        self.context = context
+        self.cache_settings = cache_settings
+        self.lock = threading.Lock()
+        self.process = None
+        self.connection = None
+        self.started_at = None
+        self.last_used = None
+        self.jobs = 0
+        self.cache_stats = []
+        self.cache_counters = {}
+        self.retired = False
+        self._start()
+
+    def _start(self):
+        parent_connection, child_connection = self.context.Pipe()
+        self.process = self.context.Process(target=_worker_loop,
+                                            args=(child_connection, self.worker_key, self.cache_settings),
+                                            name=f"sparrow-inference-{self.worker_key}", daemon=True)
+        self.process.start()
+        self.started_at = time.time()
+        self.cache_stats = []
+        self.cache_counters = {}
+        child_connection.close()
+        self.connection = parent_connection
+
+    def _restart(self):
+        print(f"Restarting inference worker for {self.worker_key}")
+        self.stop()
+        self._start()
+
+    def run(self, func, args, kwargs):
+        with self.lock:
+            if self.retired:
+                raise _WorkerRetired()
+
+            if not self.process.is_alive():
+                self._restart()
+
+            try:
+                self.connection.send((func, args, kwargs))
+
+                # Wait for the result, checking that the worker is still alive
+                while not self.connection.poll(1.0):
+                    if not self.process.is_alive():
+                        raise EOFError
+                success, payload, (self.cache_stats, self.cache_counters) = self.connection.recv()
+            except (EOFError, BrokenPipeError, ConnectionResetError):
+                self._restart()
+                raise RuntimeError(f"Inference worker for {self.worker_key} crashed while processing the request")
+            finally:
+                self.jobs += 1
+                self.last_used = time.time()
+
+        if not success:
+            error, worker_traceback = payload
+            print(f"Inference worker error for {self.worker_key}:\n{worker_traceback}")
+            raise error
+
+        return payload
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+    def stats(self) -> dict:
+        return {
+            "worker": self.worker_key,
+            "alive": self.process is not None and self.process.is_alive(),
+            "busy": self.busy,
+            "started_at": self.started_at,
+            "last_used": self.last_used,
+            "jobs": self.jobs,
+            "models": self.cache_stats,
+            "cache_counters": self.cache_counters
+        }
+
+    def retire(self) -> bool:
+        """Stops the worker for good if it is idle, returns False if it is busy."""
+        if not self.lock.acquire(blocking=False):
+            return False
+
+        try:
+            self.retired = True
+            self.stop()
+        finally:
+            self.lock.release()
+
+        return True
+
+    def stop(self):
+        if self.process is None:
+            return
+
+        try:
+            if self.process.is_alive():
+                self.connection.send(None)
+                self.process.join(timeout=5)
+        except (BrokenPipeError, OSError):
+            pass
+
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=5)
+
+        self.connection.close()
+        self.process = None
+
+
+class InferenceWorkerPool:
+    """
+    Pool of long-lived inference worker processes, one per backend/model.
+    Gives the same isolation as a subprocess per request, without reloading the model every time.
+    Each worker holds its model in memory, so when more than `max_workers` are running the least
+    recently used idle worker is stopped. Pinned workers are never stopped.
+    """
+
+    def __init__(self, max_workers: int = 0, pinned_models=None, cache_settings=None):
+        # Spawn is safe with MLX/Metal and CUDA, forked processes can't reinitialize them
+        self.context = multiprocessing.get_context("spawn")
+        self.max_workers = max_workers
+        self.pinned_models = set(pinned_models or [])
+        self.cache_settings = cache_settings or {}
+        self.workers = {}
+        self.lock = threading.Lock()
+
+    def run(self, worker_key, func, *args, **kwargs):
+        """
+        Runs func(*args, model_cache=<worker cache>, **kwargs) in the worker pinned to worker_key.
+        func must be a picklable top-level function.
+        """
+        while True:
+            with self.lock:
+                worker = self.workers.get(worker_key)
+                if worker is None:
+                    self._evict_idle_workers()
+                    worker = InferenceWorker(worker_key, self.context, self.cache_settings)
+                    self.workers[worker_key] = worker
+
+            try:
+                return worker.run(func, args, kwargs)
+            except _WorkerRetired:
+                # Worker was evicted between lookup and run, start a new one
+                continue
+
+    def _evict_idle_workers(self):
+        """Stops least recently used idle workers to make room for a new one."""
+        if not self.max_workers:
+            return
+
+        candidates = sorted((worker for key, worker in self.workers.items()
+                             if key not in self.pinned_models and not worker.busy),
+                            key=lambda worker: worker.last_used or worker.started_at)
+
+        while len(self.workers) >= self.max_workers and candidates:
+            worker = candidates.pop(0)
+            if worker.retire():
+                print(f"Stopped least recently used inference worker {worker.worker_key}")
+                del self.workers[worker.worker_key]
+
+        if len(self.workers) >= self.max_workers:
+            print(f"All {len(self.workers)} inference workers are busy or pinned, starting one over the limit")
+
+    def stats(self) -> list:
+        with self.lock:
+            return [worker.stats() for worker in self.workers.values()]
+
+    def shutdown(self):
+        with self.lock:
+            for worker in self.workers.values():
+                worker.stop()
+            self.workers = {}
+
+
+_inference_worker_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_inference_worker_pool() -> InferenceWorkerPool:
+    """Get the process-wide inference worker pool, created on first use and configured from [model_cache]."""
+    global _inference_worker_pool
+
+    with _pool_lock:
+        if _inference_worker_pool is None:
+            from config_utils import get_config
+
+            config = get_config()
+            _inference_worker_pool = InferenceWorkerPool(
+                max_workers=config.get_int('model_cache', 'max_workers', 0),
+                pinned_models=config.get_list('model_cache', 'pinned_models'),
+                cache_settings=ModelCache.from_config().settings())
+            atexit.register(_inference_worker_pool.shutdown)
+
+    return _inference_worker_pool
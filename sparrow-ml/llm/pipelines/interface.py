@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Any
 from typing import List
 import warnings
+from pipelines.model_cache import ModelCache
 
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -30,9 +31,13 @@ class Pipeline(ABC):
                      local: bool = True) -> Any:
         pass
 
+    def warm_up(self, options: List[str] = None) -> None:
+        """Loads the backend model for options and runs a tiny inference, so the first request doesn't pay for it."""
+        pass
+
 
 # Factory Method
-def get_pipeline(pipeline_name: str, model_cache: dict = None) -> Pipeline:
+def get_pipeline(pipeline_name: str, model_cache: ModelCache = None) -> Pipeline:
     if pipeline_name == "sparrow-parse":
         from pipelines.sparrow_parse.sparrow_parse import SparrowParsePipeline
         return SparrowParsePipeline(model_cache)
@@ -0,0 +1,290 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from rich import print
+
+
+# Model weight files counted when a backend's memory is estimated from the weights on disk
+WEIGHT_FILE_SUFFIXES = ('.safetensors', '.bin', '.gguf', '.npz')
+
+
+def _module_size(obj) -> int:
+    """Parameter bytes of a torch or MLX model, 0 for anything else."""
+    parameters = getattr(obj, 'parameters', None)
+    if not callable(parameters):
+        return 0
+
+    try:
+        params = parameters()
+        if isinstance(params, dict):
+            # MLX models return a nested dict of arrays
+            from mlx.utils import tree_flatten
+            return sum(value.nbytes for _, value in tree_flatten(params))
+        # Torch modules return a parameter iterator
+        return sum(param.numel() * param.element_size() for param in params)
+    except Exception:
+        return 0
+
+
+def _reserved_gpu_memory(model_inference_instance) -> int:
+    """GPU memory reserved by a vLLM backend, its gpu_memory_utilization share of the device memory."""
+    config = getattr(model_inference_instance, 'config', None)
+    if not isinstance(config, dict) or 'gpu_memory_utilization' not in config:
+        return 0
+
+    try:
+        import torch
+        if not torch.cuda.is_available():
+            return 0
+        return int(config['gpu_memory_utilization'] * torch.cuda.get_device_properties(0).total_memory)
+    except Exception:
+        return 0
+
+
+def _weights_size(model_name: str) -> int:
+    """
+    Bytes of model weight files on disk, from a local model directory or the Hugging Face cache.
+    0 when the weights are not available locally, as for models served by remote APIs.
+    """
+    path = model_name if os.path.isdir(model_name) else None
+    if path is None:
+        try:
+            from huggingface_hub import snapshot_download
+            path = snapshot_download(model_name, local_files_only=True,
+                                     allow_patterns=[f"*{suffix}" for suffix in WEIGHT_FILE_SUFFIXES])
+        except Exception:
+            return 0
+
+    size = 0
+    for root, _, files in os.walk(path):
+        for file_name in files:
+            if file_name.endswith(WEIGHT_FILE_SUFFIXES):
+                # Hugging Face cache snapshots link to blobs, getsize follows the links
+                size += os.path.getsize(os.path.join(root, file_name))
+    return size
+
+
+def estimate_model_size(model_inference_instance) -> int:
+    """
+    Estimates memory held by a backend instance.
+
+    Uses the parameters of torch or MLX models the instance references, the GPU memory reserved by vLLM,
+    or else the size of the model weights on disk, for backends that load their model lazily (MLX).
+    Remote API backends (Ollama, Mistral, Hugging Face Spaces) hold no weights and are estimated at 0.
+    """
+    attributes = getattr(model_inference_instance, '__dict__', {})
+    size = _module_size(model_inference_instance) + sum(_module_size(value) for value in attributes.values())
+    if size:
+        return size
+
+    size = _reserved_gpu_memory(model_inference_instance)
+    if size:
+        return size
+
+    model_name = attributes.get('model_name')
+    return _weights_size(model_name) if isinstance(model_name, str) and model_name else 0
+
+
+def model_cache_key(config: dict) -> str:
+    """
+    Cache and inference worker key of a backend config, <method>_<model>.
+    Hugging Face configs name a Space instead of a model.
+    """
+    method = config.get('method')
+    model = config.get('hf_space') if method == 'huggingface' else config.get('model_name')
+    return f"{method}_{model}"
+
+
+def _release_memory():
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+    try:
+        import mlx.core as mx
+        mx.clear_cache()
+    except (ImportError, AttributeError):
+        pass
+
+
+class ModelCache:
+    """
+    Bounded cache for backend instances, keyed by model_cache_key, <method>_<model>.
+    Least recently used models are evicted when the memory budget or model count is exceeded,
+    pinned models are never evicted.
+    """
+
+    def __init__(self, max_memory_bytes: int = 0, max_models: int = 0, pinned_models=None):
+        """
+        Args:
+            max_memory_bytes (int): Memory budget for cached models, 0 for no limit
+            max_models (int): Maximum number of cached models, 0 for no limit
+            pinned_models (list): Cache keys that are never evicted
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_models = max_models
+        self.pinned_models = set(pinned_models or [])
+        self.entries = OrderedDict()  # key -> entry dict, least recently used first
+        self.lock = threading.Lock()
+        self.load_locks = {}
+        # Totals since the cache was created
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls):
+        """Creates a cache configured from the [model_cache] config section."""
+        from config_utils import get_config
+
+        config = get_config()
+        return cls(max_memory_bytes=int(config.get_float('model_cache', 'max_memory_gb', 0) * 1024 ** 3),
+                   max_models=config.get_int('model_cache', 'max_models', 0),
+                   pinned_models=config.get_list('model_cache', 'pinned_models'))
+
+    def settings(self) -> dict:
+        """Cache limits, used to configure the same cache in inference worker processes."""
+        return {
+            "max_memory_bytes": self.max_memory_bytes,
+            "max_models": self.max_models,
+            "pinned_models": sorted(self.pinned_models)
+        }
+
+    def get_or_load(self, key: str, loader):
+        """
+        Returns the cached instance for key, loading it with loader() on a miss.
+        Concurrent requests for the same model wait for a single load.
+        """
+        with self.lock:
+            instance = self._hit(key)
+            if instance is not None:
+                return instance
+            load_lock = self.load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self.lock:
+                instance = self._hit(key)
+                if instance is not None:
+                    return instance
+                self.misses += 1
+
+            start_time = time.time()
+            instance = loader()
+            load_time = time.time() - start_time
+
+            self._add(key, instance, load_time)
+
+        return instance
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __getitem__(self, key):
+        with self.lock:
+            instance = self._hit(key)
+            if instance is None:
+                self.misses += 1
+        if instance is None:
+            raise KeyError(key)
+        return instance
+
+    def __setitem__(self, key, instance):
+        self._add(key, instance, None)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def evict(self, key: str) -> bool:
+        """Removes a model from the cache, returns False if it isn't cached."""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.evictions += 1
+        if entry is None:
+            return False
+
+        print(f"Evicted model {key} from cache")
+        del entry
+        _release_memory()
+        return True
+
+    def stats(self) -> list:
+        """Resident models, least recently used first."""
+        with self.lock:
+            return [{
+                "model": key,
+                "pinned": key in self.pinned_models,
+                "loaded_at": entry["loaded_at"],
+                "load_time": round(entry["load_time"], 3) if entry["load_time"] is not None else None,
+                "last_used": entry["last_used"],
+                "hits": entry["hits"],
+                "estimated_size_mb": round(entry["size"] / 1024 ** 2, 1)
+            } for key, entry in self.entries.items()]
+
+    def counters(self) -> dict:
+        """Hits, misses and evictions since the cache was created."""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def memory_used(self) -> int:
+        with self.lock:
+            return sum(entry["size"] for entry in self.entries.values())
+
+    def _hit(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        entry["hits"] += 1
+        self.hits += 1
+        entry["last_used"] = time.time()
+        self.entries.move_to_end(key)
+        return entry["instance"]
+
+    def _add(self, key, instance, load_time):
+        size = estimate_model_size(instance)
+
+        with self.lock:
+            self.entries[key] = {
+                "instance": instance,
+                "loaded_at": time.time(),
+                "load_time": load_time,
+                "last_used": time.time(),
+                "hits": 0,
+                "size": size
+            }
+            self.entries.move_to_end(key)
+            evicted = self._select_evictions(key)
+            for evicted_key in evicted:
+                del self.entries[evicted_key]
+            self.evictions += len(evicted)
+
+        if evicted:
+            print(f"Evicted models from cache: {', '.join(evicted)}")
+            _release_memory()
+
+    def _select_evictions(self, new_key):
+        """Least recently used, unpinned models to drop so the cache fits its limits again."""
+        evicted = []
+        memory_used = sum(entry["size"] for entry in self.entries.values())
+        model_count = len(self.entries)
+
+        for key, entry in self.entries.items():
+            over_memory = self.max_memory_bytes and memory_used > self.max_memory_bytes
+            over_count = self.max_models and model_count > self.max_models
+            if not over_memory and not over_count:
+                break
+            if key == new_key or key in self.pinned_models:
+                continue
+
+            evicted.append(key)
+            memory_used -= entry["size"]
+            model_count -= 1
+
+        return evicted
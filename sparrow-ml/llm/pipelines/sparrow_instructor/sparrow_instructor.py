@@ -10,8 +10,9 @@ from datetime import datetime
 from rich import print
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-import concurrent.futures
 from pipelines.interface import Pipeline
+from pipelines.inference_pool import get_inference_worker_pool
+from pipelines.model_cache import ModelCache, model_cache_key
 
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -26,19 +27,18 @@ def subprocess_inference(config, input_data, debug_dir, debug, model_cache=None)
     from sparrow_parse.vlmb.inference_factory import InferenceFactory
 
     # Create cache key based on config
-    cache_key = f"{config.get('method')}_{config.get('model_name')}"
+    cache_key = model_cache_key(config)
 
-    # Check if model is already cached
-    if model_cache is not None and cache_key in model_cache:
-        model_inference_instance = model_cache[cache_key]
-    else:
-        # Initialize the extractor and inference instance
+    def load_model():
+        # Initialize the inference instance
         factory = InferenceFactory(config)
-        model_inference_instance = factory.get_inference_instance()
+        return factory.get_inference_instance()
 
-        # Cache the model instance if cache is provided
-        if model_cache is not None:
-            model_cache[cache_key] = model_inference_instance
+    # Reuse the cached model if available, the bounded cache evicts least recently used models
+    if model_cache is not None:
+        model_inference_instance = model_cache.get_or_load(cache_key, load_model)
+    else:
+        model_inference_instance = load_model()
 
     extractor = VLLMExtractor()
 
@@ -60,8 +60,18 @@ def subprocess_inference(config, input_data, debug_dir, debug, model_cache=None)
 
 class SparrowInstructorPipeline(Pipeline):
 
-    def __init__(self, model_cache: dict = None):
-        self.model_cache = model_cache if model_cache is not None else {}
+    def __init__(self, model_cache: ModelCache = None):
+        self.model_cache = model_cache if model_cache is not None else ModelCache()
+
+    def warm_up(self, options: List[str] = None) -> None:
+        """
+        Loads the backend model and runs one tiny text inference through the same path as API requests,
+        so the model stays resident in the API process or its inference worker.
+        """
+        if self._configure_inference_backend(options) is None:
+            raise ValueError(f"Inference backend is not set up for options: {options}")
+
+        self.execute_query(options, "instruction: reply with OK, payload: ping", None, False, self.model_cache)
 
     def run_pipeline(self,
                      pipeline: str,
@@ -85,7 +95,7 @@ class SparrowInstructorPipeline(Pipeline):
         start = timeit.default_timer()
 
         # check query to be in format "instruction: do math, payload: 2+2=", instruction: and payload: fields must be present
-        if not query or "instruction:" not in query or "payload:" not in query:
+        if not self._is_valid_query(query):
             error_message = "Invalid query format. Query must contain both 'instruction:' and 'payload:' fields."
             print(error_message)
             return {"error": error_message}
@@ -98,6 +108,7 @@ class SparrowInstructorPipeline(Pipeline):
                                                                 f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Executing query", local)
 
         llm_output = llm_output_list[0] if len(llm_output_list) > 0 else "No output from inference backend"
+        llm_output = self._parse_answer(llm_output)
 
         end = timeit.default_timer()
 
@@ -106,17 +117,68 @@ class SparrowInstructorPipeline(Pipeline):
         return llm_output
 
 
+    def run_batch(self,
+                  queries: List[str],
+                  options: List[str] = None,
+                  debug_dir: str = None,
+                  debug: bool = False,
+                  local: bool = True) -> List[Any]:
+        """
+        Runs several instruction queries as one inference job. The backend receives all queries at once,
+        vLLM batches them in a single call and remote API backends run them concurrently.
+
+        Args:
+            queries (list): Queries in "instruction: ..., payload: ..." format
+            options (list): Inference backend options
+            debug_dir (str): Directory for debug output
+            debug (bool): Flag for enabling debug mode
+            local (bool): Flag for local mode
+
+        Returns:
+            list: Answers in query order, JSON answers parsed, invalid queries get an error dict
+        """
+        print(f"\nRunning batch of {len(queries)} queries with sparrow-instructor\n")
+
+        start = timeit.default_timer()
+
+        answers = [{"error": "Invalid query format. Query must contain both 'instruction:' and 'payload:' fields."}
+                   for _ in queries]
+        valid_indexes = [i for i, query in enumerate(queries) if self._is_valid_query(query)]
+
+        if valid_indexes:
+            llm_output_list, num_pages = self.invoke_pipeline_step(lambda: self.execute_query(options,
+                                                                                              [queries[i] for i in valid_indexes],
+                                                                                              debug_dir,
+                                                                                              debug,
+                                                                                              self.model_cache),
+                                                                    f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Executing {len(valid_indexes)} queries", local)
+
+            if isinstance(llm_output_list, str):
+                # Backend is not set up, the same message applies to every query
+                llm_output_list = [llm_output_list] * len(valid_indexes)
+
+            for position, i in enumerate(valid_indexes):
+                llm_output = llm_output_list[position] if position < len(llm_output_list) else "No output from inference backend"
+                answers[i] = self._parse_answer(llm_output)
+
+        end = timeit.default_timer()
+
+        print(f"Time to retrieve answers: {end - start}")
+
+        return answers
+
+
     def execute_query(self, options, query, debug_dir, debug, model_cache):
         """
         Executes the query using the specified inference backend.
-        For vLLM backend, calls inference directly. For other backends, uses subprocess execution.
+        For vLLM backend, calls inference directly. For other backends, uses a persistent inference worker process.
 
         Args:
             options (list): Inference backend options (e.g., ['huggingface', 'some_space']).
-            query (str): Query text.
+            query (str or list): Query text, or a list of query texts to run in one inference call.
             debug_dir (str): Directory for debug output.
             debug (bool): Flag for enabling debug mode.
-            model_cache (dict): Cache for storing model instances.
+            model_cache (ModelCache): Cache for storing model instances.
 
         Returns:
             Tuple: (llm_output, num_pages)
@@ -126,12 +188,14 @@ class SparrowInstructorPipeline(Pipeline):
         if config is None:
             return "Inference backend is not set up for this option", 0
 
-        # Prepare input data for inference
+        # Prepare input data for inference, one text-only item per query
+        queries = query if isinstance(query, list) else [query]
         input_data = [
             {
                 "file_path": None,
-                "text_input": query
+                "text_input": text_input
             }
+            for text_input in queries
         ]
 
         # For vLLM backend, call directly without subprocess
@@ -144,21 +208,34 @@ class SparrowInstructorPipeline(Pipeline):
                 model_cache
             )
         else:
-            # Offload inference to a subprocess for other backends
-            with concurrent.futures.ProcessPoolExecutor() as executor:
-                future = executor.submit(
-                    subprocess_inference,  # Call the top-level function
-                    config,
-                    input_data,
-                    debug_dir,
-                    debug,
-                    None  # No model cache for subprocess execution
-                )
-                llm_output, num_pages = future.result()
+            # Offload inference to a long-lived worker process pinned to this backend/model,
+            # the worker keeps its own model cache between requests
+            llm_output, num_pages = get_inference_worker_pool().run(
+                model_cache_key(config),
+                subprocess_inference,  # Call the top-level function
+                config,
+                input_data,
+                debug_dir,
+                debug
+            )
 
         return llm_output, num_pages
 
 
+    @staticmethod
+    def _is_valid_query(query):
+        return bool(query) and "instruction:" in query and "payload:" in query
+
+
+    @staticmethod
+    def _parse_answer(llm_output):
+        # JSON answers are returned parsed, text answers as is
+        try:
+            return json.loads(llm_output) if isinstance(llm_output, str) else llm_output
+        except json.JSONDecodeError:
+            return llm_output
+
+
     @staticmethod
     def _configure_inference_backend(options):
         """
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+from rich import print
+
+
+class DocumentContext:
+    """
+    State of one document shared by the steps of table extraction: the layout OCR output of the first pass,
+    its table/non-table split per page, single-page files and page images. Page files and images are written
+    at most once, on first use, into a private temporary directory, so nothing is written next to the source
+    document. Use as a context manager to remove them afterwards.
+    """
+
+    def __init__(self, file_path: str, ocr_output, tables_by_page: list, non_tables_by_page: list,
+                 debug_dir: str = None):
+        """
+        Args:
+            file_path (str): Path to the source document
+            ocr_output: Normalized layout OCR output of the first pass
+            tables_by_page (list): Table entries per page, see extract_tables_from_ocr
+            non_tables_by_page (list): Non-table entries per page, see extract_non_tables_from_ocr
+            debug_dir (str): Directory to save debug copies of rendered pages
+        """
+        self.file_path = file_path
+        self.ocr_output = ocr_output
+        self.tables_by_page = tables_by_page
+        self.non_tables_by_page = non_tables_by_page
+        self.debug_dir = debug_dir
+        self.is_pdf = file_path.lower().endswith('.pdf')
+        self.page_images = {}
+        self.page_files = {}
+        self.temp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def non_tables_for_page(self, page_number: int) -> list:
+        """Non-table layout entries of one page from the first pass."""
+        for page_info in self.non_tables_by_page:
+            if page_info['page'] == page_number:
+                return page_info['non_tables']
+        return []
+
+    def page_file_path(self, page_number: int) -> str:
+        """
+        Single-page PDF of a page of a multi-page PDF, for single-page documents and images the source file itself.
+
+        Args:
+            page_number (int): 1-based page number
+
+        Returns:
+            str: Path to the page file, written on first call and reused afterwards
+        """
+        if not self.is_pdf:
+            return self.file_path
+
+        if page_number not in self.page_files:
+            from pypdf import PdfReader, PdfWriter
+
+            reader = PdfReader(self.file_path)
+            if len(reader.pages) == 1:
+                self.page_files[page_number] = self.file_path
+                return self.file_path
+
+            if self.temp_dir is None:
+                self.temp_dir = tempfile.mkdtemp()
+
+            writer = PdfWriter()
+            writer.add_page(reader.pages[page_number - 1])
+            base_name = os.path.splitext(os.path.basename(self.file_path))[0]
+            page_path = os.path.join(self.temp_dir, f'{base_name}_page_{page_number}.pdf')
+            with open(page_path, 'wb') as page_file:
+                writer.write(page_file)
+
+            self.page_files[page_number] = page_path
+
+        return self.page_files[page_number]
+
+    def page_image_path(self, page_number: int) -> str:
+        """
+        Image of a single page, for images the source file itself.
+
+        Args:
+            page_number (int): 1-based page number
+
+        Returns:
+            str: Path to the page image, rendered on first call and reused afterwards
+        """
+        if not self.is_pdf:
+            return self.file_path
+
+        if page_number not in self.page_images:
+            from pdf2image import convert_from_path
+
+            if self.temp_dir is None:
+                self.temp_dir = tempfile.mkdtemp()
+
+            # Same resolution as the pages rendered for the first pass
+            image = convert_from_path(self.file_path, dpi=300, first_page=page_number, last_page=page_number)[0]
+            base_name = os.path.splitext(os.path.basename(self.file_path))[0]
+            image_path = os.path.join(self.temp_dir, f'{base_name}_page_{page_number}.jpg')
+            image.save(image_path, 'JPEG')
+
+            if self.debug_dir:
+                os.makedirs(self.debug_dir, exist_ok=True)
+                debug_image_path = os.path.join(self.debug_dir, f'{base_name}_page_{page_number}_debug.jpg')
+                image.save(debug_image_path, 'JPEG')
+                print(f"Debug image saved to: {debug_image_path}")
+
+            self.page_images[page_number] = image_path
+
+        return self.page_images[page_number]
+
+    def close(self):
+        """Removes page files and rendered page images."""
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+            self.page_images = {}
+            self.page_files = {}
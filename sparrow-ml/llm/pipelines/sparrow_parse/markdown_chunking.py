@@ -0,0 +1,167 @@
+import json
+import re
+from typing import Any, List
+
+
+_html_table_pattern = re.compile(r'<table\b.*?</table>', re.IGNORECASE | re.DOTALL)
+_html_row_pattern = re.compile(r'<tr\b.*?</tr>', re.IGNORECASE | re.DOTALL)
+_blank_line_pattern = re.compile(r'\n\s*\n')
+
+
+def _split_text_blocks(text: str) -> List[str]:
+    """Splits markdown text into paragraphs and pipe tables, a pipe table is kept as one block."""
+    blocks = []
+    for paragraph in _blank_line_pattern.split(text):
+        if not paragraph.strip():
+            continue
+
+        # Pipe tables may follow a paragraph line without a blank line in between
+        current = []
+        in_table = False
+        for line in paragraph.split('\n'):
+            is_table_line = line.lstrip().startswith('|')
+            if current and is_table_line != in_table:
+                blocks.append('\n'.join(current))
+                current = []
+            current.append(line)
+            in_table = is_table_line
+        if current:
+            blocks.append('\n'.join(current))
+
+    return blocks
+
+
+def _split_blocks(markdown_content: str) -> List[str]:
+    """Splits markdown into blocks, HTML tables are kept whole."""
+    blocks = []
+    position = 0
+    for table_match in _html_table_pattern.finditer(markdown_content):
+        blocks.extend(_split_text_blocks(markdown_content[position:table_match.start()]))
+        blocks.append(table_match.group(0))
+        position = table_match.end()
+    blocks.extend(_split_text_blocks(markdown_content[position:]))
+
+    return blocks
+
+
+def _pack(pieces: List[str], max_chars: int, prefix: str = "", suffix: str = "", separator: str = "\n") -> List[str]:
+    """Greedily packs pieces into chunks of up to max_chars, each chunk wrapped in prefix and suffix."""
+    chunks = []
+    current = []
+    current_size = len(prefix) + len(suffix)
+
+    for piece in pieces:
+        piece_size = len(piece) + len(separator)
+        if current and current_size + piece_size > max_chars:
+            chunks.append(prefix + separator.join(current) + suffix)
+            current = []
+            current_size = len(prefix) + len(suffix)
+        current.append(piece)
+        current_size += piece_size
+
+    if current:
+        chunks.append(prefix + separator.join(current) + suffix)
+
+    return chunks
+
+
+def _split_html_table(table: str, max_chars: int) -> List[str]:
+    """Splits an HTML table at row boundaries, the header row is repeated in every part."""
+    rows = _html_row_pattern.findall(table)
+    if len(rows) < 2:
+        return [table]
+
+    table_open = table[:table.lower().index('<tr')]
+    header_row = rows[0]
+    prefix = f"{table_open}{header_row}\n"
+    return _pack(rows[1:], max_chars, prefix=prefix, suffix="\n</table>")
+
+
+def _split_oversized_block(block: str, max_chars: int) -> List[str]:
+    if _html_table_pattern.fullmatch(block):
+        return _split_html_table(block, max_chars)
+
+    lines = block.split('\n')
+    if len(lines) > 2 and lines[0].lstrip().startswith('|'):
+        # Pipe table, header and separator lines are repeated in every part
+        prefix = f"{lines[0]}\n{lines[1]}\n"
+        return _pack(lines[2:], max_chars, prefix=prefix)
+
+    # Plain text, split at line boundaries. A single line longer than max_chars is kept whole
+    return _pack(lines, max_chars)
+
+
+def split_markdown(markdown_content: str, max_chars: int) -> List[str]:
+    """
+    Splits page markdown into chunks of up to max_chars, at block and table row boundaries.
+    Tables split over several chunks repeat their header row, so every chunk can be extracted on its own.
+
+    Args:
+        markdown_content (str): Page markdown, may contain HTML or pipe tables
+        max_chars (int): Target chunk size, 0 or less disables chunking
+
+    Returns:
+        list: Markdown chunks in document order, a single chunk if the content fits
+    """
+    if not isinstance(markdown_content, str) or max_chars <= 0 or len(markdown_content) <= max_chars:
+        return [markdown_content]
+
+    pieces = []
+    for block in _split_blocks(markdown_content):
+        if len(block) > max_chars:
+            pieces.extend(_split_oversized_block(block, max_chars))
+        else:
+            pieces.append(block)
+
+    return _pack(pieces, max_chars, separator="\n\n")
+
+
+def _vote(values: List[Any]) -> Any:
+    """Most frequent value, ties go to the value seen first in document order."""
+    counts = {}
+    first_values = {}
+    for value in values:
+        key = json.dumps(value, sort_keys=True)
+        counts[key] = counts.get(key, 0) + 1
+        first_values.setdefault(key, value)
+
+    best_key = max(counts, key=lambda key: counts[key])  # max keeps the first key on ties
+    return first_values[best_key]
+
+
+def merge_extraction_results(results: List[Any]) -> Any:
+    """
+    Merges structured data extracted from chunks of the same page, deterministically in chunk order.
+    Arrays are concatenated, objects are merged key by key and conflicting scalar values are resolved
+    by majority vote, with ties going to the earliest chunk. Missing and null values never override data.
+
+    Args:
+        results (list): Parsed chunk results in document order
+
+    Returns:
+        Merged result, None if all results are empty
+    """
+    values = [result for result in results if result is not None]
+    if not values:
+        return None
+
+    if all(isinstance(value, list) for value in values):
+        return [item for value in values for item in value]
+
+    if all(isinstance(value, dict) for value in values):
+        keys = []
+        for value in values:
+            keys.extend(key for key in value if key not in keys)
+        return {key: merge_extraction_results([value.get(key) for value in values]) for key in keys}
+
+    if any(isinstance(value, list) for value in values):
+        # A field extracted as a single item in one chunk and as an array in another
+        merged = []
+        for value in values:
+            merged.extend(value if isinstance(value, list) else [value])
+        return merged
+
+    scalars = [value for value in values if not isinstance(value, dict)]
+    if not scalars:
+        return values[0]
+    return _vote(scalars)
@@ -0,0 +1,124 @@
+import json
+from functools import lru_cache
+from rich import print
+from .sparrow_validator import get_json_validator
+
+
+# Rough prompt size estimate used for the token budget, about 4 characters per token for English text and JSON
+CHARS_PER_TOKEN = 4
+
+
+def load_hints(hints_file_path: str) -> str:
+    """
+    Reads a JSON hints file and returns its content serialized as a compact string.
+    Hints are uploaded per request to a new temporary file, so the file is read every time and plans are cached
+    by the hints content instead.
+
+    Args:
+        hints_file_path: Path to the hints file
+
+    Returns:
+        Content of the JSON file as a string, or empty string if not a JSON file or file doesn't exist
+    """
+    if not hints_file_path or not hints_file_path.endswith('.json'):
+        return ""
+
+    try:
+        with open(hints_file_path, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+            return json.dumps(content, ensure_ascii=False)
+    except (FileNotFoundError, json.JSONDecodeError, IOError):
+        return ""
+
+
+def split_schema(schema):
+    """
+    Splits a parsed schema query into form fields and table queries.
+
+    Returns:
+        Tuple of (form_query, table_queries) where:
+        - form_query: Dictionary with form elements or None
+        - table_queries: List of table query dictionaries, arrays with "items" in their name
+    """
+    if not isinstance(schema, dict):
+        return None, []
+
+    # Dictionary for form elements (non-array or arrays without "items" keyword)
+    form_query = {}
+    # Lists to store arrays with "items" in their name
+    table_queries = []
+
+    for key, value in schema.items():
+        if isinstance(value, list) and "items" in key.lower():
+            table_queries.append({key: value})
+        else:
+            form_query[key] = value
+
+    return form_query if form_query else None, table_queries
+
+
+class QueryPlan:
+    """
+    Everything derived from a schema query and its hints, built once and shared by all pages and requests
+    with the same query. Treat it as read-only.
+
+    Attributes:
+        query_schema: Schema query as sent by the client
+        schema: Parsed schema query
+        hints_content: Serialized hints, empty if there are none
+        prompt: Extraction prompt for the vision LLM
+        validator: Compiled validator for the schema, compiled on first use, shared with get_json_validator
+        estimated_prompt_tokens: Token budget taken by the prompt text, estimated from its length
+        form_query: Schema fields extracted from forms by the table pipeline, None if there are none
+        table_queries: Schema arrays with "items" in their name, extracted from tables by the table pipeline
+    """
+
+    def __init__(self, query_schema: str, hints_content: str):
+        self.query_schema = query_schema
+        self.schema = json.loads(query_schema)
+        self.hints_content = hints_content
+
+        hints_section = f"\n\nAdditional Hints:\n{hints_content}" if hints_content else ""
+        self.prompt = ("retrieve data based on provided JSON schema. return response in JSON format, by strictly "
+                       "following this JSON schema: " + query_schema +
+                       ". If a field is not visible or cannot be found in the document, return null. Do not guess, "
+                       "infer, or generate values for missing fields." + hints_section)
+        self.estimated_prompt_tokens = len(self.prompt) // CHARS_PER_TOKEN
+
+        self.form_query, self.table_queries = split_schema(self.schema)
+        self._validator = None
+
+    @property
+    def validator(self):
+        # Compiled when validation runs, queries with validation off never need it
+        if self._validator is None:
+            self._validator = get_json_validator(self.query_schema)
+        return self._validator
+
+
+@lru_cache(maxsize=256)
+def _build_query_plan(query: str, hints_content: str) -> QueryPlan:
+    return QueryPlan(query, hints_content)
+
+
+def get_query_plan(query: str, hints_file_path: str = None) -> QueryPlan:
+    """
+    Returns the compiled plan for a schema query, cached by the query text and the hints content.
+
+    Args:
+        query: Schema query JSON string
+        hints_file_path: Optional path to a JSON file containing query hints
+
+    Returns:
+        QueryPlan: Shared, read-only query plan
+
+    Raises:
+        ValueError: If the query isn't valid JSON
+    """
+    hints_content = load_hints(hints_file_path)
+
+    try:
+        return _build_query_plan(query, hints_content)
+    except (json.JSONDecodeError, TypeError) as e:
+        print("JSONDecodeError:", e)
+        raise ValueError("Invalid query. Please provide a valid JSON query.")
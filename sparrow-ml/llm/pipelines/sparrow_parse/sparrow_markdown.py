@@ -1,8 +1,17 @@
 import json
+from config_utils import get_config
 from pipelines.interface import get_pipeline
+from pipelines.sparrow_parse.markdown_chunking import split_markdown, merge_extraction_results
+from pipelines.sparrow_parse.query_plan import load_hints
 from pipelines.sparrow_parse.sparrow_utils import add_page_number
 
 
+INVALID_JSON_ANSWER = {
+    "message": "Invalid JSON format in LLM output",
+    "valid": "false"
+}
+
+
 def read_hints_from_json(hints_file_path: str) -> str:
     """
     Check if hints_file_path points to a JSON file and read its content.
@@ -13,20 +22,15 @@ def read_hints_from_json(hints_file_path: str) -> str:
     Returns:
         Content of the JSON file as a string, or empty string if not a JSON file or file doesn't exist
     """
-    if hints_file_path and hints_file_path.endswith('.json'):
-        try:
-            with open(hints_file_path, 'r', encoding='utf-8') as f:
-                content = json.load(f)
-                return json.dumps(content, ensure_ascii=False)
-        except (FileNotFoundError, json.JSONDecodeError, IOError):
-            return ""
-    return ""
+    return load_hints(hints_file_path)
 
 
 def process_markdown_extraction(rag, user_selected_pipeline, query, file_path, hints_file_path, options, crop_size,
                                instruction, validation, ocr, markdown, page_type, debug_dir, debug, local):
     """
     Process document with markdown extraction and structured data extraction.
+    Pages with markdown longer than [markdown] chunk_max_chars are split at block and table row boundaries,
+    chunks are extracted in parallel against the same schema and merged back into one page result.
 
     Args:
         rag: Pipeline instance
@@ -56,7 +60,6 @@ def process_markdown_extraction(rag, user_selected_pipeline, query, file_path, h
                                             crop_size, instruction, validation, ocr, markdown, False, None, page_type, debug_dir,
                                             debug, local)
 
-    combined_output = []
     try:
         markdown_output_list = json.loads(markdown_output_list) if isinstance(markdown_output_list, str) else markdown_output_list
     except (json.JSONDecodeError, ValueError):
@@ -64,36 +67,76 @@ def process_markdown_extraction(rag, user_selected_pipeline, query, file_path, h
     markdown_output_list = [markdown_output_list] if not isinstance(markdown_output_list, list) else markdown_output_list
     num_pages = len(markdown_output_list)
 
+    max_chars = get_config().get_int('markdown', 'chunk_max_chars', 0)
+
+    # Flat list of prompts for all pages and chunks, page_indexes maps every prompt back to its page
+    instruction_queries = []
+    page_indexes = []
     for i, markdown_output in enumerate(markdown_output_list):
-        instruction_query = create_extraction_prompt(markdown_content=markdown_output, schema_query=query, hints_file_path=hints_file_path)
+        chunks = split_markdown(markdown_output, max_chars)
+        for chunk_index, chunk in enumerate(chunks):
+            instruction_queries.append(create_extraction_prompt(markdown_content=chunk, schema_query=query,
+                                                                hints_file_path=hints_file_path,
+                                                                chunk_index=chunk_index, chunk_count=len(chunks)))
+            page_indexes.append(i)
+
+    if debug and len(instruction_queries) > num_pages:
+        print(f"\nSplit {num_pages} pages into {len(instruction_queries)} chunks of up to {max_chars} characters")
 
-        if debug:
+    if debug:
+        for instruction_query in instruction_queries:
             print("\nInstruction query:\n")
             print(instruction_query)
 
-        rag = get_pipeline("sparrow-instructor")
-        answer = rag.run_pipeline("sparrow-instructor", instruction_query, None, None, options, crop_size,
-                                  instruction, validation, ocr, markdown, False, None, page_type,
-                                  debug_dir, debug, local)
+    # Reuse the caller's model cache, so the instructor model stays loaded between pages and requests
+    instructor = get_pipeline("sparrow-instructor", rag.model_cache)
+
+    if len(instruction_queries) == 1:
+        return instructor.run_pipeline("sparrow-instructor", instruction_queries[0], None, None, options, crop_size,
+                                       instruction, validation, ocr, markdown, False, None, page_type,
+                                       debug_dir, debug, local)
+
+    # All pages and chunks go to the backend as one batch, answers come back in prompt order
+    answers = instructor.run_batch(instruction_queries, options, debug_dir, debug, local)
+
+    page_answers = [[] for _ in range(num_pages)]
+    for i, answer in zip(page_indexes, answers):
+        page_answers[i].append(answer)
 
-        if num_pages > 1:
-            try:
-                answer = json.loads(answer) if isinstance(answer, str) else answer
-            except json.JSONDecodeError:
-                answer = {
-                    "message": "Invalid JSON format in LLM output",
-                    "valid": "false"
-                }
-            answer = add_page_number(answer, i + 1)
-            combined_output.append(answer)
+    combined_output = []
+    for i, chunk_answers in enumerate(page_answers):
+        answer = merge_page_answers(chunk_answers)
+        if num_pages == 1:
+            return answer
+        combined_output.append(add_page_number(answer, i + 1))
 
-    if num_pages > 1:
-        answer = json.dumps(combined_output, indent=4, ensure_ascii=False)
+    return combined_output
 
-    return answer
 
+def merge_page_answers(chunk_answers: list):
+    """
+    Merges answers extracted from the chunks of one page. Chunks without valid JSON are skipped.
 
-def create_extraction_prompt(markdown_content: str, schema_query: str, hints_file_path: str = None) -> str:
+    Args:
+        chunk_answers: Parsed instructor answers in chunk order
+
+    Returns:
+        Merged page result, or an invalid JSON message if no chunk returned valid JSON
+    """
+    if len(chunk_answers) == 1:
+        answer = chunk_answers[0]
+        return dict(INVALID_JSON_ANSWER) if isinstance(answer, str) else answer
+
+    valid_answers = [answer for answer in chunk_answers
+                     if isinstance(answer, (dict, list)) and "error" not in answer]
+    if not valid_answers:
+        return dict(INVALID_JSON_ANSWER)
+
+    return merge_extraction_results(valid_answers)
+
+
+def create_extraction_prompt(markdown_content: str, schema_query: str, hints_file_path: str = None,
+                             chunk_index: int = 0, chunk_count: int = 1) -> str:
     """
     Generate a prompt for LLM to extract structured data from markdown.
 
@@ -101,6 +144,8 @@ def create_extraction_prompt(markdown_content: str, schema_query: str, hints_fil
         markdown_content: The markdown text to extract data from
         schema_query: JSON schema string defining the structure of data to extract
         hints_file_path: Optional path to JSON file containing query hints
+        chunk_index: Index of the markdown chunk when a page is split into several prompts
+        chunk_count: Number of chunks the page was split into
 
     Returns:
         A formatted prompt string with instruction and payload sections
@@ -113,6 +158,8 @@ def create_extraction_prompt(markdown_content: str, schema_query: str, hints_fil
     # Read hints from JSON file if provided
     hints_content = read_hints_from_json(hints_file_path)
     hints_section = f"\n\nAdditional Hints:\n{hints_content}" if hints_content else ""
+    chunk_guideline = (f"\n- The markdown is part {chunk_index + 1} of {chunk_count} of a page, extract only the data present in this part"
+                       if chunk_count > 1 else "")
 
     # Build the instruction section
     instruction = f"""instruction:
@@ -125,7 +172,7 @@ Guidelines:
 - If a field is not present or cannot be determined, use null
 - Return ONLY valid JSON that conforms to the schema
 - Preserve numerical accuracy and formatting where relevant
-- Handle special characters and unicode properly
+- Handle special characters and unicode properly{chunk_guideline}
 
 Schema Query:
 {schema_query}{hints_section}
@@ -141,3 +188,57 @@ Return a JSON object or array matching the schema structure. Do not include any
     prompt = f"{instruction}\n\n{payload}"
 
     return prompt
+
+
+def benchmark_chunked_extraction(options: list, rows: int = 300, max_chars: int = 6000):
+    """
+    Compares extraction latency for one dense table page sent as a single prompt against the same page
+    split into chunks extracted in one parallel batch. Needs a running inference backend.
+
+    Args:
+        options: Instructor backend options, e.g. ['ollama', 'mistral-small3.2:24b']
+        rows: Rows in the generated statement table
+        max_chars: Chunk size for the chunked run
+    """
+    import timeit
+
+    schema_query = json.dumps([{"date": "str", "description": "str", "amount": 0.0, "balance": 0.0}])
+    table_rows = "\n".join(f"<tr><td>2024-01-{row % 28 + 1:02d}</td><td>Card payment {row}</td>"
+                           f"<td>{row * 3.25:.2f}</td><td>{10000 - row * 3.25:.2f}</td></tr>" for row in range(rows))
+    page = ("# Account statement\n\nSparrow Bank, account CH93 0076 2011 6238 5295 7\n\n"
+            f"<table>\n<tr><th>Date</th><th>Description</th><th>Amount</th><th>Balance</th></tr>\n{table_rows}\n</table>")
+
+    chunks = split_markdown(page, max_chars)
+    instructor = get_pipeline("sparrow-instructor")
+    instructor.warm_up(options)
+
+    start = timeit.default_timer()
+    single_answer = instructor.run_pipeline("sparrow-instructor", create_extraction_prompt(page, schema_query),
+                                            None, options=options, local=True)
+    single_time = timeit.default_timer() - start
+
+    start = timeit.default_timer()
+    chunk_queries = [create_extraction_prompt(chunk, schema_query, chunk_index=i, chunk_count=len(chunks))
+                     for i, chunk in enumerate(chunks)]
+    chunked_answer = merge_page_answers(instructor.run_batch(chunk_queries, options, local=True))
+    chunked_time = timeit.default_timer() - start
+
+    def row_count(answer):
+        return len(answer) if isinstance(answer, list) else 0
+
+    print(f"Page: {len(page)} characters, {rows} table rows, {len(chunks)} chunks of up to {max_chars} characters")
+    print(f"Single prompt: {single_time:.2f} s, {row_count(single_answer)} rows extracted")
+    print(f"Chunked: {chunked_time:.2f} s, {row_count(chunked_answer)} rows extracted")
+    print(f"Speedup: {single_time / chunked_time:.1f}x")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m pipelines.sparrow_parse.sparrow_markdown <method,model_name> [rows] [max_chars]")
+        sys.exit(1)
+
+    benchmark_chunked_extraction(sys.argv[1].split(','),
+                                 rows=int(sys.argv[2]) if len(sys.argv) > 2 else 300,
+                                 max_chars=int(sys.argv[3]) if len(sys.argv) > 3 else 6000)
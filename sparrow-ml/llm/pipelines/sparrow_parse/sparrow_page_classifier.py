@@ -0,0 +1,131 @@
+import json
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from pypdf import PdfReader
+
+
+class PageTypeClassifier:
+    """
+    Lightweight local page type classifier based on the PDF text layer.
+
+    Each page type is described by labelled example texts (full page texts or keyword lists).
+    Examples are turned into TF-IDF centroids once, pages are matched with cosine similarity,
+    which takes milliseconds per page on CPU. Pages without a text layer, with an ambiguous match
+    or with requested page types that have no examples get low confidence, so the caller can route
+    them to the vision LLM instead.
+    """
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, examples: Dict[str, List[str]]):
+        """
+        Trains the classifier from labelled examples.
+
+        Args:
+            examples: Mapping of page type to a list of example texts for that type
+        """
+        token_counts = {
+            page_type: Counter(token for text in texts for token in self.tokenize(text))
+            for page_type, texts in examples.items()
+        }
+
+        # Document frequency across page types - tokens shared by all types carry no signal
+        document_frequency = Counter(token for counts in token_counts.values() for token in counts)
+        num_types = len(token_counts)
+        self.idf = {
+            token: math.log((1 + num_types) / (1 + frequency)) + 1
+            for token, frequency in document_frequency.items()
+        }
+
+        self.centroids = {
+            page_type: self._normalize({token: count * self.idf[token] for token, count in counts.items()})
+            for page_type, counts in token_counts.items()
+        }
+
+    @classmethod
+    def from_json(cls, examples_file_path: str) -> "PageTypeClassifier":
+        """Creates the classifier from a JSON file with {"page_type": ["example text", ...]} structure."""
+        with open(examples_file_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        return cls.TOKEN_PATTERN.findall(text.lower())
+
+    @staticmethod
+    def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        if norm == 0:
+            return {}
+        return {token: value / norm for token, value in vector.items()}
+
+    def classify(self, text: str, page_types: List[str] = None) -> Tuple[Optional[str], float]:
+        """
+        Classifies a single page text.
+
+        Args:
+            text: Page text from the PDF text layer
+            page_types: Optional list of allowed page types, all trained types are used when not set
+
+        Returns:
+            Tuple of (page_type, confidence), confidence is between 0 and 1.
+            page_type is None when the text does not match any known type, or when a requested
+            page type has no examples, so the page can't be told apart from it.
+        """
+        # A page of a type without examples would be matched to one of the trained types
+        if page_types and any(page_type not in self.centroids for page_type in page_types):
+            return None, 0.0
+
+        candidates = list(page_types or self.centroids)
+        counts = Counter(self.tokenize(text or ""))
+        vector = self._normalize({token: count * self.idf[token] for token, count in counts.items() if token in self.idf})
+
+        if not candidates or not vector:
+            return None, 0.0
+
+        scores = sorted(
+            ((sum(weight * self.centroids[page_type].get(token, 0.0) for token, weight in vector.items()), page_type)
+             for page_type in candidates),
+            reverse=True
+        )
+
+        best_score, best_type = scores[0]
+        if best_score == 0:
+            return None, 0.0
+
+        second_score = scores[1][0] if len(scores) > 1 else 0.0
+        # Confidence is the similarity margin over the runner-up type, weak or ambiguous matches stay low
+        confidence = best_score - second_score
+        return best_type, round(confidence, 4)
+
+    def classify_pdf(self, file_path: str, page_types: List[str] = None) -> List[Dict]:
+        """
+        Classifies every page of a PDF document from its text layer.
+
+        Args:
+            file_path: Path to the PDF file
+            page_types: Optional list of allowed page types
+
+        Returns:
+            List of dicts with 'page', 'page_type' and 'confidence' keys, one per page
+        """
+        reader = PdfReader(file_path)
+        results = []
+
+        for page_num, page in enumerate(reader.pages):
+            try:
+                text = page.extract_text()
+            except Exception:
+                text = ""
+
+            page_type, confidence = self.classify(text, page_types)
+            results.append({
+                "page": page_num + 1,
+                "page_type": page_type,
+                "confidence": confidence
+            })
+
+        return results
@@ -1,33 +1,39 @@
 # Standard library imports
 import json
 import os
+import tempfile
 import timeit
 import warnings
 from typing import Any, List, Tuple, Optional, Dict
 from datetime import datetime
+from functools import lru_cache
 
 # Third-party library imports
 from rich import print
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 # Local imports
-from .sparrow_validator import JSONValidator
+from .query_plan import QueryPlan, get_query_plan, load_hints
 from .sparrow_utils import (
-    is_valid_json,
     get_json_keys_as_string,
     add_validation_message,
     add_page_number
 )
 from .sparrow_experimental import process_ocr_data
-import concurrent.futures
+from .sparrow_page_classifier import PageTypeClassifier
+from pypdf import PdfReader, PdfWriter
 from pipelines.interface import Pipeline
+from pipelines.inference_pool import get_inference_worker_pool
+from pipelines.model_cache import ModelCache, model_cache_key
+from config_utils import get_config
+from metrics import VALIDATION_FAILURES
 
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
 
-def subprocess_inference(config, input_data, tables_only, crop_size, query_all_data, apply_annotation, ocr_callback, debug_dir, debug, model_cache=None):
+def subprocess_inference(config, input_data, tables_only, crop_size, query_all_data, apply_annotation, ocr_callback, debug_dir, debug, model_cache=None, text_layer=False, table_structure=False, table_detection_runtime="fp32"):
     """
     Subprocess function to execute the inference logic.
     """
@@ -35,21 +41,20 @@ def subprocess_inference(config, input_data, tables_only, crop_size, query_all_d
     from sparrow_parse.vlmb.inference_factory import InferenceFactory
 
     # Create cache key based on config
-    cache_key = f"{config.get('method')}_{config.get('model_name')}"
+    cache_key = model_cache_key(config)
 
-    # Check if model is already cached
-    if model_cache is not None and cache_key in model_cache:
-        model_inference_instance = model_cache[cache_key]
-    else:
-        # Initialize the extractor and inference instance
+    def load_model():
+        # Initialize the inference instance
         factory = InferenceFactory(config)
-        model_inference_instance = factory.get_inference_instance()
+        return factory.get_inference_instance()
 
-        # Cache the model instance if cache is provided
-        if model_cache is not None:
-            model_cache[cache_key] = model_inference_instance
+    # Reuse the cached model if available, the bounded cache evicts least recently used models
+    if model_cache is not None:
+        model_inference_instance = model_cache.get_or_load(cache_key, load_model)
+    else:
+        model_inference_instance = load_model()
 
-    extractor = VLLMExtractor()
+    extractor = VLLMExtractor(table_detection_runtime=table_detection_runtime)
 
     # Run inference
     llm_output, num_pages = extractor.run_inference(
@@ -62,17 +67,44 @@ def subprocess_inference(config, input_data, tables_only, crop_size, query_all_d
         apply_annotation=apply_annotation,
         ocr_callback=ocr_callback,
         debug=debug,
-        mode=None
+        mode=None,
+        text_layer=text_layer,
+        table_structure=table_structure
     )
 
-    # Return results
-    return llm_output, num_pages
+    # Return results, with the route of each page when the text layer option is used (None otherwise)
+    return llm_output, num_pages, extractor.page_routes if text_layer else None
+
+
+@lru_cache(maxsize=4)
+def load_page_classifier(examples_file_path):
+    """
+    Loads and trains the local page type classifier once per examples file.
+    """
+    return PageTypeClassifier.from_json(examples_file_path)
 
 
 class SparrowParsePipeline(Pipeline):
 
-    def __init__(self, model_cache: dict = None):
-        self.model_cache = model_cache if model_cache is not None else {}
+    def __init__(self, model_cache: ModelCache = None):
+        self.model_cache = model_cache if model_cache is not None else ModelCache()
+
+    def warm_up(self, options: List[str] = None) -> None:
+        """
+        Loads the backend model and runs one tiny image inference through the same path as API requests,
+        so the model stays resident in the API process or its inference worker.
+        """
+        from PIL import Image
+
+        if self._configure_inference_backend(options)[0] is None:
+            raise ValueError(f"Inference backend is not set up for options: {options}")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = os.path.join(temp_dir, "warm_up.png")
+            Image.new("RGB", (64, 64), "white").save(image_path)
+
+            self.execute_query(options, None, False, None, "retrieve document title. return response in JSON format",
+                               image_path, None, False, self.model_cache, False)
 
     def run_pipeline(self,
                      pipeline: str,
@@ -95,14 +127,30 @@ class SparrowParsePipeline(Pipeline):
 
         start = timeit.default_timer()
 
+        # Page type detection for PDFs is done with the local classifier first, if configured
+        if query == "*" and page_type and file_path and file_path.lower().endswith('.pdf'):
+            classifier = self._get_page_classifier()
+            if classifier is not None:
+                llm_output = self.invoke_pipeline_step(
+                    lambda: self.classify_page_types(classifier, page_type, options, crop_size, ocr, file_path,
+                                                     debug_dir, debug, local),
+                    f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Classifying page types",
+                    local
+                )
+
+                end = timeit.default_timer()
+                print(f"Time to retrieve answer: {end - start}")
+
+                return llm_output
+
         # Determine query processing strategy and prepare query
-        query, query_schema, query_all_data = self._process_query(query, instruction, validation, markdown, page_type,
-                                                                  hints_file_path, local)
+        query, query_plan, query_all_data = self._process_query(query, instruction, validation, markdown, page_type,
+                                                                hints_file_path, local)
 
         # Check if ocr is enabled and set callback accordingly
         ocr_callback = process_ocr_data if ocr else None
 
-        llm_output_list, num_pages, tables_only, validation_off, apply_annotation = self.invoke_pipeline_step(
+        llm_output_list, num_pages, tables_only, validation_off, apply_annotation, page_routes = self.invoke_pipeline_step(
             lambda: self.execute_query(options, crop_size, query_all_data, ocr_callback, query, file_path, debug_dir, debug, self.model_cache, local),
             f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Executing query",
             local
@@ -120,9 +168,13 @@ class SparrowParsePipeline(Pipeline):
         if markdown:
             validation_off = True
 
-        llm_output = self.process_llm_output(llm_output_list, num_pages, query_all_data, query_schema, tables_only,
+        llm_output = self.process_llm_output(llm_output_list, num_pages, query_all_data, query_plan, tables_only,
                                              validation_off, markdown, debug, local)
 
+        if page_routes is not None:
+            # Page routes are reported next to the extracted data, not merged into it
+            llm_output = {"data": llm_output, "page_routes": page_routes}
+
         end = timeit.default_timer()
 
         print(f"Time to retrieve answer: {end - start}")
@@ -130,13 +182,86 @@ class SparrowParsePipeline(Pipeline):
         return llm_output
 
 
+    @staticmethod
+    def _get_page_classifier() -> Optional[PageTypeClassifier]:
+        """Returns the local page type classifier if examples are configured, otherwise None."""
+        examples_file_path = get_config().get_str('settings', 'page_classifier_examples', '')
+        if not examples_file_path:
+            return None
+
+        # Relative paths are resolved against the service directory with config.properties, not the CWD
+        if not os.path.isabs(examples_file_path):
+            service_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            examples_file_path = os.path.join(service_dir, examples_file_path)
+
+        if not os.path.exists(examples_file_path):
+            print(f"Page classifier examples file not found: {examples_file_path}")
+            return None
+
+        return load_page_classifier(examples_file_path)
+
+
+    def classify_page_types(self, classifier, page_type, options, crop_size, ocr, file_path, debug_dir, debug, local):
+        """
+        Detects page types with the local classifier and falls back to the vision LLM for low-confidence pages only.
+
+        Returns:
+            str: JSON with the page type per page, in the same format as the vision LLM page type query
+        """
+        min_confidence = get_config().get_float('settings', 'page_classifier_min_confidence', 0.2)
+
+        page_results = classifier.classify_pdf(file_path, page_type)
+        low_confidence_pages = [result["page"] for result in page_results
+                                if result["page_type"] is None or result["confidence"] < min_confidence]
+
+        if debug:
+            print("Local page classification:", page_results)
+            print("Pages sent to vision LLM:", low_confidence_pages)
+
+        combined_output = [{"page_type": result["page_type"], "page": result["page"]} for result in page_results]
+
+        if low_confidence_pages:
+            query = self._prepare_page_type_query(page_type, local)
+            ocr_callback = process_ocr_data if ocr else None
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # Only low-confidence pages are rendered and processed by the vision LLM
+                reader = PdfReader(file_path)
+                writer = PdfWriter()
+                for page_number in low_confidence_pages:
+                    writer.add_page(reader.pages[page_number - 1])
+
+                subset_file_path = os.path.join(temp_dir, "low_confidence_pages.pdf")
+                with open(subset_file_path, 'wb') as subset_file:
+                    writer.write(subset_file)
+
+                llm_output_list = self.execute_query(options, crop_size, False, ocr_callback, query, subset_file_path,
+                                                     debug_dir, debug, self.model_cache, local)[0]
+
+            for page_number, llm_output in zip(low_confidence_pages, llm_output_list):
+                try:
+                    llm_output = json.loads(llm_output) if isinstance(llm_output, str) else llm_output
+                except json.JSONDecodeError:
+                    llm_output = {
+                        "message": "Invalid JSON format in LLM output",
+                        "valid": "false"
+                    }
+                combined_output[page_number - 1] = add_page_number(llm_output, page_number)
+
+        if len(combined_output) == 1:
+            combined_output[0].pop("page", None)
+            return combined_output[0]
+
+        return combined_output
+
+
     def _process_query(self, query: str, instruction: bool, validation: bool, markdown: bool, page_type: List[str],
-                       hints_file_path: str, local: bool) -> Tuple[str, Optional[Dict], bool]:
+                       hints_file_path: str, local: bool) -> Tuple[str, Optional[QueryPlan], bool]:
         """
         Process and prepare the query based on the input parameters.
 
         Returns:
-            Tuple[str, Optional[Dict], bool]: (processed_query, query_schema, query_all_data)
+            Tuple[str, Optional[QueryPlan], bool]: (processed_query, query_plan, query_all_data)
         """
         query_all_data = query == "*"
 
@@ -156,11 +281,11 @@ class SparrowParsePipeline(Pipeline):
         elif markdown:
             return self._prepare_markdown_query(query, local), None, False
         else:
-            processed_query, schema = self._prepare_query(query, hints_file_path, local)
-            return processed_query, schema, False
+            processed_query, query_plan = self._prepare_query(query, hints_file_path, local)
+            return processed_query, query_plan, False
 
 
-    def _prepare_query(self, query: str, hints_file_path: str, local: bool) -> Tuple[str, Optional[Dict]]:
+    def _prepare_query(self, query: str, hints_file_path: str, local: bool) -> Tuple[str, QueryPlan]:
         """Prepare the query and schema, raising errors as necessary."""
         try:
             return self.invoke_pipeline_step(
@@ -221,23 +346,10 @@ class SparrowParsePipeline(Pipeline):
 
 
     def prepare_query_and_schema(self, query, hints_file_path):
-        is_query_valid = is_valid_json(query)
-        if not is_query_valid:
-            raise ValueError("Invalid query. Please provide a valid JSON query.")
+        # The prompt, parsed schema and validator are built once per query and hints content
+        query_plan = get_query_plan(query, hints_file_path)
 
-        # removed for better performance
-        # query_keys = get_json_keys_as_string(query)
-        query_schema = query
-        query = "retrieve data based on provided JSON schema"
-
-        # Read hints from JSON file if provided
-        hints_content = self.read_hints_from_json(hints_file_path)
-        hints_section = f"\n\nAdditional Hints:\n{hints_content}" if hints_content else ""
-
-        query = (query + ". return response in JSON format, by strictly following this JSON schema: " + query_schema +
-                 ". If a field is not visible or cannot be found in the document, return null. Do not guess, infer, or generate values for missing fields." + hints_section)
-
-        return query, query_schema
+        return query_plan.prompt, query_plan
 
 
     @staticmethod
@@ -251,14 +363,7 @@ class SparrowParsePipeline(Pipeline):
         Returns:
             Content of the JSON file as a string, or empty string if not a JSON file or file doesn't exist
         """
-        if hints_file_path and hints_file_path.endswith('.json'):
-            try:
-                with open(hints_file_path, 'r', encoding='utf-8') as f:
-                    content = json.load(f)
-                    return json.dumps(content, ensure_ascii=False)
-            except (FileNotFoundError, json.JSONDecodeError, IOError):
-                return ""
-        return ""
+        return load_hints(hints_file_path)
 
 
     @staticmethod
@@ -298,7 +403,7 @@ class SparrowParsePipeline(Pipeline):
                       debug_dir, debug, model_cache, local):
         """
         Executes the query using the specified inference backend.
-        For vLLM backend, calls inference directly. For other backends, uses subprocess execution.
+        For vLLM backend, calls inference directly. For other backends, uses a persistent inference worker process.
 
         Args:
             options (list): Inference backend options (e.g., ['huggingface', 'some_space']).
@@ -309,16 +414,19 @@ class SparrowParsePipeline(Pipeline):
             file_path (str): Path to the file for querying.
             debug_dir (str): Directory for debug output.
             debug (bool): Flag for enabling debug mode.
-            model_cache (dict): Cache for storing model instances.
+            model_cache (ModelCache): Cache for storing model instances.
             local (bool): Flag for local execution.
 
         Returns:
-            Tuple: (llm_output, num_pages, tables_only, validation_off, apply_annotation)
+            Tuple: (llm_output, num_pages, tables_only, validation_off, apply_annotation, page_routes)
         """
         # Validate and configure the inference backend
-        config, tables_only, validation_off, apply_annotation = self._configure_inference_backend(options)
+        config, tables_only, validation_off, apply_annotation, text_layer, table_structure = self._configure_inference_backend(options)
         if config is None:
-            return "Inference backend is not set up for this option", 1, tables_only, validation_off
+            return "Inference backend is not set up for this option", 1, tables_only, validation_off, apply_annotation, None
+
+        # Table detection model runtime for tables_only extraction, fp32 or int8 (CPU only)
+        table_detection_runtime = get_config().get_str('table_detection', 'runtime', 'fp32')
 
         # Prepare input data for inference
         input_data = [
@@ -330,7 +438,7 @@ class SparrowParsePipeline(Pipeline):
 
         # For vLLM backend, call directly without subprocess
         if config.get("method") == "vllm" or local:
-            llm_output, num_pages = subprocess_inference(
+            llm_output, num_pages, page_routes = subprocess_inference(
                 config,
                 input_data,
                 tables_only,
@@ -340,27 +448,32 @@ class SparrowParsePipeline(Pipeline):
                 ocr_callback,
                 debug_dir,
                 debug,
-                model_cache
+                model_cache,
+                text_layer,
+                table_structure,
+                table_detection_runtime
             )
         else:
-            # Offload inference to a subprocess for other backends
-            with concurrent.futures.ProcessPoolExecutor() as executor:
-                future = executor.submit(
-                    subprocess_inference,  # Call the top-level function
-                    config,
-                    input_data,
-                    tables_only,
-                    crop_size,
-                    query_all_data,
-                    apply_annotation,
-                    ocr_callback,
-                    debug_dir,
-                    debug,
-                    None  # No model cache for subprocess execution
-                )
-                llm_output, num_pages = future.result()
+            # Offload inference to a long-lived worker process pinned to this backend/model,
+            # the worker keeps its own model cache between requests
+            llm_output, num_pages, page_routes = get_inference_worker_pool().run(
+                model_cache_key(config),
+                subprocess_inference,  # Call the top-level function
+                config,
+                input_data,
+                tables_only,
+                crop_size,
+                query_all_data,
+                apply_annotation,
+                ocr_callback,
+                debug_dir,
+                debug,
+                text_layer=text_layer,
+                table_structure=table_structure,
+                table_detection_runtime=table_detection_runtime
+            )
 
-        return llm_output, num_pages, tables_only, validation_off, apply_annotation
+        return llm_output, num_pages, tables_only, validation_off, apply_annotation, page_routes
 
 
     @staticmethod
@@ -377,6 +490,8 @@ class SparrowParsePipeline(Pipeline):
                 - bool: True if "tables_only" is specified in the options, False otherwise.
                 - bool: True if "validation_off" is specified in the options, False otherwise.
                 - bool: True if "apply_annotation" is specified in the options, False otherwise.
+                - bool: True if "text_layer" is specified in the options, False otherwise.
+                - bool: True if "table_structure" is specified in the options, False otherwise.
         """
         if not options or len(options) < 2:
             raise ValueError("Invalid options provided for inference backend configuration.")
@@ -385,66 +500,62 @@ class SparrowParsePipeline(Pipeline):
         tables_only = "tables_only" in [opt.lower() for opt in options[2:]]
         validation_off = "validation_off" in [opt.lower() for opt in options[2:]]
         apply_annotation = "apply_annotation" in [opt.lower() for opt in options[2:]]
+        text_layer = "text_layer" in [opt.lower() for opt in options[2:]]
+        table_structure = "table_structure" in [opt.lower() for opt in options[2:]]
 
         if method == 'huggingface':
             return {
                 "method": method,
                 "hf_space": options[1],
                 "hf_token": os.getenv('HF_TOKEN')  # Ensure HF_TOKEN is set in the environment
-            }, tables_only, validation_off, apply_annotation
+            }, tables_only, validation_off, apply_annotation, text_layer, table_structure
         elif method == 'mlx':
             return {
                 "method": method,
                 "model_name": options[1]
-            }, tables_only, validation_off, apply_annotation
+            }, tables_only, validation_off, apply_annotation, text_layer, table_structure
         elif method == 'ollama':
             return {
                 "method": method,
                 "model_name": options[1]
-            }, tables_only, validation_off, apply_annotation
+            }, tables_only, validation_off, apply_annotation, text_layer, table_structure
         elif method == 'vllm':
             return {
                 "method": method,
                 "model_name": options[1]
-            }, tables_only, validation_off, apply_annotation
+            }, tables_only, validation_off, apply_annotation, text_layer, table_structure
         elif method == 'mistral':
             return {
                 "method": method,
                 "model_name": options[1]
-            }, tables_only, validation_off, apply_annotation
+            }, tables_only, validation_off, apply_annotation, text_layer, table_structure
         else:
             # Extendable for additional backends
             print(f"Unsupported inference method: {method}")
-            return None, tables_only, validation_off, apply_annotation
+            return None, tables_only, validation_off, apply_annotation, text_layer, table_structure
 
 
-    def process_single_page(self, llm_output_list, query_all_data, query_schema, tables_only, validation_off, debug, local):
+    def process_single_page(self, llm_output_list, query_all_data, query_plan, tables_only, validation_off, markdown,
+                            debug, local):
         """
-        Processes a single page of LLM output, including validation and formatting if needed.
+        Processes a single page of LLM output, including validation if needed.
+        JSON output is returned parsed, it is serialized once by the caller.
         """
         llm_output = llm_output_list[0]
 
         if not query_all_data and not tables_only and not validation_off:
-            validation_result = self.invoke_pipeline_step(
-                lambda: self.validate_result(llm_output, query_all_data, query_schema, debug),
-                "Validating result", local
-            )
+            return self.parse_and_validate(llm_output, query_plan, "Validating result", debug, local)
 
+        if not markdown and isinstance(llm_output, str):
             try:
-                llm_output = json.loads(llm_output) if isinstance(llm_output, str) else llm_output
-                llm_output = add_validation_message(llm_output,
-                                                    "true" if validation_result is None else validation_result)
+                llm_output = json.loads(llm_output)
             except json.JSONDecodeError:
-                llm_output = {
-                    "message": "Invalid JSON format in LLM output",
-                    "valid": validation_result
-                }
-            return json.dumps(llm_output, indent=4, ensure_ascii=False)
+                pass  # Keep plain text output as is
 
         return llm_output
 
 
-    def process_multiple_pages(self, llm_output_list, query_all_data, query_schema, tables_only, validation_off, markdown, debug, local):
+    def process_multiple_pages(self, llm_output_list, query_all_data, query_plan, tables_only, validation_off, markdown, debug, local):
         """
         Processes multiple pages of LLM output, including validation (if needed), formatting, and pagination.
         """
@@ -452,20 +563,8 @@ class SparrowParsePipeline(Pipeline):
 
         for i, llm_output in enumerate(llm_output_list):
             if not query_all_data and not tables_only and not validation_off:
-                validation_result = self.invoke_pipeline_step(
-                    lambda: self.validate_result(llm_output, query_all_data, query_schema, debug),
-                    f"Validating result for page {i + 1}...", local
-                )
-
-                try:
-                    llm_output = json.loads(llm_output) if isinstance(llm_output, str) else llm_output
-                    llm_output = add_validation_message(llm_output,
-                                                        "true" if validation_result is None else validation_result)
-                except json.JSONDecodeError:
-                    llm_output = {
-                        "message": "Invalid JSON format in LLM output",
-                        "valid": validation_result
-                    }
+                llm_output = self.parse_and_validate(llm_output, query_plan, f"Validating result for page {i + 1}...",
+                                                     debug, local)
             else:
                 if not markdown:
                     try:
@@ -481,39 +580,61 @@ class SparrowParsePipeline(Pipeline):
 
             combined_output.append(llm_output)
 
-        return json.dumps(combined_output, indent=4, ensure_ascii=False)
+        return combined_output
 
 
-    def process_llm_output(self, llm_output_list, num_pages, query_all_data, query_schema, tables_only, validation_off,
+    def process_llm_output(self, llm_output_list, num_pages, query_all_data, query_plan, tables_only, validation_off,
                            markdown, debug, local):
         """
         Processes the LLM output based on the number of pages.
+        Returns parsed JSON data (dict or list), or text for markdown and non-JSON output.
         """
         if num_pages == 1:
-            return self.process_single_page(llm_output_list, query_all_data, query_schema, tables_only, validation_off,
-                                            debug, local)
+            return self.process_single_page(llm_output_list, query_all_data, query_plan, tables_only, validation_off,
+                                            markdown, debug, local)
         if num_pages > 1:
-            return self.process_multiple_pages(llm_output_list, query_all_data, query_schema, tables_only,
+            return self.process_multiple_pages(llm_output_list, query_all_data, query_plan, tables_only,
                                                validation_off, markdown, debug, local)
         return None
 
 
+    def parse_and_validate(self, llm_output, query_plan, task_description, debug, local):
+        """
+        Parses one page of LLM output once and adds the schema validation message to it.
+        """
+        try:
+            llm_output = json.loads(llm_output) if isinstance(llm_output, str) else llm_output
+        except json.JSONDecodeError:
+            VALIDATION_FAILURES.inc("invalid_json")
+            return {
+                "message": "Invalid JSON format in LLM output",
+                "valid": "Invalid JSON format. Could not parse the input JSON."
+            }
+
+        validation_result = self.invoke_pipeline_step(
+            lambda: self.validate_result(llm_output, query_plan, debug),
+            task_description, local
+        )
+        if validation_result is not None:
+            VALIDATION_FAILURES.inc("schema")
+
+        return add_validation_message(llm_output, "true" if validation_result is None else validation_result)
+
+
     @staticmethod
-    def validate_result(llm_output, query_all_data, query_schema, debug):
+    def validate_result(llm_output, query_plan, debug):
         """
         Validates the LLM output against the provided schema.
 
         Args:
-            llm_output (dict or str): The output to validate.
-            query_all_data (bool): Whether to bypass validation.
-            query_schema (dict): The schema to validate against.
+            llm_output (dict or list): The parsed output to validate.
+            query_plan (QueryPlan): Plan of the schema query, its validator is compiled once and shared.
             debug (bool): Whether to print debug information.
 
         Returns:
             str or None: Validation result if invalid; otherwise, None.
         """
-        validator = JSONValidator(query_schema)
-        validation_result = validator.validate_json_against_schema(llm_output, validator.generated_schema)
+        validation_result = query_plan.validator.validate(llm_output)
 
         if debug:
             if validation_result is not None:
@@ -1,8 +1,8 @@
 import json
 from rich import print
+from pipelines.sparrow_parse.document_context import DocumentContext
+from pipelines.sparrow_parse.query_plan import get_query_plan, split_schema
 from pipelines.sparrow_parse.table_templates.table_template_factory import TableTemplateFactory
-import os
-from pypdf import PdfReader, PdfWriter
 import time
 import re
 
@@ -10,6 +10,8 @@ def process_table_extraction(rag, user_selected_pipeline, query, file_path, hint
                             instruction, validation, ocr, markdown, table_template, page_type, debug_dir, debug, local):
     """
     Process document with table extraction.
+    The layout OCR pass runs once, its output and page images are kept in a DocumentContext
+    that per-page form extraction reuses.
 
     Args:
         rag: Pipeline instance
@@ -60,19 +62,38 @@ def process_table_extraction(rag, user_selected_pipeline, query, file_path, hint
         print(f"Form query: {form_query}")
         print(f"Table queries: {table_queries}")
 
-    all_pages_data = []
+    with DocumentContext(file_path, ocr_output, tables_by_page, non_tables_by_page, debug_dir) as document_context:
+        all_pages_data = process_pages(document_context, rag, user_selected_pipeline, form_query, table_queries,
+                                       hints_file_path, options, crop_size, instruction, validation, ocr, markdown,
+                                       table_template, page_type, debug_dir, debug, local)
+
+    # Simplify structure for single page - return just the data without page wrapper
+    if len(all_pages_data) == 1:
+        answer = all_pages_data[0]['data']
+    else:
+        answer = all_pages_data
+
+    end_time = time.time()
+    print(f"\nTotal time with table processing: {end_time - start_time:.2f} seconds")
+
+    return answer
 
-    # Check if we need to split PDF for multi-page processing with forms
-    split_files = []
-    is_multipage = len(tables_by_page) > 1
 
-    if is_multipage and file_path.lower().endswith('.pdf'):
-        # Split PDF into separate pages
-        split_files = split_pdf_by_pages(file_path, tables_by_page)
+def process_pages(document_context, rag, user_selected_pipeline, form_query, table_queries, hints_file_path,
+                  options, crop_size, instruction, validation, ocr, markdown, table_template, page_type,
+                  debug_dir, debug, local):
+    """
+    Extracts form and table data page by page from the first-pass layout in the document context.
+
+    Returns:
+        List of dicts with 'data' and 'page' keys, one per extracted table
+    """
+    all_pages_data = []
+    tables_by_page = document_context.tables_by_page
 
     # Process tables from each page using the specified template
     if table_template and tables_by_page:
-        for idx, page_info in enumerate(tables_by_page):
+        for page_info in tables_by_page:
             page_number = page_info['page']
             tables = page_info['tables']
             has_other_entries = page_info['has_other_entries']
@@ -82,18 +103,19 @@ def process_table_extraction(rag, user_selected_pipeline, query, file_path, hint
             if form_query and has_other_entries:
                 options_form = options[:2]
                 form_query_str = json.dumps(form_query, ensure_ascii=False)
-                # Use split file for multipage, original file for single page
-                page_file_path = split_files[idx] if is_multipage and split_files else file_path
 
                 if debug:
                     print(f"Processing page {page_number}: form data query")
 
+                # Templates get a single-page file, running the pipeline on it processes only this page
                 form_answer = TableTemplateFactory.fetch_form_data(
-                    table_template, rag, user_selected_pipeline, form_query_str, page_file_path,
+                    table_template, rag, user_selected_pipeline, form_query_str,
+                    document_context.page_file_path(page_number),
                     hints_file_path, options_form, crop_size,
                     instruction, validation, ocr, markdown,
                     table_template, page_type, debug_dir, debug,
-                    non_tables_by_page, local
+                    document_context.non_tables_by_page, local,
+                    document_context=document_context, page_number=page_number
                 )
 
             if debug:
@@ -130,20 +152,7 @@ def process_table_extraction(rag, user_selected_pipeline, query, file_path, hint
                 except (ImportError, AttributeError) as e:
                     print(f"Error loading table template for page {page_number}: {e}")
 
-    # Simplify structure for single page - return just the data without page wrapper
-    if len(all_pages_data) == 1:
-        answer = all_pages_data[0]['data']
-    else:
-        answer = all_pages_data
-
-    # Cleanup split PDF files
-    if split_files:
-        cleanup_split_files(split_files)
-
-    end_time = time.time()
-    print(f"\nTotal time with table processing: {end_time - start_time:.2f} seconds")
-
-    return json.dumps(answer, indent=4, ensure_ascii=False)
+    return all_pages_data
 
 
 def extract_tables_from_ocr(ocr_output):
@@ -254,87 +263,12 @@ def split_query(query):
         - form_query: Dictionary with form elements or None
         - table_queries: List of table query dictionaries
     """
-    # Parse query if it's a string
+    # String queries use the cached query plan, which splits the schema once per query
     if isinstance(query, str):
-        query_dict = json.loads(query)
-    else:
-        query_dict = query
+        query_plan = get_query_plan(query)
+        return query_plan.form_query, query_plan.table_queries
 
-    # Dictionary for form elements (non-array or arrays without "items" keyword)
-    form_query = {}
-
-    # Lists to store arrays with "items" in their name
-    table_queries = []
-
-    # Iterate through the query dictionary
-    for key, value in query_dict.items():
-        # Check if the value is a list/array and key contains "items"
-        if isinstance(value, list) and "items" in key.lower():
-            # Store array with "items" separately
-            table_queries.append({key: value})
-        else:
-            # Add to form query (includes non-arrays and arrays without "items")
-            form_query[key] = value
-
-    # Return form_query as None if empty
-    return (form_query if form_query else None, table_queries)
-
-
-def split_pdf_by_pages(pdf_path, tables_by_page):
-    """
-    Split a multi-page PDF into separate single-page PDF files.
-
-    Args:
-        pdf_path: Path to the source PDF file
-        tables_by_page: List of page info dicts with 'page' keys
-
-    Returns:
-        List of paths to the split PDF files
-    """
-    split_files = []
-
-    try:
-        reader = PdfReader(pdf_path)
-        base_name = os.path.splitext(pdf_path)[0]
-
-        for page_info in tables_by_page:
-            page_number = page_info['page']
-            # Page numbers are 1-based, but PyPDF2 uses 0-based indexing
-            page_index = page_number - 1
-
-            if page_index < len(reader.pages):
-                writer = PdfWriter()
-                writer.add_page(reader.pages[page_index])
-
-                split_file_path = f"{base_name}_page_{page_number}.pdf"
-                with open(split_file_path, 'wb') as output_file:
-                    writer.write(output_file)
-
-                split_files.append(split_file_path)
-    except Exception as e:
-        print(f"Error splitting PDF: {e}")
-        # Clean up any files that were created before the error
-        cleanup_split_files(split_files)
-        return []
-
-    return split_files
-
-
-def cleanup_split_files(split_files):
-    """
-    Remove temporary split PDF files.
-
-    Args:
-        split_files: List of file paths to remove
-    """
-    import os
-
-    for file_path in split_files:
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            print(f"Error removing temporary file {file_path}: {e}")
+    return split_schema(query)
 
 
 def normalize_ocr_response(ocr_output, debug):
@@ -349,8 +283,8 @@ def normalize_ocr_response(ocr_output, debug):
         Parsed list in structured format compatible with extract_tables_from_ocr
         and extract_all_from_ocr functions
     """
-    # Already a list - no normalization needed
-    if isinstance(ocr_output, list):
+    # Already parsed - no normalization needed
+    if isinstance(ocr_output, (list, dict)):
         return ocr_output
 
     if isinstance(ocr_output, str):
@@ -1,5 +1,8 @@
 import json
-from jsonschema import validate, ValidationError
+import re
+from functools import lru_cache
+from jsonschema import validate, validators, ValidationError
+from jsonschema.exceptions import best_match
 
 
 class JSONValidator:
@@ -35,9 +38,103 @@ class JSONValidator:
     def __init__(self, example_json: str):
         """
         Initializes the validator by generating a schema from the provided example JSON.
+        The schema is checked against its metaschema once and compiled into a reusable validator.
         """
         self.generated_schema = self._generate_schema_from_example(example_json)
 
+        validator_class = validators.validator_for(self.generated_schema)
+        validator_class.check_schema(self.generated_schema)
+        self.validator = validator_class(self.generated_schema)
+        self.schema_expects_array = self.generated_schema.get("type") == "array"
+
+        # Generated checker for the common case of valid data, errors are reported by the jsonschema validator
+        self.fast_check = self._compile_check(self.generated_schema)
+
+    def validate(self, json_data) -> str:
+        """
+        Validates already parsed JSON data against the compiled schema.
+
+        Args:
+            json_data: Parsed JSON object or array
+
+        Returns:
+            str: Validation error message, None if validation succeeded
+        """
+        # Handle the case where schema expects array but input is object or vice versa
+        data_is_array = isinstance(json_data, list)
+
+        if self.schema_expects_array and not data_is_array:
+            json_data = [json_data]  # Wrap object in array
+        elif not self.schema_expects_array and data_is_array:
+            json_data = json_data[0] if len(json_data) > 0 else {}  # Unwrap array to get first object
+
+        if self.fast_check is not None and self.fast_check(json_data):
+            return None
+
+        # Same error selection as jsonschema.validate
+        error = best_match(self.validator.iter_errors(json_data))
+        if error is not None:
+            return f"Schema validation error: {error.message}"
+        return None
+
+    TYPE_CHECKS = {
+        'integer': lambda value: (isinstance(value, int) and not isinstance(value, bool)) or
+                                 (isinstance(value, float) and value.is_integer()),
+        'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+        'string': lambda value: isinstance(value, str),
+        'null': lambda value: value is None,
+        'object': lambda value: isinstance(value, dict),
+        'array': lambda value: isinstance(value, list)
+    }
+
+    @staticmethod
+    def _compile_check(schema: dict):
+        """
+        Compiles a generated schema into a function returning True when data is valid.
+        Covers the keywords produced by schema generation, returns None for anything else.
+        """
+        supported_keywords = {'$schema', 'type', 'properties', 'required', 'items', 'anyOf', 'pattern'}
+        if not isinstance(schema, dict) or not set(schema) <= supported_keywords:
+            return None
+
+        checks = []
+
+        if 'type' in schema:
+            type_names = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+            if not all(type_name in JSONValidator.TYPE_CHECKS for type_name in type_names):
+                return None
+            type_checks = [JSONValidator.TYPE_CHECKS[type_name] for type_name in type_names]
+            checks.append(lambda value: any(type_check(value) for type_check in type_checks))
+
+        if 'pattern' in schema:
+            pattern = re.compile(schema['pattern'])
+            checks.append(lambda value: not isinstance(value, str) or pattern.search(value) is not None)
+
+        if 'anyOf' in schema:
+            options = [JSONValidator._compile_check(option) for option in schema['anyOf']]
+            if any(option is None for option in options):
+                return None
+            checks.append(lambda value: any(option(value) for option in options))
+
+        if 'required' in schema:
+            required = schema['required']
+            checks.append(lambda value: not isinstance(value, dict) or all(key in value for key in required))
+
+        if 'properties' in schema:
+            properties = {key: JSONValidator._compile_check(value) for key, value in schema['properties'].items()}
+            if any(check is None for check in properties.values()):
+                return None
+            checks.append(lambda value: not isinstance(value, dict) or
+                          all(check(value[key]) for key, check in properties.items() if key in value))
+
+        if 'items' in schema:
+            items_check = JSONValidator._compile_check(schema['items'])
+            if items_check is None:
+                return None
+            checks.append(lambda value: not isinstance(value, list) or all(items_check(item) for item in value))
+
+        return lambda value: all(check(value) for check in checks)
+
     @staticmethod
     def _get_type_definition(field_value: str | int | float) -> dict:
         """
@@ -232,4 +329,52 @@ class JSONValidator:
         except json.JSONDecodeError:
             return "Invalid JSON format. Could not parse the input JSON."
         except ValidationError as e:
-            return f"Schema validation error: {e.message}"
\ No newline at end of file
+            return f"Schema validation error: {e.message}"
+
+
+@lru_cache(maxsize=64)
+def get_json_validator(example_json: str) -> JSONValidator:
+    """
+    Returns a compiled validator for the query schema example, cached by the example string.
+    All pages of a document, and repeated queries, share the same validator.
+    """
+    return JSONValidator(example_json)
+
+
+def benchmark_validation(pages: int = 100, rows: int = 50, runs: int = 3):
+    """
+    Compares per-page validation of a multi-page result: a new validator built per page validating
+    JSON strings, against the cached compiled validator validating parsed objects.
+    """
+    import timeit
+
+    example_json = json.dumps({"bank": "str", "account": "str or null",
+                               "transactions": [{"date": "str", "description": "str", "amount": "0.0 or null",
+                                                 "balance": "float or null", "reference": "int or null"}]})
+    page = {"bank": "Sparrow Bank", "account": "CH93 0076 2011 6238 5295 7",
+            "transactions": [{"date": "2024-01-15", "description": f"Payment {row}", "amount": "120.50",
+                              "balance": 1000.0 + row, "reference": row} for row in range(rows)]}
+    page_strings = [json.dumps(page) for _ in range(pages)]
+
+    def validate_per_page():
+        for page_string in page_strings:
+            validator = JSONValidator(example_json)
+            validator.validate_json_against_schema(page_string, validator.generated_schema)
+
+    def validate_compiled():
+        get_json_validator.cache_clear()
+        for page_string in page_strings:
+            # Pages are parsed once by the pipeline, the parse is part of both timings
+            get_json_validator(example_json).validate(json.loads(page_string))
+
+    per_page_time = min(timeit.repeat(validate_per_page, number=1, repeat=runs))
+    compiled_time = min(timeit.repeat(validate_compiled, number=1, repeat=runs))
+
+    print(f"{pages} pages x {rows} rows")
+    print(f"Validator per page: {per_page_time:.3f} s")
+    print(f"Cached compiled validator: {compiled_time:.3f} s")
+    print(f"Speedup: {per_page_time / compiled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark_validation()
@@ -1,15 +1,26 @@
 
 import json
 import re
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable
+from pipelines.sparrow_parse.html_table_parser import HtmlTable, TableCell, parse_html_table
+
+
+_special_chars_pattern = re.compile(r'[^\w\s]')
+_whitespace_pattern = re.compile(r'\s+')
+_apostrophe_pattern = re.compile(r"['']")
+_non_numeric_pattern = re.compile(r'[^\d.-]')
+
+# Cells of a column are cleaned in one regex call, joined with a separator the cleaning pattern keeps
+_COLUMN_SEPARATOR = '\x1f'
+_non_numeric_column_pattern = re.compile(r'[^\d.\-\x1f]')
 
 
 def normalize_text(text: str) -> str:
     """Normalize text for comparison: lowercase, remove special chars, collapse whitespace."""
     text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\s+', ' ', text)
+    text = _special_chars_pattern.sub('', text)
+    text = _whitespace_pattern.sub(' ', text)
     return text.strip()
 
 
@@ -26,15 +37,26 @@ def find_best_column_match(query_field: str, table_headers: List[str]) -> Option
     Returns:
         Index of the best matching column, or None if no match found
     """
+    return _best_column_match(query_field, _normalize_headers(table_headers))
+
+
+def _normalize_headers(table_headers: List[str]) -> List[tuple]:
+    """Normalized text and word set of every header, computed once per table."""
+    normalized_headers = []
+    for header in table_headers:
+        normalized_header = normalize_text(header)
+        normalized_headers.append((normalized_header, set(normalized_header.split())))
+    return normalized_headers
+
+
+def _best_column_match(query_field: str, normalized_headers: List[tuple]) -> Optional[int]:
     normalized_query = normalize_text(query_field)
     query_words = set(normalized_query.split())
 
     best_score = 0
     best_index = None
 
-    for idx, header in enumerate(table_headers):
-        normalized_header = normalize_text(header)
-        header_words = set(normalized_header.split())
+    for idx, (normalized_header, header_words) in enumerate(normalized_headers):
 
         # Check for exact match
         if normalized_query == normalized_header:
@@ -124,8 +146,8 @@ def convert_value(value: str, target_type: str) -> Any:
     base_type = target_type.split()[0] if is_nullable else target_type
 
     # Remove common formatting characters
-    cleaned_value = re.sub(r"['']", '', value)  # Remove apostrophes used as thousand separators
-    cleaned_value = re.sub(r'[^\d.-]', '', cleaned_value)  # Keep only digits, dots, and minus
+    cleaned_value = _apostrophe_pattern.sub('', value)  # Remove apostrophes used as thousand separators
+    cleaned_value = _non_numeric_pattern.sub('', cleaned_value)  # Keep only digits, dots, and minus
 
     # If value is empty and type is nullable, return None
     if not cleaned_value and is_nullable:
@@ -145,6 +167,68 @@ def convert_value(value: str, target_type: str) -> Any:
         return value if value else (None if is_nullable else value)
 
 
+def _clean_numeric_column(values: List[str]) -> List[str]:
+    """Applies the convert_value cleaning to a whole column, in a single regex call where possible."""
+    if not values:
+        # Joining no values would give one empty string
+        return []
+    if any(_COLUMN_SEPARATOR in value for value in values):
+        return [_non_numeric_pattern.sub('', value) for value in values]
+    return _non_numeric_column_pattern.sub('', _COLUMN_SEPARATOR.join(values)).split(_COLUMN_SEPARATOR)
+
+
+def _to_int(cleaned_value: str, default):
+    try:
+        return int(float(cleaned_value)) if cleaned_value else default
+    except ValueError:
+        return default
+
+
+def _to_float(cleaned_value: str, default):
+    try:
+        return float(cleaned_value) if cleaned_value else default
+    except ValueError:
+        return default
+
+
+@lru_cache(maxsize=64)
+def compile_column_converter(target_type: str) -> Callable[[List[str]], List[Any]]:
+    """
+    Compiles a converter turning a column of cell strings into values of the target type.
+    Produces the same values as calling convert_value on every cell.
+
+    Args:
+        target_type: Target type ('str', 'int', 'float', 'int or null', 'float or null', etc.)
+
+    Returns:
+        Function converting a list of cell strings to a list of converted values
+    """
+    is_nullable = 'or null' in target_type.lower()
+    base_type = target_type.split()[0] if is_nullable else target_type
+
+    if base_type == 'int':
+        default = None if is_nullable else 0
+
+        def convert_column(values):
+            return [_to_int(cleaned_value, default) for cleaned_value in _clean_numeric_column(values)]
+    elif base_type == 'float':
+        default = None if is_nullable else 0.0
+
+        def convert_column(values):
+            return [_to_float(cleaned_value, default) for cleaned_value in _clean_numeric_column(values)]
+    elif is_nullable:
+        # Nullable strings without any digits are null, as in convert_value
+        def convert_column(values):
+            stripped_values = [value.strip() for value in values]
+            return [value if cleaned_value and value else None
+                    for value, cleaned_value in zip(stripped_values, _clean_numeric_column(stripped_values))]
+    else:
+        def convert_column(values):
+            return [value.strip() for value in values]
+
+    return convert_column
+
+
 def parse_form_query(form_query_str: str) -> Dict[str, str]:
     """
     Parse the form query structure to extract field names and types.
@@ -268,9 +352,9 @@ def fetch_form_data(rag, user_selected_pipeline: str, form_query_str: str, page_
     return result
 
 
-def _flatten_thead_headers(thead) -> List[str]:
+def _flatten_thead_headers(rows: List[List[TableCell]]) -> List[str]:
     """
-    Flatten a multi-level <thead> into a single list of column header strings.
+    Flatten the rows of a multi-level <thead> into a single list of column header strings.
 
     Handles rowspan and colspan generically by building a virtual column grid.
     Parent colspan text is prepended to child cell text with a space separator.
@@ -282,13 +366,11 @@ def _flatten_thead_headers(thead) -> List[str]:
             ['Coverage', 'Face Amount', 'Premiums Annually',
              'Premiums Semi-Annually', 'Premiums Quarterly', 'Monthly']
     """
-    rows = thead.find_all('tr')
     if not rows:
         return []
 
     if len(rows) == 1:
-        cells = rows[0].find_all(['th', 'td'])
-        return [c.get_text(strip=True) for c in cells]
+        return [cell.text for cell in rows[0]]
 
     # occupied: (row_idx, col) positions claimed by a rowspan from an earlier row
     occupied: set = set()
@@ -297,17 +379,16 @@ def _flatten_thead_headers(thead) -> List[str]:
     # col_texts[col] = final flattened header for that column (set when a leaf cell is seen)
     col_texts: Dict[int, str] = {}
 
-    for row_idx, row in enumerate(rows):
-        cells = row.find_all(['th', 'td'])
+    for row_idx, cells in enumerate(rows):
         col = 0
         for cell in cells:
             # Advance past positions occupied by rowspan cells from earlier rows
             while (row_idx, col) in occupied:
                 col += 1
 
-            text = cell.get_text(strip=True)
-            rowspan = int(cell.get('rowspan', 1))
-            colspan = int(cell.get('colspan', 1))
+            text = cell.text
+            rowspan = cell.rowspan
+            colspan = cell.colspan
 
             if colspan > 1:
                 # Group/parent header: accumulate its text into each spanned column's prefix
@@ -352,29 +433,27 @@ def _parse_html_table(table_markdown: str):
         table_markdown: HTML string containing the table
 
     Returns:
-        Tuple of (table_element, headers) where table_element is a BeautifulSoup
-        Tag or None, and headers is a list of header strings
+        Tuple of (table, headers) where table is a parsed HtmlTable or None,
+        and headers is a list of header strings
     """
-    soup = BeautifulSoup(table_markdown, 'html.parser')
-    table = soup.find('table')
+    table = parse_html_table(table_markdown)
     if not table:
         return None, []
 
     headers = []
-    thead = table.find('thead')
-    if thead:
-        headers = _flatten_thead_headers(thead)
+    if table.thead_rows is not None:
+        headers = _flatten_thead_headers(table.thead_rows)
 
     if not headers:
         # Check for <th> elements in the first row
-        first_row = table.find('tr')
+        first_row = table.first_row
         if first_row:
-            th_cells = first_row.find_all('th')
+            th_cells = [cell for cell in first_row if cell.tag == 'th']
             if th_cells:
-                headers = [th.get_text(separator=' ', strip=True) for th in th_cells]
+                headers = [th.spaced_text for th in th_cells]
             else:
                 # No header row at all — generate col1, col2, ... from column count
-                td_cells = first_row.find_all('td')
+                td_cells = [cell for cell in first_row if cell.tag == 'td']
                 headers = [f'col{i + 1}' for i in range(len(td_cells))]
 
     # Replace any empty header names with generated names (col1, col2, ...)
@@ -383,48 +462,44 @@ def _parse_html_table(table_markdown: str):
     return table, headers
 
 
-def _extract_rows(table, headers: List[str], fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _extract_rows(table: HtmlTable, headers: List[str], fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Extract data rows from a parsed table for the given field definitions.
 
     Args:
-        table: BeautifulSoup table element
+        table: Parsed HTML table
         headers: List of table header strings
         fields: List of field dicts with 'name' and 'type' keys
 
     Returns:
         List of row dicts with field names as keys and converted values
     """
-    # Map field names to column indices
-    field_to_column = {}
-    for field in fields:
-        column_idx = find_best_column_match(field['name'], headers)
-        if column_idx is not None:
-            field_to_column[field['name']] = {'index': column_idx, 'type': field['type']}
-
-    items = []
-    tbody = table.find('tbody')
-    row_source = tbody if tbody else table
-    for row in row_source.find_all('tr'):
-        cells = row.find_all('td')
-        if not cells:
-            continue
+    rows = table.data_rows
+    if not rows:
+        return []
+    normalized_headers = _normalize_headers(headers)
 
-        item = {}
-        for field in fields:
-            if field['name'] in field_to_column:
-                column_info = field_to_column[field['name']]
-                col_idx = column_info['index']
-                if col_idx < len(cells):
-                    item[field['name']] = convert_value(cells[col_idx].get_text(strip=True), column_info['type'])
-                else:
-                    item[field['name']] = None
+    # Convert column by column, rows too short for a column get None
+    field_names = []
+    columns = []
+    for field in fields:
+        column_idx = _best_column_match(field['name'], normalized_headers)
+        if column_idx is None:
+            column = [None] * len(rows)
+        else:
+            present_rows = [i for i, cells in enumerate(rows) if column_idx < len(cells)]
+            converted = compile_column_converter(field['type'])([rows[i][column_idx] for i in present_rows])
+            if len(present_rows) == len(rows):
+                column = converted
             else:
-                item[field['name']] = None
+                column = [None] * len(rows)
+                for i, value in zip(present_rows, converted):
+                    column[i] = value
 
-        items.append(item)
+        field_names.append(field['name'])
+        columns.append(column)
 
-    return items
+    return [dict(zip(field_names, row_values)) for row_values in zip(*columns)] if columns else [{} for _ in rows]
 
 
 def _deduplicate_headers(headers: List[str]) -> List[str]:
@@ -1,4 +1,5 @@
 import importlib
+import inspect
 
 
 class TableTemplateFactory:
@@ -54,7 +55,7 @@ class TableTemplateFactory:
                        page_file_path: str, hints_file_path: str, options_form: list, crop_size: int,
                        instruction: bool, validation: bool, ocr: bool, markdown: bool,
                        table_template: str, page_type: str, debug_dir: str, debug: bool,
-                       non_tables_by_page: list, local: bool):
+                       non_tables_by_page: list, local: bool, document_context=None, page_number: int = None):
         """
         Load a table template module and call its fetch_form_data method.
 
@@ -63,7 +64,7 @@ class TableTemplateFactory:
             rag: Pipeline instance
             user_selected_pipeline: Name of the pipeline to use
             form_query_str: JSON string with form query structure
-            page_file_path: Path to the document file
+            page_file_path: Path to the page, a single-page PDF for multi-page PDFs, the document file otherwise
             hints_file_path: Path to JSON file containing query hints
             options_form: Pipeline options for form extraction
             crop_size: Crop size for extraction
@@ -77,6 +78,9 @@ class TableTemplateFactory:
             debug: Enable debug mode
             non_tables_by_page: List of non-table entries by page
             local: Enable local mode for debugging
+            document_context: DocumentContext with the first-pass layout output and page images,
+                              passed only to templates with a document_context parameter
+            page_number: Page being processed, passed only to templates with a page_number parameter
 
         Returns:
             Form data as dict or string
@@ -90,8 +94,23 @@ class TableTemplateFactory:
         if not hasattr(module, 'fetch_form_data'):
             raise AttributeError(f"Module '{template_name}' does not have a 'fetch_form_data' method")
 
+        # Templates opt in to the document context by declaring document_context/page_number parameters
+        context_args = TableTemplateFactory._accepted_kwargs(module.fetch_form_data, {
+            "document_context": document_context,
+            "page_number": page_number
+        })
+
         return module.fetch_form_data(rag, user_selected_pipeline, form_query_str, page_file_path,
                                      hints_file_path, options_form, crop_size,
                                      instruction, validation, ocr, markdown,
                                      table_template, page_type, debug_dir, debug,
-                                     non_tables_by_page, local)
+                                     non_tables_by_page, local, **context_args)
+
+    @staticmethod
+    def _accepted_kwargs(func, kwargs: dict) -> dict:
+        """Keyword arguments from kwargs that func accepts by name or through **kwargs."""
+        parameters = inspect.signature(func).parameters
+        if any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters.values()):
+            return kwargs
+        return {name: value for name, value in kwargs.items()
+                if name in parameters and parameters[name].kind != inspect.Parameter.POSITIONAL_ONLY}
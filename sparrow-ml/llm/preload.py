@@ -0,0 +1,82 @@
+import time
+from rich import print
+from config_utils import get_config
+from pipelines.interface import get_pipeline
+from pipeline_executors import run_in_pipeline_executor
+
+
+class ReadinessState:
+    """Startup model preload progress, the API is ready once every configured model was warmed up."""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at = time.time()
+        self.ready_at = None
+        self.models = []
+
+    def to_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "ready_at": self.ready_at,
+            "models": self.models
+        }
+
+
+readiness = ReadinessState()
+
+
+def get_preload_entries() -> list:
+    """
+    Backend/model pairs to preload from the [preload] config section. Keys are pipeline names,
+    values are semicolon separated option lists in the same format as the API options field.
+
+    Returns:
+        list: (pipeline name, options list) tuples
+    """
+    config = get_config()
+    entries = []
+
+    for pipeline_name in ("sparrow-parse", "sparrow-instructor"):
+        value = config.get_str('preload', pipeline_name, "")
+        for options in value.split(';'):
+            options_arr = [param.strip() for param in options.split(',') if param.strip()]
+            if options_arr:
+                entries.append((pipeline_name, options_arr))
+
+    return entries
+
+
+def warm_up_model(pipeline_name, options_arr, model_cache):
+    """Loads the model for a pipeline and runs a tiny warm-up inference. Blocking."""
+    rag = get_pipeline(pipeline_name, model_cache)
+    rag.warm_up(options_arr)
+
+
+async def preload_models(model_cache):
+    """
+    Preloads and warms up configured models one by one, updating the readiness state.
+    Failed models are reported, they are loaded on first request as before.
+    """
+    entries = get_preload_entries()
+    readiness.models = [{"pipeline": pipeline_name, "options": ",".join(options_arr), "status": "pending"}
+                        for pipeline_name, options_arr in entries]
+
+    for model_status, (pipeline_name, options_arr) in zip(readiness.models, entries):
+        model_status["status"] = "loading"
+        print(f"Preloading {pipeline_name} model: {model_status['options']}")
+
+        start_time = time.time()
+        try:
+            await run_in_pipeline_executor(pipeline_name, warm_up_model, pipeline_name, options_arr, model_cache)
+            model_status["status"] = "ready"
+        except Exception as e:
+            print(f"Model preload failed for {model_status['options']}: {str(e)}")
+            model_status["status"] = "failed"
+            model_status["error"] = str(e)
+
+        model_status["duration"] = round(time.time() - start_time, 3)
+
+    readiness.ready = True
+    readiness.ready_at = time.time()
+    print("Model preload completed, API is ready")
@@ -0,0 +1,76 @@
+-- Sparrow key quota, used by protected access when use_database is true
+--
+-- Keys live in SPARROW_KEYS. A key is valid when it exists and is enabled, and each call counts one use
+-- against usage_limit (NULL for no limit). validate_and_increment_key applies these rules one call at a time.
+-- The API validates keys against calls leased in blocks (see key_lease.py): lease_key_quota applies the same
+-- rules to a block of calls in one transaction, release_key_quota gives unused calls back.
+-- The caller commits, as with validate_and_increment_key.
+
+
+CREATE TABLE sparrow_keys (
+    sparrow_key     VARCHAR2(100) NOT NULL,
+    enabled         NUMBER(1) DEFAULT 1 NOT NULL,
+    usage_count     NUMBER DEFAULT 0 NOT NULL,
+    usage_limit     NUMBER,
+    last_used_date  DATE,
+    CONSTRAINT sparrow_keys_pk PRIMARY KEY (sparrow_key)
+);
+
+
+-- Leases up to p_requested calls of a key and gives back p_returned unused calls of its previous lease.
+-- The key row is locked while the lease is taken, so leases from several API workers never exceed the
+-- usage limit, fewer calls are granted near the limit.
+-- Returns the number of calls granted, 0 if the key doesn't exist, is disabled or reached its limit.
+CREATE OR REPLACE FUNCTION lease_key_quota(
+    p_key       IN VARCHAR2,
+    p_requested IN NUMBER,
+    p_returned  IN NUMBER DEFAULT 0
+) RETURN NUMBER
+IS
+    v_enabled     sparrow_keys.enabled%TYPE;
+    v_usage_count sparrow_keys.usage_count%TYPE;
+    v_usage_limit sparrow_keys.usage_limit%TYPE;
+    v_granted     NUMBER := 0;
+BEGIN
+    SELECT enabled, usage_count, usage_limit
+    INTO v_enabled, v_usage_count, v_usage_limit
+    FROM sparrow_keys
+    WHERE sparrow_key = p_key
+    FOR UPDATE;
+
+    -- Unused calls are given back even when the key was disabled since the last lease
+    v_usage_count := GREATEST(NVL(v_usage_count, 0) - NVL(p_returned, 0), 0);
+
+    IF v_enabled = 1 AND p_requested > 0 THEN
+        IF v_usage_limit IS NULL THEN
+            v_granted := p_requested;
+        ELSE
+            v_granted := GREATEST(LEAST(p_requested, v_usage_limit - v_usage_count), 0);
+        END IF;
+    END IF;
+
+    UPDATE sparrow_keys
+    SET usage_count = v_usage_count + v_granted,
+        last_used_date = CASE WHEN v_granted > 0 THEN SYSDATE ELSE last_used_date END
+    WHERE sparrow_key = p_key;
+
+    RETURN v_granted;
+EXCEPTION
+    WHEN NO_DATA_FOUND THEN
+        RETURN 0;
+END lease_key_quota;
+/
+
+
+-- Gives back p_count unused calls of a key lease
+CREATE OR REPLACE PROCEDURE release_key_quota(
+    p_key   IN VARCHAR2,
+    p_count IN NUMBER
+)
+IS
+BEGIN
+    UPDATE sparrow_keys
+    SET usage_count = GREATEST(usage_count - p_count, 0)
+    WHERE sparrow_key = p_key;
+END release_key_quota;
+/
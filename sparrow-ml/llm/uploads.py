@@ -0,0 +1,109 @@
+import asyncio
+import os
+import re
+import shutil
+from rich import print
+from metrics import UPLOAD_SIZE
+
+
+# Chunk size for streaming uploads to disk and scanning PDFs, keeps memory use independent of file size
+CHUNK_SIZE = 1024 * 1024
+
+# Bytes kept from the previous chunk while scanning, so page tree objects split between chunks are still found
+SCAN_OVERLAP = 64 * 1024
+
+_count_pattern = re.compile(rb'/Count\s+(\d+)')
+_pages_type_pattern = re.compile(rb'/Type\s*/Pages(?![A-Za-z])')
+
+
+def _copy_upload(source_file, file_path):
+    source_file.seek(0)
+    with open(file_path, 'wb') as target_file:
+        shutil.copyfileobj(source_file, target_file, CHUNK_SIZE)
+        return target_file.tell()
+
+
+async def save_upload(upload, target_dir: str):
+    """
+    Streams an uploaded file to the target directory once, in chunks.
+
+    Args:
+        upload: FastAPI UploadFile, or None
+        target_dir (str): Directory to save the file into
+
+    Returns:
+        str: Path to the saved file, None if there is no upload
+    """
+    if upload is None:
+        return None
+
+    file_path = os.path.join(target_dir, os.path.basename(upload.filename or "upload"))
+    # The upload is already spooled by the framework, copying it is blocking file I/O
+    size = await asyncio.to_thread(_copy_upload, upload.file, file_path)
+    UPLOAD_SIZE.observe(size)
+
+    return file_path
+
+
+def _page_tree_count(data: bytes, count_match):
+    """Returns /Count if it belongs to a /Type /Pages object, None for outlines and other dictionaries."""
+    object_start = data.rfind(b'obj', 0, count_match.start())
+    object_end = data.find(b'endobj', count_match.end())
+    if object_start == -1 or object_end == -1:
+        return None
+
+    # rfind above also matches 'endobj' of the previous object, which is fine as a lower bound
+    if _pages_type_pattern.search(data, object_start, object_end):
+        return int(count_match.group(1))
+    return None
+
+
+def scan_pdf_page_count(file_path: str):
+    """
+    Lightweight page count from the PDF page tree, reading the file in chunks.
+    The root /Pages object holds the total page count, so the largest /Count found wins.
+
+    Returns:
+        int: Page count, None if no page tree object is found (e.g. it sits in a compressed object stream)
+    """
+    page_count = None
+    tail = b''
+
+    with open(file_path, 'rb') as pdf_file:
+        while True:
+            chunk = pdf_file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+
+            data = tail + chunk
+            for count_match in _count_pattern.finditer(data):
+                count = _page_tree_count(data, count_match)
+                if count is not None and (page_count is None or count > page_count):
+                    page_count = count
+
+            tail = data[-SCAN_OVERLAP:]
+
+    return page_count
+
+
+def get_pdf_page_count(file_path: str) -> int:
+    """
+    Counts pages in a PDF file. Blocking, call it off the event loop.
+
+    Args:
+        file_path (str): Path to the PDF file
+
+    Returns:
+        int: Number of pages, 1 if the page count can't be determined
+    """
+    try:
+        page_count = scan_pdf_page_count(file_path)
+        if page_count:
+            return page_count
+
+        # Page tree is compressed, fall back to a full parse
+        import pypdf
+        return len(pypdf.PdfReader(file_path).pages)
+    except Exception as e:
+        print(f"Error determining PDF page count: {str(e)}")
+        return 1